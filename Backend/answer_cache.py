@@ -0,0 +1,110 @@
+"""Semantic answer cache: reuse an LLM answer for a near-identical question.
+
+A cached answer is only served when the new query's embedding is within
+ANSWER_CACHE_THRESHOLD cosine similarity of a previous query *and* retrieval
+produced exactly the same set of chunks. The source key hashes chunk text,
+so re-ingested minutes never match stale answers, and callers can pass a
+store generation to drop everything after a rebuild.
+"""
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+
+
+def make_source_key(sources):
+    """Order-independent key for an iterable of (source name, chunk text) pairs."""
+    return tuple(sorted(
+        (source or "", hashlib.sha1(text.encode("utf-8")).hexdigest()[:16])
+        for source, text in sources
+    ))
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, max_entries=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = []
+        self._vectors = None
+        self._generation = None
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.invalidations = 0
+        self.saved_llm_ms = 0.0
+
+    def _check_generation(self, generation):
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries = []
+            self._vectors = None
+            self._generation = generation
+
+    def _drop_expired(self):
+        if not self.ttl:
+            return
+        now = time.time()
+        keep = [i for i, entry in enumerate(self._entries) if entry["expires_at"] > now]
+        if len(keep) != len(self._entries):
+            self._entries = [self._entries[i] for i in keep]
+            self._vectors = self._vectors[keep] if keep else None
+
+    def candidates(self, query_vector, generation=None):
+        """Cached entries whose query is within the threshold, most similar first."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-8)
+        with self._lock:
+            self._check_generation(generation)
+            self._drop_expired()
+            if self._vectors is None:
+                return []
+            similarities = self._vectors @ query
+            order = np.argsort(-similarities)
+            return [self._entries[i] for i in order if similarities[i] >= self.threshold]
+
+    def lookup(self, query_vector, source_key, generation=None):
+        """Return a cached entry for this query and retrieved source set, counting the lookup."""
+        for entry in self.candidates(query_vector, generation):
+            if entry["source_key"] == source_key:
+                self.record(entry)
+                return entry
+        self.record(None)
+        return None
+
+    def record(self, entry):
+        with self._lock:
+            self.lookups += 1
+            if entry is not None:
+                self.hits += 1
+                self.saved_llm_ms += entry["llm_ms"]
+
+    def store(self, query_vector, source_key, answer, llm_ms, generation=None, **extra):
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = (query / (np.linalg.norm(query) + 1e-8)).reshape(1, -1)
+        entry = dict(extra, source_key=source_key, answer=answer, llm_ms=llm_ms, expires_at=time.time() + (self.ttl or float("inf")))
+        with self._lock:
+            self._check_generation(generation)
+            self._entries.append(entry)
+            self._vectors = query if self._vectors is None else np.vstack([self._vectors, query])
+            if len(self._entries) > self.max_entries:
+                self._entries = self._entries[-self.max_entries:]
+                self._vectors = self._vectors[-self.max_entries:]
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "invalidations": self.invalidations,
+            "saved_llm_ms": round(self.saved_llm_ms, 1),
+            "avg_saved_llm_ms": round(self.saved_llm_ms / self.hits, 1) if self.hits else 0.0
+        }
@@ -1,11 +1,22 @@
+# Imported first so the startup clock also covers the imports below
+from model_loader import startup, PREWARM_MODELS
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from rag_query_handler import TextRAGHandler
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import os
+import time
 from dotenv import load_dotenv
 import uvicorn
 
+startup.record("imports", (time.perf_counter() - startup.started) * 1000)
+
 # Load environment variables
 load_dotenv()
 
@@ -27,13 +38,71 @@ class QueryRequest(BaseModel):
     query: str
     top_k: int = 200
 
+class QueryLimiter:
+    """Caps in-flight queries and rejects new ones once the wait queue is full."""
+
+    def __init__(self, max_concurrent, max_queued):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.pending = 0
+        self.rejected = 0
+
+    def admit(self):
+        """Take a place in the queue or raise 429; returns an idempotent release callback."""
+        if self.pending >= self.max_concurrent + self.max_queued:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Too many queries in progress, please retry shortly")
+        self.pending += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.pending -= 1
+        return release
+
+    @asynccontextmanager
+    async def slot(self, release=None):
+        release = release or self.admit()
+        try:
+            async with self._semaphore:
+                yield
+        finally:
+            release()
+
+    def stats(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "pending": self.pending,
+            "rejected": self.rejected
+        }
+
+# CPU-bound retrieval (embedding, FAISS search, reranking) runs here, off the event loop
+query_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("QUERY_WORKERS", "4")),
+    thread_name_prefix="rag-query"
+)
+query_limiter = QueryLimiter(
+    max_concurrent=int(os.getenv("MAX_CONCURRENT_QUERIES", "8")),
+    max_queued=int(os.getenv("MAX_QUEUED_QUERIES", "32"))
+)
+
 # Initialize RAG handler
 try:
-    rag_handler = TextRAGHandler(
-        together_api_key=os.getenv("TOGETHER_API_KEY"),
-        vector_store_dir="vector_store"
-    )
+    with startup.phase("rag handler"):
+        rag_handler = TextRAGHandler(
+            together_api_key=os.getenv("TOGETHER_API_KEY"),
+            vector_store_dir="vector_store"
+        )
+    rag_handler.store_registry.start_auto_reload(float(os.getenv("VECTOR_STORE_RELOAD_INTERVAL", "30")))
+    # The embedding model loads on first use; prewarming starts that now without delaying readiness.
+    if PREWARM_MODELS:
+        rag_handler.prewarm()
     print("✅ RAG handler initialized successfully")
+    startup.mark_ready()
 except Exception as e:
     print(f"❌ Failed to initialize RAG handler: {e}")
     raise RuntimeError("Failed to initialize RAG handler") from e
@@ -42,9 +111,12 @@ except Exception as e:
 async def handle_query(request: QueryRequest):
     """Handle queries against MNNIT BoG documents"""
     try:
-        print(f"🔍 Processing query: {request.query}")
-        response = rag_handler.handle_input(request.query, request.top_k)
+        async with query_limiter.slot():
+            print(f"🔍 Processing query: {request.query}")
+            response = await rag_handler.ahandle_input(request.query, request.top_k, executor=query_executor)
         return {"response": response}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error processing query: {e}")
         raise HTTPException(
@@ -52,14 +124,59 @@ async def handle_query(request: QueryRequest):
             detail=f"Error processing query: {str(e)}"
         )
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/query/stream")
+async def handle_query_stream(request: QueryRequest):
+    """Stream the answer as server-sent events: sources first, then tokens, then done (or error if the LLM stream fails)"""
+    # Admission happens before the response starts so overload is still a plain 429.
+    release = query_limiter.admit()
+
+    async def events():
+        try:
+            async with query_limiter.slot(release):
+                print(f"🔍 Streaming query: {request.query}")
+                async for event, data in rag_handler.astream_input(request.query, request.top_k, executor=query_executor):
+                    yield _sse(event, data)
+        except Exception as e:
+            print(f"❌ Error streaming query: {e}")
+            yield _sse("error", {"message": f"Error processing query: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs even if the client disconnects before the body starts, so the queue slot is never leaked.
+        background=BackgroundTask(release)
+    )
+
 @app.get("/health")
 async def health_check():
     """Service health check"""
     return {
         "status": "healthy",
-        "vector_stores": len(rag_handler.vector_stores)
+        "models": rag_handler.model_status(),
+        "startup": startup.stats(),
+        "vector_stores": len(rag_handler.vector_stores),
+        "vector_store_reload": rag_handler.store_registry.stats(),
+        "query_limiter": query_limiter.stats(),
+        "query_cache": rag_handler.query_cache.stats()
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Answer/query cache hit rates and LLM time saved"""
+    return {
+        "answer_cache": rag_handler.answer_cache.stats(),
+        "query_cache": rag_handler.query_cache.stats()
+    }
+
+@app.on_event("shutdown")
+async def shutdown():
+    await rag_handler.llm_client.aclose()
+    query_executor.shutdown(wait=False)
+
 if __name__ == "__main__":
     # Run with auto-reload for development
     uvicorn.run(
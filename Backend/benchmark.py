@@ -0,0 +1,1228 @@
+"""Latency benchmarks for the BoG retrieval pipeline.
+
+Run from the Backend directory, e.g.:
+
+    python benchmark.py rerank --sizes 100 1000 5000
+    python benchmark.py fanout
+    python benchmark.py ann --scales 1 10 100
+    python benchmark.py compress --scales 1 10 --workers 8
+    python benchmark.py load --clients 1 8 32
+    python benchmark.py stream --requests 10
+    python benchmark.py normalize --summaries-dir summaries
+    python benchmark.py items --queries 200
+    python benchmark.py hybrid --queries 200
+    python benchmark.py expansion --llm-delay 1.5
+    python benchmark.py context --budgets 4000 2000
+    python benchmark.py catalog --queries 200
+    python benchmark.py summary --queries 40
+    python benchmark.py docstore --store db_faiss
+    python benchmark.py startup
+    python benchmark.py embeddings --backends torch onnx onnx-int8
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_QUERY = "What was decided about faculty recruitment in the 70th BoG meeting?"
+
+
+def _timed(fn, repeat=3):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def _load_embedder():
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, encode_kwargs={"normalize_embeddings": True})
+
+
+def _load_store(vector_store_dir, name, embedder):
+    from langchain.vectorstores import FAISS
+    from chunk_store import is_chunk_store, load_faiss_store
+
+    path = os.path.join(vector_store_dir, name)
+    if is_chunk_store(path):
+        return load_faiss_store(path, embedder)
+    return FAISS.load_local(path, embeddings=embedder, allow_dangerous_deserialization=True)
+
+
+def _store_docs_and_vectors(store):
+    positions = np.arange(store.index.ntotal)
+    docs = [store.docstore.search(store.index_to_docstore_id[int(i)]) for i in positions]
+    vectors = np.vstack([store.index.reconstruct(int(i)) for i in positions]).astype(np.float32)
+    return docs, vectors
+
+
+def _per_document_rerank(embedder, docs, query, top_n=100):
+    # The pre-vectorized implementation: one forward pass per candidate.
+    query_embedding = embedder.embed_query(f"query: {query}")
+    ranked = []
+    for doc in docs:
+        doc_embedding = embedder.embed_query(f"passage: {doc.page_content[:512]}")
+        similarity = np.dot(query_embedding, doc_embedding) / (np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding) + 1e-8)
+        ranked.append((similarity, doc))
+    ranked.sort(key=lambda x: x[0], reverse=True)
+    return [doc for _, doc in ranked[:top_n]]
+
+
+def bench_rerank(args):
+    from retrieval import embed_query_vector, rank_by_vectors
+
+    embedder = _load_embedder()
+    store = _load_store(args.vector_store_dir, "db_faiss", embedder)
+    base_docs, base_vectors = _store_docs_and_vectors(store)
+    query_vector = embed_query_vector(embedder, args.query)
+
+    print(f"{'candidates':>10} | {'per-doc embed':>14} | {'batched embed':>14} | {'stored vectors':>14}")
+    for size in args.sizes:
+        repeats = -(-size // len(base_docs))
+        docs = (base_docs * repeats)[:size]
+        vectors = np.tile(base_vectors, (repeats, 1))[:size]
+
+        before_ms, _ = _timed(lambda: _per_document_rerank(embedder, docs, args.query), repeat=1)
+        batched_ms, _ = _timed(lambda: rank_by_vectors(
+            embedder.embed_query(f"query: {args.query}"),
+            embedder.embed_documents([f"passage: {doc.page_content[:512]}" for doc in docs]),
+            100,
+        ), repeat=1)
+        after_ms, _ = _timed(lambda: rank_by_vectors(query_vector, vectors, 100), repeat=args.repeat)
+        print(f"{size:>10} | {before_ms:>11.1f} ms | {batched_ms:>11.1f} ms | {after_ms:>11.3f} ms")
+
+
+def bench_fanout(args):
+    import contextlib
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+    from store_registry import VectorStoreRegistry
+    from retrieval import embed_query_vector, fan_out_search
+    from meeting_index import MEETING_INDEX_NAME
+
+    embedder = _load_embedder()
+    registry = VectorStoreRegistry(args.vector_store_dir, embedder, legacy_stores=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        registry.reload()
+    # A "BoG 37 to 74" query selects every per-meeting store.
+    # meeting_index has its own search API; `items` and `hybrid` benchmark it.
+    stores = {name: store for name, store in registry.stores.items() if name not in ("db_faiss", MEETING_INDEX_NAME)}
+    if not stores:
+        print(f"No per-meeting stores in '{args.vector_store_dir}' (run create_vector_embedding.py --layout both)")
+        return
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+
+    def sequential():
+        return [doc for store in stores.values() for doc in store.similarity_search(args.query, k=args.top_k)]
+
+    def embed_once():
+        return embed_query_vector(embedder, args.query)
+
+    query_vector = embed_once()
+    sequential_ms, _ = _timed(sequential, repeat=args.repeat)
+    embed_ms, _ = _timed(embed_once, repeat=args.repeat)
+    serial_search_ms, _ = _timed(lambda: fan_out_search(stores, query_vector, args.top_k), repeat=args.repeat)
+    parallel_search_ms, _ = _timed(lambda: fan_out_search(stores, query_vector, args.top_k, executor), repeat=args.repeat)
+    slowest_ms = max(
+        _timed(lambda: store.index.search(query_vector.reshape(1, -1), min(args.top_k, store.index.ntotal)), repeat=args.repeat)[0]
+        for store in stores.values()
+    )
+
+    rows = [
+        ("per-store similarity_search (before)", sequential_ms),
+        ("one query embedding", embed_ms),
+        ("fan-out search, serial", serial_search_ms),
+        (f"fan-out search, {args.workers} workers", parallel_search_ms),
+        ("slowest single-store FAISS search", slowest_ms),
+    ]
+    print(f"{'stores searched':<40}{len(stores):>9}")
+    for label, ms in rows:
+        print(f"{label:<40}{ms:>9.3f} ms")
+    executor.shutdown()
+
+
+def _synthetic_corpus(base_vectors, scale, rng, noise=0.05):
+    if scale == 1:
+        return base_vectors
+    vectors = np.tile(base_vectors, (scale, 1))
+    vectors = vectors + rng.normal(0, noise, vectors.shape).astype(np.float32)
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def bench_ann(args):
+    import faiss
+    from index_factory import build_index, index_memory_bytes, INDEX_TYPES
+
+    embedder = _load_embedder()
+    store = _load_store(args.vector_store_dir, "db_faiss", embedder)
+    _, base_vectors = _store_docs_and_vectors(store)
+    rng = np.random.default_rng(0)
+    faiss.omp_set_num_threads(1)
+
+    print(f"{'corpus':>8} | {'index':>6} | {'build':>9} | {'memory':>9} | {'QPS':>8} | recall@{args.k}")
+    for scale in args.scales:
+        vectors = _synthetic_corpus(base_vectors, scale, rng)
+        queries = _synthetic_corpus(vectors[rng.choice(len(vectors), args.queries)], 2, rng)[:args.queries]
+        k = min(args.k, len(vectors))
+
+        exact = faiss.IndexFlatL2(vectors.shape[1])
+        exact.add(vectors)
+        _, truth = exact.search(queries, k)
+
+        for index_type in INDEX_TYPES:
+            start = time.perf_counter()
+            index, _ = build_index(vectors, index_type)
+            build_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            found = np.vstack([index.search(query.reshape(1, -1), k)[1] for query in queries])
+            qps = len(queries) / (time.perf_counter() - start)
+
+            recall = np.mean([len(set(found[i]) & set(truth[i])) / k for i in range(len(queries))])
+            print(
+                f"{len(vectors):>8} | {index_type:>6} | {build_s * 1000:>6.0f} ms | "
+                f"{index_memory_bytes(index) / 2**20:>6.2f} MB | {qps:>8.0f} | {recall:.3f}"
+            )
+
+
+def _stored_vectors(folder_path):
+    """The float32 vectors of a store or meeting index on disk, whatever its index type."""
+    import faiss
+    from index_factory import RESCORE_VECTORS_FILE
+
+    vectors_path = os.path.join(folder_path, RESCORE_VECTORS_FILE)
+    if os.path.isfile(vectors_path):
+        return np.load(vectors_path)
+    index = faiss.read_index(os.path.join(folder_path, "index.faiss"))
+    if isinstance(index, faiss.IndexIVF):
+        index.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def bench_compress(args):
+    import faiss
+    from index_factory import build_index, index_memory_bytes, read_index, write_index, RESCORE_VECTORS_FILE
+
+    base_vectors = _stored_vectors(os.path.join(args.vector_store_dir, args.store))
+    rng = np.random.default_rng(0)
+    faiss.omp_set_num_threads(1)
+    configs = [("flat", "flat", {}), ("fp16", "fp16", {"rescore": 0}), ("fp16+rescore", "fp16", {})]
+    for m in args.pq_m:
+        configs += [(f"pq{m}", "pq", {"m": m, "rescore": 0}), (f"pq{m}+rescore", "pq", {"m": m})]
+
+    print("Memory is what each worker holds privately; the rescoring vectors.npy is memory-mapped and shared.")
+    print(
+        f"{'corpus':>8} | {'index':>13} | {'per worker':>10} | {'shared':>9} | "
+        f"{f'{args.workers} workers':>10} | {'QPS':>7} | recall@{args.k}"
+    )
+    for scale in args.scales:
+        vectors = _synthetic_corpus(base_vectors, scale, rng)
+        queries = _synthetic_corpus(vectors[rng.choice(len(vectors), args.queries)], 2, rng)[:args.queries]
+        k = min(args.k, len(vectors))
+
+        exact = faiss.IndexFlatIP(vectors.shape[1])
+        exact.add(vectors)
+        truth, _ = exact.search(queries, k)
+
+        for label, index_type, overrides in configs:
+            with tempfile.TemporaryDirectory() as tmp:
+                # Written and read back like the ingestion does, so rescoring reads a real memmap.
+                index, params = build_index(vectors, index_type, metric="ip", **overrides)
+                write_index(tmp, "index.faiss", index, params, vectors)
+                index = read_index(tmp, "index.faiss", params)
+                shared = os.path.getsize(os.path.join(tmp, RESCORE_VECTORS_FILE)) if params.get("rescore") else 0
+
+                start = time.perf_counter()
+                found = np.vstack([index.search(query.reshape(1, -1), k)[1] for query in queries])
+                qps = len(queries) / (time.perf_counter() - start)
+                private = index_memory_bytes(index)
+                del index
+
+            # Tie-aware: a hit scores at least the k-th exact score (the corpus has duplicate vectors).
+            found_scores = np.einsum("qkd,qd->qk", vectors[found], queries)
+            recall = np.mean((found >= 0) & (found_scores >= truth[:, -1:] - 1e-5))
+            print(
+                f"{len(vectors):>8} | {label:>13} | {private / 2**20:>7.2f} MB | {shared / 2**20:>6.2f} MB | "
+                f"{(args.workers * private + shared) / 2**20:>7.1f} MB | {qps:>7.0f} | {recall:.3f}"
+            )
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _wait_for(url, timeout, interval=0.5):
+    import httpx
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(interval)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def _start_local_servers(args, poll_interval=0.5, **api_env):
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    env = dict(
+        os.environ,
+        TOGETHER_API_URL=f"{stub_url}/v1/chat/completions",
+        TOGETHER_API_KEY=os.getenv("TOGETHER_API_KEY", "stub"),
+        VECTOR_STORE_RELOAD_INTERVAL="0",
+        # Every request should reach the LLM; a threshold above 1 disables the semantic answer cache.
+        ANSWER_CACHE_THRESHOLD="2",
+        **api_env
+    )
+    stub = subprocess.Popen([sys.executable, "stub_llm_server.py", "--port", str(args.stub_port), "--delay", str(args.llm_delay)])
+    api = subprocess.Popen([sys.executable, "-m", "uvicorn", "api:app", "--port", str(args.api_port), "--log-level", "warning"], env=env)
+    _wait_for(f"{api_url}/health", timeout=args.startup_timeout, interval=poll_interval)
+    return api_url, [api, stub]
+
+
+async def _run_clients(url, clients, total_requests, query):
+    import httpx
+
+    latencies = []
+    statuses = {}
+    remaining = iter(range(total_requests))
+
+    async def client(session):
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await session.post(f"{url}/query", json={"query": query})
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error"
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    return latencies, statuses, elapsed
+
+
+def bench_load(args):
+    processes = []
+    url = args.url
+    try:
+        if url is None:
+            url, processes = _start_local_servers(args)
+
+        print(f"{'clients':>7} | {'req/s':>7} | {'p50':>9} | {'p95':>9} | {'p99':>9} | statuses")
+        for clients in args.clients:
+            total = max(args.requests, clients * 2)
+            latencies, statuses, elapsed = asyncio.run(_run_clients(url, clients, total, args.query))
+            print(
+                f"{clients:>7} | {len(latencies) / elapsed:>7.2f} | {_percentile(latencies, 50):>6.0f} ms | "
+                f"{_percentile(latencies, 95):>6.0f} ms | {_percentile(latencies, 99):>6.0f} ms | {statuses}"
+            )
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+async def _time_stream(session, url, query):
+    """(time to first byte, first sources event, first token, total) in ms for one /query/stream call."""
+    start = time.perf_counter()
+    first_byte = first_sources = first_token = None
+    async with session.stream("POST", f"{url}/query/stream", json={"query": query}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            now = (time.perf_counter() - start) * 1000
+            if first_byte is None:
+                first_byte = now
+            if line == "event: sources" and first_sources is None:
+                first_sources = now
+            elif line == "event: token" and first_token is None:
+                first_token = now
+    return first_byte, first_sources, first_token, (time.perf_counter() - start) * 1000
+
+
+async def _compare_streaming(url, requests, query):
+    import httpx
+
+    blocking, streaming = [], []
+    async with httpx.AsyncClient(timeout=300) as session:
+        for i in range(requests):
+            # Distinct wording per run keeps the query caches from short-circuiting the LLM.
+            start = time.perf_counter()
+            response = await session.post(f"{url}/query", json={"query": f"{query} (run {i})"})
+            response.raise_for_status()
+            blocking.append((time.perf_counter() - start) * 1000)
+            streaming.append(await _time_stream(session, url, f"{query} (stream run {i})"))
+    return blocking, streaming
+
+
+def bench_stream(args):
+    processes = []
+    url = args.url
+    try:
+        if url is None:
+            url, processes = _start_local_servers(args)
+
+        blocking, streaming = asyncio.run(_compare_streaming(url, args.requests, args.query))
+        columns = list(zip(*streaming))
+        print(f"{'':<24} | {'p50':>9} | {'p95':>9}")
+        rows = [("/query full response", blocking)] + list(zip(
+            ("/query/stream first byte", "/query/stream sources", "/query/stream 1st token", "/query/stream complete"),
+            columns
+        ))
+        for label, samples in rows:
+            samples = [sample for sample in samples if sample is not None]
+            print(f"{label:<24} | {_percentile(samples, 50):>6.0f} ms | {_percentile(samples, 95):>6.0f} ms")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def bench_startup(args):
+    import httpx
+
+    modes = (
+        ("eager model load", {"LAZY_MODEL_LOADING": "0", "PREWARM_MODELS": "0"}),
+        ("lazy, no prewarm", {"LAZY_MODEL_LOADING": "1", "PREWARM_MODELS": "0"}),
+        ("lazy + prewarm", {"LAZY_MODEL_LOADING": "1", "PREWARM_MODELS": "1"}),
+    )
+    print(f"{'mode':<18} | {'/health 200':>11} | {'first query':>11} | startup breakdown reported by the API")
+    for label, env in modes:
+        processes = []
+        try:
+            start = time.perf_counter()
+            url, processes = _start_local_servers(args, poll_interval=0.05, **env)
+            healthy_ms = (time.perf_counter() - start) * 1000
+            breakdown = httpx.get(f"{url}/health").json()["startup"]["phases"]
+            if env["PREWARM_MODELS"] == "1":
+                time.sleep(args.idle)
+
+            start = time.perf_counter()
+            httpx.post(f"{url}/query", json={"query": args.query}, timeout=300).raise_for_status()
+            first_query_ms = (time.perf_counter() - start) * 1000
+            print(
+                f"{label:<18} | {healthy_ms:>8.0f} ms | {first_query_ms:>8.0f} ms | "
+                + ", ".join(f"{name} {ms:.0f} ms" for name, ms in breakdown.items())
+            )
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+    print(f"\n'/health 200' includes interpreter start; prewarm runs get {args.idle}s of idle time before the first query.")
+
+
+def _summary_chunks(summaries_dir, size=1600):
+    texts = [open(path, encoding="utf-8").read() for path in sorted(glob.glob(os.path.join(summaries_dir, "*.txt")))]
+    return [text[i:i + size] for text in texts for i in range(0, len(text), size)]
+
+
+def bench_embeddings(args):
+    from embedding_backends import load_backend
+
+    chunks = _summary_chunks(args.summaries_dir)[:args.chunks]
+    # Short, question-like inputs: the query default plus the opening words of sampled chunks.
+    rng = np.random.default_rng(0)
+    queries = [args.query] + [" ".join(chunks[i].split()[:12]) for i in rng.choice(len(chunks), args.queries - 1)]
+    print(f"{len(chunks)} chunks, {len(queries)} queries, batch {args.batch_size}\n")
+
+    results = {}
+    for name in args.backends:
+        try:
+            start = time.perf_counter()
+            backend = load_backend(EMBEDDING_MODEL, name)
+            load_s = time.perf_counter() - start
+        except Exception as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        backend.encode(queries[:2])
+        start = time.perf_counter()
+        chunk_vectors = backend.encode(chunks, batch_size=args.batch_size)
+        throughput = len(chunks) / (time.perf_counter() - start)
+        latencies = []
+        query_vectors = []
+        for query in queries:
+            start = time.perf_counter()
+            query_vectors.append(backend.encode(query))
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[name] = (load_s, throughput, latencies, np.asarray(chunk_vectors), np.vstack(query_vectors))
+
+    if not results:
+        return 1
+    reference = args.backends[0] if args.backends[0] in results else next(iter(results))
+    ref_chunks, ref_queries = results[reference][3], results[reference][4]
+    ref_top = np.argsort(-(ref_queries @ ref_chunks.T), axis=1)[:, :args.k]
+
+    print(f"{'backend':<10} | {'load':>7} | {'chunks/s':>9} | {'query p50':>9} | {'query p95':>9} | "
+          f"{'cos mean':>8} | {'cos min':>8} | top-{args.k} overlap vs {reference}")
+    worst = 1.0
+    for name, (load_s, throughput, latencies, chunk_vectors, query_vectors) in results.items():
+        cosines = np.concatenate([
+            np.sum(chunk_vectors * ref_chunks, axis=1), np.sum(query_vectors * ref_queries, axis=1)
+        ])
+        top = np.argsort(-(query_vectors @ chunk_vectors.T), axis=1)[:, :args.k]
+        overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top, ref_top)])
+        worst = min(worst, float(cosines.min()))
+        print(
+            f"{name:<10} | {load_s:>5.1f} s | {throughput:>9.1f} | {_percentile(latencies, 50):>6.2f} ms | "
+            f"{_percentile(latencies, 95):>6.2f} ms | {cosines.mean():>8.5f} | {cosines.min():>8.5f} | {overlap:.3f}"
+        )
+    if worst < args.min_cosine:
+        print(f"\n❌ Lowest cosine agreement {worst:.5f} is below --min-cosine {args.min_cosine}")
+        return 1
+    print(f"\n✅ Every vector is within cosine {args.min_cosine} of {reference}")
+    return 0
+
+
+def _legacy_clean_text(text):
+    # clean_text as it was before text_normalizer.py: six sequential passes.
+    if not text:
+        return ""
+    text = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', text)
+    text = re.sub(r'(?<=\w)-\s+(?=\w)', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[•▪�]+', ' ', text)
+    text = re.sub(r'(?i)\b(?:page|pase)\s*\d+\b', '', text)
+    text = re.sub(r'_{2,}', '', text)
+    return text.strip()
+
+
+def _legacy_fix_spacing(chunk):
+    import wordninja
+    if " " not in chunk:
+        return " ".join(wordninja.split(chunk))
+    fixed_words = []
+    for word in chunk.split():
+        if len(word) > 15 and word.isalpha():
+            split = wordninja.split(word)
+            fixed_words.extend(split if len(split) > 1 else [word])
+        else:
+            fixed_words.append(word)
+    return " ".join(fixed_words)
+
+
+def bench_normalize(args):
+    import text_normalizer
+
+    raw = [open(path, encoding="utf-8").read() for path in sorted(glob.glob(os.path.join(args.summaries_dir, "*.txt")))]
+    # Page-sized pieces for cleaning, chunk-sized pieces of cleaned text for spacing repair.
+    pages = [text[i:i + 3000] for text in raw for i in range(0, len(text), 3000)]
+    chunks = [text[i:i + 1600] for text in map(_legacy_clean_text, raw) for i in range(0, len(text), 1600)]
+    megabytes = sum(len(page.encode("utf-8")) for page in pages) / 1e6
+    print(f"{len(raw)} summaries, {megabytes:.2f} MB, {len(pages)} pages, {len(chunks)} chunks\n")
+
+    cases = [
+        ("clean_text", pages, _legacy_clean_text, text_normalizer.clean_text),
+        ("fix_spacing_in_chunk", chunks, _legacy_fix_spacing, text_normalizer.fix_spacing_in_chunk),
+    ]
+    print(f"{'function':<22} | {'before MB/s':>11} | {'after MB/s':>10} | {'speedup':>7} | mismatches")
+    for name, pieces, before, after in cases:
+        text_normalizer.split_word.cache_clear()
+        # Only the first `after` run is cold; the reported median includes the warm word-split cache, as in a real ingestion run.
+        before_ms, expected = _timed(lambda: [before(piece) for piece in pieces], args.repeat)
+        after_ms, actual = _timed(lambda: [after(piece) for piece in pieces], args.repeat)
+        mismatches = sum(e != a for e, a in zip(expected, actual))
+        print(
+            f"{name:<22} | {megabytes / (before_ms / 1000):>11.2f} | {megabytes / (after_ms / 1000):>10.2f} | "
+            f"{before_ms / after_ms:>6.1f}x | {mismatches}"
+        )
+    print(f"\nword split cache: {text_normalizer.split_word.cache_info()}")
+
+
+def _legacy_route(query, folder_names, expander):
+    # _extract_bog_folders_from_query before meeting_catalog.py: folder maps rebuilt by regex on every query.
+    meetings = expander.entities(query).meetings
+    meetings |= {int(n) for n in re.findall(r"\bBoG\s*(\d{1,3})\b", query, flags=re.IGNORECASE)}
+    meetings |= {int(n) for n in re.findall(r"\b(\d{1,3})(?:st|nd|rd|th)\s+(?:BoG|meeting)\b", query, flags=re.IGNORECASE)}
+    for start, end in re.findall(r"\bBoG\s*(\d{1,3})\s*(?:to|-)\s*(\d{1,3})\b", query, flags=re.IGNORECASE):
+        meetings.update(range(int(start), int(end) + 1))
+    years = {int(year) for year in re.findall(r"\b(20\d{2})\b", query)}
+    for start, end in re.findall(r"\b(20\d{2})\s*(?:to|-)\s*(20\d{2})\b", query):
+        years.update(range(int(start), int(end) + 1))
+    by_bog, by_year = {}, {}
+    for folder in folder_names:
+        bog_match = re.search(r"(\d{1,3})", folder)
+        year_match = re.search(r"(20\d{2})", folder)
+        if bog_match:
+            by_bog.setdefault(int(bog_match.group(1)), []).append(folder)
+        if year_match:
+            by_year.setdefault(int(year_match.group(1)), []).append(folder)
+    detected = set()
+    for meeting in meetings:
+        detected.update(by_bog.get(meeting, []))
+    for year in years:
+        detected.update(by_year.get(year, []))
+    return detected
+
+
+def bench_catalog(args):
+    from meeting_catalog import MeetingCatalog, catalog_entry, date_ranges
+    from query_expansion import MONTHS, QueryExpander, ordinal
+
+    skip = ("db_faiss", "meeting_index")
+    folder_names = sorted(
+        name for name in os.listdir(args.vector_store_dir)
+        if name not in skip and os.path.isdir(os.path.join(args.vector_store_dir, name))
+    )
+    catalog = MeetingCatalog.load(args.vector_store_dir)
+    if catalog is None:
+        print("No meeting_catalog.json (run create_vector_embedding.py); cataloging the folder names instead.")
+        catalog = MeetingCatalog([catalog_entry(name, chunks=0) for name in folder_names])
+    entries = [entry for entry in catalog.entries if entry["source"] in folder_names]
+    expander = QueryExpander()
+
+    def catalog_route(query):
+        meetings = expander.entities(query).meetings
+        return {entry["source"] for entry in catalog.resolve(meetings, date_ranges(query))}
+
+    def truth(first, last):
+        # A linear scan over the entries, independent of the catalog's sorted arrays.
+        return {entry["source"] for entry in entries if entry["date"] > 0 and first <= entry["date"] <= last}
+
+    rng = np.random.default_rng(0)
+    numbered = [entry for entry in entries if entry["meeting"] >= 0]
+    dated = sorted({entry["date"] // 100 for entry in entries if entry["date"] > 0})
+    years = sorted({month // 100 for month in dated})
+    query_sets = {
+        "meeting number": [
+            (f"What was decided in the {ordinal(entry['meeting'])} BoG meeting?",
+             {other["source"] for other in numbered if other["meeting"] == entry["meeting"]})
+            for entry in numbered
+        ],
+        "year": [(f"What did the Board decide in {year}?", truth(year * 10000 + 101, year * 10000 + 1231)) for year in years],
+        "month range": [],
+    }
+    for _ in range(args.queries if len(dated) > 1 else 0):
+        first, last = sorted(rng.choice(dated, 2, replace=False).tolist())
+        query = (f"Which meetings between {MONTHS[first % 100 - 1]} {first // 100} and "
+                 f"{MONTHS[last % 100 - 1][:3]} {last // 100} discussed fees?")
+        query_sets["month range"].append((query, truth(first * 100 + 1, last * 100 + 31)))
+
+    print(f"{len(folder_names)} per-meeting folders, {len(catalog)} catalog entries\n")
+    print(f"{'queries':<16} | {'router':<12} | {'stores':>6} | {'wrong':>6} | {'missed':>6} | {'exact':>5} | route time")
+    for set_name, queries in query_sets.items():
+        if not queries:
+            continue
+        for name, route in (("folder regex", lambda query: _legacy_route(query, folder_names, expander)), ("catalog", catalog_route)):
+            routed, wrong, missed, exact = [], [], [], []
+            for query, expected in queries:
+                found = route(query)
+                routed.append(len(found))
+                wrong.append(len(found - expected))
+                missed.append(len(expected - found))
+                exact.append(found == expected)
+            route_ms, _ = _timed(lambda: [route(query) for query, _ in queries], args.repeat)
+            print(
+                f"{set_name:<16} | {name:<12} | {np.mean(routed):>6.1f} | {np.mean(wrong):>6.2f} | {np.mean(missed):>6.2f} | "
+                f"{np.mean(exact):>5.2f} | {route_ms * 1000 / len(queries):>6.1f} µs"
+            )
+
+
+def bench_items(args):
+    from meeting_index import MeetingIndex, MEETING_INDEX_NAME, parse_item_reference
+    from retrieval import embed_query_vector, rank_by_vectors
+
+    embedder = _load_embedder()
+    index = MeetingIndex.load(os.path.join(args.vector_store_dir, MEETING_INDEX_NAME))
+    keys = sorted(index.item_rows)
+    if not keys:
+        print("No item table in the meeting index; rebuild it with create_vector_embedding.py --full")
+        return
+    rng = np.random.default_rng(0)
+    sample = [keys[i] for i in rng.choice(len(keys), min(args.queries, len(keys)), replace=False)]
+    queries = [f"What was resolved under item {item} in the {meeting}th BoG meeting?" for meeting, item in sample]
+
+    def vector_path(query, meeting):
+        # The previous route: embed, search the meeting's rows, rerank with the stored vectors.
+        query_vector = embed_query_vector(embedder, query)
+        rows = [row for _, row in index.search(query_vector, args.top_k, index.select({meeting}))]
+        positions, _ = rank_by_vectors(query_vector, index.vectors(rows), args.top_k)
+        return [rows[i] for i in positions]
+
+    def item_path(query, meeting):
+        rows = index.lookup_item({meeting}, parse_item_reference(query)[1])
+        return [int(row) for row in rows[:args.top_k]]
+
+    for name, path in (("embed + masked search + rerank", vector_path), ("item table lookup", item_path)):
+        samples = []
+        found = []
+        for query, (meeting, item) in zip(queries, sample):
+            start = time.perf_counter()
+            rows = path(query, meeting)
+            [index.document(row) for row in rows]
+            samples.append((time.perf_counter() - start) * 1000)
+            wanted = set(index.item_rows[meeting, item].tolist())
+            found.append(len(wanted & set(rows)) / len(wanted))
+        print(
+            f"{name:<32} p50 {_percentile(samples, 50):>8.3f} ms | p95 {_percentile(samples, 95):>8.3f} ms | "
+            f"item chunks retrieved {np.mean(found):.1%}"
+        )
+    print(f"\n{len(sample)} queries over {len(keys)} indexed (meeting, item) pairs, top_k={args.top_k}")
+
+
+def _exact_term_queries(index, lexical, count, rng, terms_per_query=3):
+    """Questions built from a chunk's rarest words (names, schemes, codes).
+
+    The answer is that chunk and any chunk with the same text (a file ingested twice).
+    """
+    from lexical_index import tokenize
+
+    doc_freq = {term: lexical.offsets[i + 1] - lexical.offsets[i] for term, i in lexical.term_ids.items()}
+    picked = {}
+    for row in rng.choice(index.ntotal, min(count, index.ntotal), replace=False):
+        text = index.chunks.text(int(row))
+        words = [token for token in dict.fromkeys(tokenize(text)) if token.isalpha() and len(token) > 3]
+        if len(words) >= terms_per_query and text not in picked:
+            picked[text] = sorted(words, key=lambda word: doc_freq[word])[:terms_per_query]
+    relevant = {text: set() for text in picked}
+    for row in range(index.ntotal):
+        rows = relevant.get(index.chunks.text(row))
+        if rows is not None:
+            rows.add(row)
+    return [(f"What do the minutes say about {' '.join(rare)}?", None, relevant[text]) for text, rare in picked.items()]
+
+
+def bench_hybrid(args):
+    from meeting_index import MeetingIndex, MEETING_INDEX_NAME
+    from retrieval import embed_query_vector, rank_by_vectors, reciprocal_rank_fusion
+
+    embedder = _load_embedder()
+    index = MeetingIndex.load(os.path.join(args.vector_store_dir, MEETING_INDEX_NAME))
+    if index.lexical is None:
+        print("No bm25.npz next to the meeting index; rebuild it with create_vector_embedding.py --full")
+        return 1
+    rng = np.random.default_rng(0)
+
+    keys = sorted(index.item_rows)
+    sample = [keys[i] for i in rng.choice(len(keys), min(args.queries, len(keys)), replace=False)] if keys else []
+    query_sets = {
+        "item numbers": [
+            (f"What was resolved under item {item} in the {meeting}th BoG meeting?", {meeting}, set(index.item_rows[meeting, item].tolist()))
+            for meeting, item in sample
+        ],
+        "exact terms": _exact_term_queries(index, index.lexical, args.queries, rng),
+    }
+
+    def vector_path(query_vector, query, mask, k):
+        # The current route: masked vector search for k chunks, reranked with their stored vectors.
+        rows = [row for _, row in index.search(query_vector, k, mask)]
+        positions, _ = rank_by_vectors(query_vector, index.vectors(rows), k)
+        return [rows[i] for i in positions]
+
+    def hybrid_path(query_vector, query, mask, k):
+        vector_rows = [row for _, row in index.search(query_vector, args.candidates, mask)]
+        lexical_rows, _ = index.lexical.search(query, args.candidates, mask)
+        return reciprocal_rank_fusion([vector_rows, lexical_rows.tolist()])[:k]
+
+    paths = [(f"vector k={k}", vector_path, k) for k in args.vector_k]
+    paths += [(f"hybrid k={k}", hybrid_path, k) for k in args.hybrid_k]
+    print("Latency excludes embedding the query, which both paths do once. Tokens are context chars / 4.")
+    for set_name, queries in query_sets.items():
+        if not queries:
+            continue
+        vectors = [embed_query_vector(embedder, query) for query, _, _ in queries]
+        masks = [index.select(meetings) if meetings else None for _, meetings, _ in queries]
+        print(f"\n{set_name} ({len(queries)} queries)")
+        print(f"{'path':<16} | {'hit rate':>8} | {'MRR':>5} | {'p50':>9} | {'p95':>9} | context tokens")
+        for name, path, k in paths:
+            samples, hits, reciprocal_ranks, tokens = [], [], [], []
+            for (query, _, relevant), query_vector, mask in zip(queries, vectors, masks):
+                start = time.perf_counter()
+                rows = path(query_vector, query, mask, k)
+                samples.append((time.perf_counter() - start) * 1000)
+                ranks = [rank for rank, row in enumerate(rows, 1) if row in relevant]
+                hits.append(bool(ranks))
+                reciprocal_ranks.append(1 / ranks[0] if ranks else 0.0)
+                tokens.append(sum(len(index.chunks.text(row)) for row in rows) / 4)
+            print(
+                f"{name:<16} | {np.mean(hits):>8.3f} | {np.mean(reciprocal_ranks):>5.3f} | "
+                f"{_percentile(samples, 50):>6.2f} ms | {_percentile(samples, 95):>6.2f} ms | {np.mean(tokens):>8.0f}"
+            )
+
+
+def _meeting_phrase_queries(index, count, rng):
+    """Questions naming a meeting the way users do (ordinal, words, "BoG n", its date) plus a chunk's rarest words."""
+    from query_expansion import MONTHS, ordinal, ordinal_words
+
+    queries = []
+    for set_name, terms, relevant in _exact_term_queries(index, index.lexical, count, rng, terms_per_query=2):
+        row = min(relevant)
+        meeting, date = int(index.meeting[row]), int(index.date[row])
+        if meeting < 0:
+            continue
+        phrases = [f"{ordinal(meeting)} BoG meeting", f"{ordinal_words(meeting)} meeting", f"BoG {meeting}"]
+        if date > 0:
+            phrases.append(f"meeting held on {date % 100} {MONTHS[date // 100 % 100 - 1]} {date // 10000}")
+        phrase = phrases[len(queries) % len(phrases)]
+        words = set_name.rsplit("about ", 1)[1].rstrip("?")
+        queries.append((f"What did the {phrase} decide about {words}?", {index.chunks.text(r) for r in relevant}))
+    return queries
+
+
+def bench_expansion(args):
+    import contextlib
+    import io
+    from rag_query_handler import TextRAGHandler
+    from meeting_index import MEETING_INDEX_NAME
+
+    stub = None
+    os.environ.setdefault("TOGETHER_API_KEY", "stub")
+    handler = TextRAGHandler(args.vector_store_dir)
+    if args.llm_url:
+        handler.llm_client.api_url = args.llm_url
+    else:
+        stub = subprocess.Popen([sys.executable, "stub_llm_server.py", "--port", str(args.stub_port), "--delay", str(args.llm_delay)])
+        handler.llm_client.api_url = f"http://127.0.0.1:{args.stub_port}/v1/chat/completions"
+        _wait_for(f"http://127.0.0.1:{args.stub_port}/docs", timeout=30)
+
+    try:
+        index = handler.vector_stores[MEETING_INDEX_NAME]
+        queries = _meeting_phrase_queries(index, args.queries, np.random.default_rng(0))
+        handler.embedding_model.embed_query("warm up")
+
+        def llm(query):
+            handler.query_expansion = "llm"
+            return handler._generate_amplified_query(query)
+
+        modes = [("original query", lambda query: query), ("local expansion", handler._expand_locally), ("LLM amplification", llm)]
+        if not args.llm_url:
+            print(f"LLM amplification goes to a stub server answering in {args.llm_delay}s; its hit rate is not meaningful.")
+        print(f"{len(queries)} queries naming a meeting by ordinal, words, 'BoG n' or date; top_k={args.top_k}\n")
+        print(f"{'mode':<18} | {'expand p50':>10} | {'expand p95':>10} | {'end-to-end p50':>14} | {'p95':>9} | {'hit rate':>8} | MRR")
+        for name, expand in modes:
+            expand_ms, total_ms, hits, reciprocal_ranks = [], [], [], []
+            for query, relevant in queries:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    expanded = expand(query)
+                    expanded_at = time.perf_counter()
+                    stores = handler.vector_stores
+                    docs = handler._retrieve(expanded, handler._plan_search(query, stores), stores, args.top_k)
+                    end = time.perf_counter()
+                expand_ms.append((expanded_at - start) * 1000)
+                total_ms.append((end - start) * 1000)
+                ranks = [rank for rank, doc in enumerate(docs, 1) if doc.page_content in relevant]
+                hits.append(bool(ranks))
+                reciprocal_ranks.append(1 / ranks[0] if ranks else 0.0)
+            print(
+                f"{name:<18} | {_percentile(expand_ms, 50):>7.3f} ms | {_percentile(expand_ms, 95):>7.3f} ms | "
+                f"{_percentile(total_ms, 50):>11.2f} ms | {_percentile(total_ms, 95):>6.1f} ms | "
+                f"{np.mean(hits):>8.3f} | {np.mean(reciprocal_ranks):.3f}"
+            )
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+
+def bench_context(args):
+    import contextlib
+    import io
+    import rag_query_handler
+    from rag_query_handler import TextRAGHandler
+    from context_packer import ContextPacker, minhash
+    from meeting_index import MEETING_INDEX_NAME
+
+    stub = None
+    os.environ.setdefault("TOGETHER_API_KEY", "stub")
+    rag_query_handler.SEARCH_MODE = args.search_mode
+    handler = TextRAGHandler(args.vector_store_dir)
+    if args.llm_url:
+        handler.llm_client.api_url = args.llm_url
+    else:
+        stub = subprocess.Popen([
+            sys.executable, "stub_llm_server.py", "--port", str(args.stub_port),
+            "--delay", str(args.llm_delay), "--prefill", str(args.prefill)
+        ])
+        handler.llm_client.api_url = f"http://127.0.0.1:{args.stub_port}/v1/chat/completions"
+        _wait_for(f"http://127.0.0.1:{args.stub_port}/docs", timeout=30)
+
+    try:
+        index = handler.vector_stores[MEETING_INDEX_NAME]
+        rng = np.random.default_rng(0)
+        queries = [(query, {index.chunks.text(row) for row in relevant})
+                   for query, _, relevant in _exact_term_queries(index, index.lexical, args.queries, rng)]
+        counter = handler.context_packer
+        # None sends every retrieved chunk, as before the packer.
+        packers = [("all chunks", None)]
+        packers += [(f"packed {budget}", ContextPacker(counter.tokenizer_name, budget=budget)) for budget in args.budgets]
+        for _, packer in packers[1:]:
+            packer.tokenizer = counter.tokenizer
+        counter.pack(["warm up"])
+        handler.embedding_model.embed_query("warm up")
+
+        answers = {query: [minhash(text) for text in relevant] for query, relevant in queries}
+        retrieved = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for query, relevant in queries:
+                stores = handler.vector_stores
+                docs = handler._retrieve(query, handler._plan_search(query, stores), stores, args.top_k)
+                retrieved.append((query, relevant, docs))
+
+        if not args.llm_url:
+            print(f"The stub LLM takes {args.llm_delay}s plus {args.prefill}s per 1000 prompt tokens.")
+        token_kind = "tokenizer" if counter.exact else "estimated"
+        print(f"{len(queries)} exact-term queries, {args.search_mode} retrieval, top_k={args.top_k}; prompt tokens: {token_kind}\n")
+        print(f"{'context':<14} | {'chunks':>6} | {'prompt tokens':>13} | {'p95':>6} | {'pack ms':>7} | "
+              f"{'LLM p50':>9} | {'LLM p95':>9} | answer chunk kept")
+        for name, packer in packers:
+            handler.context_packer = packer or counter
+            chunks, tokens, pack_ms, llm_ms, kept = [], [], [], [], []
+            for query, relevant, docs in retrieved:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    top_docs = handler._pack_context(query, docs) if packer else docs
+                    pack_ms.append((time.perf_counter() - start) * 1000)
+                    context = handler._build_context(top_docs)
+                    start = time.perf_counter()
+                    handler._query_with_context(query, context)
+                    llm_ms.append((time.perf_counter() - start) * 1000)
+                chunks.append(len(top_docs))
+                tokens.append(counter.count_messages(handler._context_messages(query, context)))
+                # A near-duplicate of the answer chunk carries the same answer.
+                kept.append(any(
+                    doc.page_content in relevant or (minhash(doc.page_content) == answer).mean() >= counter.threshold
+                    for doc in top_docs for answer in answers[query]
+                ))
+            print(
+                f"{name:<14} | {np.mean(chunks):>6.1f} | {np.mean(tokens):>13.0f} | {_percentile(tokens, 95):>6.0f} | "
+                f"{_percentile(pack_ms, 50):>7.2f} | {_percentile(llm_ms, 50):>6.0f} ms | {_percentile(llm_ms, 95):>6.0f} ms | "
+                f"{np.mean(kept):.3f}"
+            )
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+
+def _overview_queries(handler, count):
+    """Overview questions about the meetings that have a summary, phrased the ways users ask them."""
+    from query_expansion import MONTHS, ordinal, ordinal_words
+
+    entries = [entry for entry in handler.store_registry.catalog.entries if entry["meeting"] in handler.summary_index.by_meeting]
+    templates = [
+        lambda entry: f"What happened in the {ordinal(entry['meeting'])} BoG meeting?",
+        lambda entry: f"Give me an overview of BoG {entry['meeting']}",
+        lambda entry: f"Summarize the {ordinal_words(entry['meeting'])} meeting of the Board",
+        lambda entry: f"What were the key decisions of the {ordinal(entry['meeting'])} meeting?",
+    ]
+    queries = []
+    for i in range(count if entries else 0):
+        entry = entries[i % len(entries)]
+        date = entry["date"]
+        if i % (len(templates) + 1) == len(templates) and date > 0:
+            queries.append(f"Tell me about the meeting held on {date % 100} {MONTHS[date // 100 % 100 - 1]} {date // 10000}")
+        else:
+            queries.append(templates[i % len(templates)](entry))
+    return queries
+
+
+def bench_summary(args):
+    import contextlib
+    import io
+    import rag_query_handler
+    from rag_query_handler import TextRAGHandler
+    from answer_cache import SemanticAnswerCache
+
+    stub = None
+    os.environ.setdefault("TOGETHER_API_KEY", "stub")
+    rag_query_handler.SEARCH_MODE = args.search_mode
+    handler = TextRAGHandler(args.vector_store_dir)
+    handler.query_expansion = args.expansion
+    if args.llm_url:
+        handler.llm_client.api_url = args.llm_url
+    else:
+        stub = subprocess.Popen([
+            sys.executable, "stub_llm_server.py", "--port", str(args.stub_port),
+            "--delay", str(args.llm_delay), "--prefill", str(args.prefill)
+        ])
+        handler.llm_client.api_url = f"http://127.0.0.1:{args.stub_port}/v1/chat/completions"
+        _wait_for(f"http://127.0.0.1:{args.stub_port}/docs", timeout=30)
+
+    # Prompt tokens and duration of each answering call
+    calls = []
+    log_llm_call = handler._log_llm_call
+
+    def record(messages, start):
+        calls.append((handler.context_packer.count_messages(messages), (time.perf_counter() - start) * 1000))
+        log_llm_call(messages, start)
+
+    handler._log_llm_call = record
+    pack_context = handler._pack_context
+
+    try:
+        queries = _overview_queries(handler, args.queries)
+        if not queries:
+            print(f"No meeting in '{args.vector_store_dir}' has a summary; run create_vector_embedding.py first")
+            return
+        handler.embedding_model.embed_query("warm up")
+        handler.context_packer.pack(["warm up"])
+
+        modes = [
+            # Every retrieved chunk in the prompt, as before the context packer
+            ("full, all chunks", False, lambda query, docs, budget=None: docs),
+            ("full, packed", False, pack_context),
+            ("summary route", True, pack_context),
+        ]
+        if not args.llm_url:
+            print(f"The stub LLM takes {args.llm_delay}s plus {args.prefill}s per 1000 prompt tokens.")
+        print(f"{len(queries)} overview questions about {len(handler.summary_index)} summarized minutes; "
+              f"{args.search_mode} retrieval, expansion={args.expansion}, top_k={args.top_k}\n")
+        print(f"{'path':<17} | {'routed':>6} | {'prompt tokens':>13} | {'p95':>6} | {'before LLM p50':>14} | "
+              f"{'LLM p50':>9} | {'end-to-end p50':>14} | {'p95':>9}")
+        for name, route, pack in modes:
+            rag_query_handler.SUMMARY_ROUTE = route
+            handler._pack_context = pack
+            routed, tokens, before_ms, llm_ms, total_ms = [], [], [], [], []
+            for query in queries:
+                # A fresh answer cache, so every query takes its path end to end
+                handler.answer_cache = SemanticAnswerCache()
+                calls.clear()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    routed.append("summaries" in handler._plan_search(query, handler.vector_stores))
+                    start = time.perf_counter()
+                    handler.handle_input(query, top_k=args.top_k)
+                    total_ms.append((time.perf_counter() - start) * 1000)
+                prompt_tokens, call_ms = calls[-1]
+                tokens.append(prompt_tokens)
+                llm_ms.append(call_ms)
+                before_ms.append(total_ms[-1] - sum(ms for _, ms in calls))
+            print(
+                f"{name:<17} | {np.mean(routed):>6.2f} | {np.mean(tokens):>13.0f} | {_percentile(tokens, 95):>6.0f} | "
+                f"{_percentile(before_ms, 50):>11.1f} ms | {_percentile(llm_ms, 50):>6.0f} ms | "
+                f"{_percentile(total_ms, 50):>11.0f} ms | {_percentile(total_ms, 95):>6.0f} ms"
+            )
+    finally:
+        handler._pack_context = pack_context
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+
+# Runs in a fresh interpreter per measurement so each load starts cold.
+_DOCSTORE_PROBE = """
+import json, os, sys, time
+import numpy as np
+from langchain.vectorstores import FAISS
+from chunk_store import load_faiss_store
+
+def rss():
+    # Private resident memory: file-backed pages (the mmapped chunk store) are shared page cache.
+    with open("/proc/self/statm") as f:
+        resident, shared = (int(field) for field in f.read().split()[1:3])
+    return (resident - shared) * os.sysconf("SC_PAGE_SIZE")
+
+path, layout, k = sys.argv[1], sys.argv[2], int(sys.argv[3])
+before = rss()
+start = time.perf_counter()
+if layout == "pickle":
+    store = FAISS.load_local(path, embeddings=None, allow_dangerous_deserialization=True)
+else:
+    store = load_faiss_store(path, None)
+load_ms = (time.perf_counter() - start) * 1000
+loaded = rss()
+rows = np.random.default_rng(0).choice(store.index.ntotal, min(k, store.index.ntotal), replace=False)
+# One warm-up lookup so neither layout is charged for first-use setup (Document validation, page faults of the id map).
+store.docstore.search(store.index_to_docstore_id[0])
+loaded = rss()
+start = time.perf_counter()
+docs = [store.docstore.search(store.index_to_docstore_id[int(row)]) for row in rows]
+fetch_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"load_ms": load_ms, "load_rss": loaded - before, "fetch_ms": fetch_ms, "fetch_rss": rss() - loaded}))
+"""
+
+
+def _probe_docstore(path, layout, k):
+    output = subprocess.run(
+        [sys.executable, "-c", _DOCSTORE_PROBE, path, layout, str(k)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_docstore(args):
+    from chunk_store import CHUNK_STORE_FILES, PICKLE_FILE, convert_store, is_chunk_store
+
+    source = os.path.join(args.vector_store_dir, args.store)
+    if not os.path.isfile(os.path.join(source, PICKLE_FILE)):
+        print(f"'{source}' has no {PICKLE_FILE} to compare against")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickled = os.path.join(tmp, "pickle")
+        columnar = os.path.join(tmp, "chunk_store")
+        for target in (pickled, columnar):
+            os.makedirs(target)
+            for name in ("index.faiss", PICKLE_FILE):
+                shutil.copy(os.path.join(source, name), target)
+        if is_chunk_store(source):
+            for name in CHUNK_STORE_FILES:
+                shutil.copy(os.path.join(source, name), columnar)
+        else:
+            convert_store(columnar)
+        os.remove(os.path.join(columnar, PICKLE_FILE))
+
+        print(f"{'docstore':<12} | {'on disk':>9} | {'cold load':>10} | {'private RSS':>11} | {f'fetch {args.k} docs':>14} | {'private RSS':>11}")
+        for layout, path, files in (("pickle", pickled, (PICKLE_FILE,)), ("chunk_store", columnar, CHUNK_STORE_FILES)):
+            runs = [_probe_docstore(path, layout, args.k) for _ in range(args.repeat)]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            disk = sum(os.path.getsize(os.path.join(path, name)) for name in files)
+            print(
+                f"{layout:<12} | {disk / 2**20:>6.2f} MB | {median['load_ms']:>7.1f} ms | {median['load_rss'] / 2**20:>8.2f} MB | "
+                f"{median['fetch_ms']:>11.2f} ms | {median['fetch_rss'] / 2**20:>8.2f} MB"
+            )
+    print("\nLoad figures include reading index.faiss, which both layouts share.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store-dir", default="vector_store")
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--repeat", type=int, default=5)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rerank = subparsers.add_parser("rerank", help="per-document re-embedding vs stored-vector reranking")
+    rerank.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    rerank.set_defaults(func=bench_rerank)
+
+    fanout = subparsers.add_parser("fanout", help="per-store similarity_search vs embed-once parallel fan-out")
+    fanout.add_argument("--top-k", type=int, default=200)
+    fanout.add_argument("--workers", type=int, default=8)
+    fanout.set_defaults(func=bench_fanout)
+
+    ann = subparsers.add_parser("ann", help="recall@k, QPS and memory of flat / IVF-PQ / HNSW indexes")
+    ann.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="corpus size multipliers")
+    ann.add_argument("--queries", type=int, default=200)
+    ann.add_argument("-k", type=int, default=10)
+    ann.set_defaults(func=bench_ann)
+
+    compress = subparsers.add_parser("compress", help="per-worker memory vs recall of float16 / PQ vectors with exact rescoring")
+    compress.add_argument("--store", default="meeting_index", help="store whose vectors seed the synthetic corpora")
+    compress.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50], help="corpus size multipliers")
+    compress.add_argument("--pq-m", type=int, nargs="+", default=[48, 24], help="PQ sub-quantizers (bytes per vector)")
+    compress.add_argument("--workers", type=int, default=4, help="API worker processes to total the memory for")
+    compress.add_argument("--queries", type=int, default=200)
+    compress.add_argument("-k", type=int, default=10)
+    compress.set_defaults(func=bench_compress)
+
+    load = subparsers.add_parser("load", help="/query throughput and tail latency against a stub LLM server")
+    load.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    load.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    load.add_argument("--url", help="benchmark an already running API instead of starting one")
+    load.add_argument("--api-port", type=int, default=8100)
+    load.add_argument("--stub-port", type=int, default=9000)
+    load.add_argument("--llm-delay", type=float, default=0.5)
+    load.add_argument("--startup-timeout", type=float, default=300)
+    load.set_defaults(func=bench_load)
+
+    stream = subparsers.add_parser("stream", help="time to first byte/token of /query/stream vs blocking /query")
+    stream.add_argument("--requests", type=int, default=10)
+    stream.add_argument("--url", help="benchmark an already running API instead of starting one")
+    stream.add_argument("--api-port", type=int, default=8100)
+    stream.add_argument("--stub-port", type=int, default=9000)
+    stream.add_argument("--llm-delay", type=float, default=2.0, help="seconds the stub takes per completion")
+    stream.add_argument("--startup-timeout", type=float, default=300)
+    stream.set_defaults(func=bench_stream)
+
+    normalize = subparsers.add_parser("normalize", help="per-MB throughput of the text normalizer before/after")
+    normalize.add_argument("--summaries-dir", default="summaries")
+    normalize.set_defaults(func=bench_normalize)
+
+    items = subparsers.add_parser("items", help="item-number questions: vector search vs the item table")
+    items.add_argument("--queries", type=int, default=200)
+    items.add_argument("--top-k", type=int, default=100)
+    items.set_defaults(func=bench_items)
+
+    hybrid = subparsers.add_parser("hybrid", help="hit rate, latency and context size: vector top-k vs BM25 + vector fusion")
+    hybrid.add_argument("--queries", type=int, default=200, help="queries per query set")
+    hybrid.add_argument("--vector-k", type=int, nargs="+", default=[200, 100, 20])
+    hybrid.add_argument("--hybrid-k", type=int, nargs="+", default=[20, 10])
+    hybrid.add_argument("--candidates", type=int, default=100, help="candidates from each ranking before fusion")
+    hybrid.set_defaults(func=bench_hybrid)
+
+    expansion = subparsers.add_parser("expansion", help="local query expansion vs LLM amplification: latency and hit rate")
+    expansion.add_argument("--queries", type=int, default=200)
+    expansion.add_argument("--top-k", type=int, default=100)
+    expansion.add_argument("--llm-url", help="a real chat-completions endpoint (uses TOGETHER_API_KEY) instead of the stub")
+    expansion.add_argument("--stub-port", type=int, default=9000)
+    expansion.add_argument("--llm-delay", type=float, default=1.5, help="seconds the stub takes per completion")
+    expansion.set_defaults(func=bench_expansion)
+
+    context = subparsers.add_parser("context", help="prompt tokens and LLM latency: every retrieved chunk vs the token-budgeted packer")
+    context.add_argument("--budgets", type=int, nargs="+", default=[4000, 2000])
+    context.add_argument("--queries", type=int, default=100)
+    context.add_argument("--top-k", type=int, default=100)
+    context.add_argument("--search-mode", choices=["vector", "hybrid"], default="vector")
+    context.add_argument("--llm-url", help="a real chat-completions endpoint (uses TOGETHER_API_KEY) instead of the stub")
+    context.add_argument("--stub-port", type=int, default=9000)
+    context.add_argument("--llm-delay", type=float, default=0.5, help="seconds the stub takes per completion")
+    context.add_argument("--prefill", type=float, default=0.2, help="seconds the stub adds per 1000 prompt tokens")
+    context.set_defaults(func=bench_context)
+
+    summary = subparsers.add_parser("summary", help="overview questions: full retrieval path vs the meeting-summary route")
+    summary.add_argument("--queries", type=int, default=40)
+    summary.add_argument("--top-k", type=int, default=100)
+    summary.add_argument("--search-mode", choices=["vector", "hybrid"], default="hybrid")
+    summary.add_argument("--expansion", choices=["local", "llm"], default="local",
+                         help="how the full path expands the query (llm adds the amplification call)")
+    summary.add_argument("--llm-url", help="a real chat-completions endpoint (uses TOGETHER_API_KEY) instead of the stub")
+    summary.add_argument("--stub-port", type=int, default=9000)
+    summary.add_argument("--llm-delay", type=float, default=0.5, help="seconds the stub takes per completion")
+    summary.add_argument("--prefill", type=float, default=0.2, help="seconds the stub adds per 1000 prompt tokens")
+    summary.set_defaults(func=bench_summary)
+
+    catalog = subparsers.add_parser("catalog", help="query routing: regex over folder names vs the meeting catalog")
+    catalog.add_argument("--queries", type=int, default=200, help="month-range queries")
+    catalog.set_defaults(func=bench_catalog)
+
+    docstore = subparsers.add_parser("docstore", help="cold load time and RSS of the pickled docstore vs the chunk store")
+    docstore.add_argument("--store", default="db_faiss")
+    docstore.add_argument("-k", type=int, default=100, help="documents materialized after loading")
+    docstore.set_defaults(func=bench_docstore)
+
+    startup = subparsers.add_parser("startup", help="time to a healthy API and first query: eager vs lazy model loading")
+    startup.add_argument("--api-port", type=int, default=8100)
+    startup.add_argument("--stub-port", type=int, default=9000)
+    startup.add_argument("--llm-delay", type=float, default=0.0)
+    startup.add_argument("--idle", type=float, default=5.0, help="seconds between readiness and the first query when prewarming")
+    startup.add_argument("--startup-timeout", type=float, default=300)
+    startup.set_defaults(func=bench_startup)
+
+    embeddings = subparsers.add_parser("embeddings", help="embedding backends: agreement with torch, throughput, query latency")
+    embeddings.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"], help="the first is the reference")
+    embeddings.add_argument("--summaries-dir", default="summaries")
+    embeddings.add_argument("--chunks", type=int, default=256)
+    embeddings.add_argument("--queries", type=int, default=100)
+    embeddings.add_argument("--batch-size", type=int, default=64)
+    embeddings.add_argument("-k", type=int, default=10)
+    embeddings.add_argument("--min-cosine", type=float, default=0.99, help="exit with status 1 below this agreement")
+    embeddings.set_defaults(func=bench_embeddings)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Columnar, memory-mapped chunk text and metadata for a FAISS index.
+
+Row i of a chunk store is FAISS id i. A store directory holds:
+
+    chunks.text          every chunk's UTF-8 text, back to back
+    chunks.rows.npy      one fixed-width record per row: byte range of its
+                         text, page range, codes into the string tables and
+                         the range of its item keys in chunks.items.npy
+    chunks.items.npy     item key codes (the `items` metadata of each chunk)
+    chunks.strings.json  string tables and any metadata without a column
+    bm25.npz             BM25 inverted index over the same rows (lexical_index.py)
+
+The text blob and both arrays are opened with mmap, so loading a store reads
+one small JSON file, the page cache shares the bytes between API workers,
+and a Document is only built for the rows a query returns. This replaces
+the pickled LangChain InMemoryDocstore (index.pkl); convert existing stores
+without re-embedding (this also adds bm25.npz to chunk stores without one) with:
+
+    python chunk_store.py --convert vector_store
+"""
+import argparse
+import json
+import mmap
+import os
+import numpy as np
+from langchain.docstore.document import Document
+from index_factory import load_index_params, read_index, write_index
+from lexical_index import LexicalIndex, LEXICAL_FILE, write_lexical_index
+
+TEXT_FILE = "chunks.text"
+ROWS_FILE = "chunks.rows.npy"
+ITEMS_FILE = "chunks.items.npy"
+STRINGS_FILE = "chunks.strings.json"
+CHUNK_STORE_FILES = (TEXT_FILE, ROWS_FILE, ITEMS_FILE, STRINGS_FILE)
+FAISS_INDEX_FILE = "index.faiss"
+PICKLE_FILE = "index.pkl"
+
+ROW_DTYPE = np.dtype([
+    ("start", np.int64), ("end", np.int64),
+    ("source", np.int32), ("item_no", np.int32),
+    ("page", np.int32), ("page_end", np.int32),
+    ("items_start", np.int32), ("items_end", np.int32),
+])
+STRING_COLUMNS = ("source", "item_no")
+COLUMN_KEYS = STRING_COLUMNS + ("page", "page_end", "items")
+
+
+def is_chunk_store(folder_path):
+    return os.path.isfile(os.path.join(folder_path, STRINGS_FILE))
+
+
+def _int(value):
+    return -1 if value is None else int(value)
+
+
+def write_chunk_store(out_dir, docs):
+    """Write `docs` (row i = FAISS id i) as a chunk store in `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    tables = {name: [] for name in STRING_COLUMNS + ("items",)}
+    codes = {name: {} for name in tables}
+
+    def code(table, value):
+        if value is None:
+            return -1
+        if value not in codes[table]:
+            codes[table][value] = len(tables[table])
+            tables[table].append(value)
+        return codes[table][value]
+
+    rows = np.zeros(len(docs), dtype=ROW_DTYPE)
+    item_codes = []
+    extra = {}
+    offset = 0
+    text_path = os.path.join(out_dir, TEXT_FILE)
+    with open(text_path + ".tmp", "wb") as f:
+        for row, doc in enumerate(docs):
+            data = doc.page_content.encode("utf-8")
+            f.write(data)
+            metadata = doc.metadata
+            items = [code("items", key) for key in metadata.get("items") or ()]
+            rows[row] = (
+                offset, offset + len(data),
+                code("source", metadata.get("source")), code("item_no", metadata.get("item_no")),
+                _int(metadata.get("page")), _int(metadata.get("page_end")),
+                len(item_codes), len(item_codes) + len(items),
+            )
+            item_codes.extend(items)
+            offset += len(data)
+            # Anything the columns cannot hold is kept per row, so no metadata is lost.
+            leftover = {key: value for key, value in metadata.items() if key not in COLUMN_KEYS}
+            if leftover:
+                extra[str(row)] = leftover
+
+    np.save(os.path.join(out_dir, ROWS_FILE + ".tmp.npy"), rows)
+    np.save(os.path.join(out_dir, ITEMS_FILE + ".tmp.npy"), np.asarray(item_codes, dtype=np.int32))
+    os.replace(text_path + ".tmp", text_path)
+    os.replace(os.path.join(out_dir, ROWS_FILE + ".tmp.npy"), os.path.join(out_dir, ROWS_FILE))
+    os.replace(os.path.join(out_dir, ITEMS_FILE + ".tmp.npy"), os.path.join(out_dir, ITEMS_FILE))
+    write_lexical_index(out_dir, [doc.page_content for doc in docs])
+
+    # Written last: load() checks the row count and text size recorded here against the other files.
+    strings_path = os.path.join(out_dir, STRINGS_FILE)
+    with open(strings_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"rows": len(docs), "text_bytes": offset, "tables": tables, "extra": extra}, f, ensure_ascii=False)
+    os.replace(strings_path + ".tmp", strings_path)
+
+
+class ChunkStore:
+    """Read side of a chunk store; also usable as a LangChain docstore (search(id) -> Document)."""
+
+    def __init__(self, rows, items, text, tables, extra):
+        self.rows = rows
+        self.items = items
+        self._text = text
+        self.tables = tables
+        self.extra = extra
+
+    @classmethod
+    def load(cls, store_dir):
+        with open(os.path.join(store_dir, STRINGS_FILE), encoding="utf-8") as f:
+            strings = json.load(f)
+        rows = np.load(os.path.join(store_dir, ROWS_FILE), mmap_mode="r")
+        items = np.load(os.path.join(store_dir, ITEMS_FILE), mmap_mode="r")
+        text = b""
+        if strings["text_bytes"]:
+            with open(os.path.join(store_dir, TEXT_FILE), "rb") as f:
+                text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if rows.shape[0] != strings["rows"] or len(text) != strings["text_bytes"]:
+            raise ValueError(f"Chunk store files in '{store_dir}' are out of sync (partially written?)")
+        return cls(rows, items, text, strings["tables"], strings.get("extra", {}))
+
+    def __len__(self):
+        return self.rows.shape[0]
+
+    def text(self, row):
+        start, end = self.rows[row].item()[:2]
+        return self._text[start:end].decode("utf-8")
+
+    def metadata(self, row):
+        # One .item() call turns the fixed-width record into plain ints.
+        source, item_no, page, page_end, items_start, items_end = self.rows[row].item()[2:]
+        metadata = {}
+        if source >= 0:
+            metadata["source"] = self.tables["source"][source]
+        if item_no >= 0:
+            metadata["item_no"] = self.tables["item_no"][item_no]
+        if page >= 0:
+            metadata["page"] = page
+        if page_end >= 0:
+            metadata["page_end"] = page_end
+        if items_end > items_start:
+            metadata["items"] = [self.tables["items"][code] for code in self.items[items_start:items_end].tolist()]
+        metadata.update(self.extra.get(str(row), {}))
+        return metadata
+
+    def document(self, row):
+        row = int(row)
+        return Document(page_content=self.text(row), metadata=self.metadata(row))
+
+    def search(self, doc_id):
+        return self.document(doc_id)
+
+    def iter_documents(self):
+        for row in range(len(self)):
+            yield self.document(row)
+
+
+def save_faiss_store(out_dir, index, docs, params=None, vectors=None, batch_size=None):
+    """Write a FAISS index and the chunk store for its rows; drops a stale index.pkl.
+
+    `params` / `vectors` are passed to index_factory.write_index, which keeps a
+    full-precision copy of the vectors for indexes built with rescoring.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    write_index(out_dir, FAISS_INDEX_FILE, index, params or {}, vectors, batch_size=batch_size)
+    write_chunk_store(out_dir, docs)
+    pickle_path = os.path.join(out_dir, PICKLE_FILE)
+    if os.path.isfile(pickle_path):
+        os.remove(pickle_path)
+
+
+class FaissChunkStore:
+    """The read-only part of LangChain's FAISS store, over a chunk store.
+
+    Exposes index / docstore / index_to_docstore_id and the similarity_search
+    methods callers use, without importing langchain_community at startup.
+    """
+
+    def __init__(self, embedding_function, index, docstore, lexical=None):
+        self.embedding_function = embedding_function
+        self.index = index
+        self.docstore = docstore
+        self.lexical = lexical
+        # FAISS ids are the chunk rows, so a range serves as the id -> docstore id map.
+        self.index_to_docstore_id = range(len(docstore))
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4):
+        query = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        scores, rows = self.index.search(query, min(k, self.index.ntotal))
+        return [(self.docstore.document(row), float(score)) for score, row in zip(scores[0], rows[0]) if row >= 0]
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search(self, query, k=4):
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k)
+
+
+def load_faiss_store(store_dir, embeddings):
+    index = read_index(store_dir, FAISS_INDEX_FILE, load_index_params(store_dir))
+    chunks = ChunkStore.load(store_dir)
+    if index.ntotal != len(chunks):
+        raise ValueError(f"'{store_dir}' has {index.ntotal} vectors but {len(chunks)} chunks")
+    return FaissChunkStore(embeddings, index, chunks, LexicalIndex.load(store_dir, len(chunks)))
+
+
+def convert_store(folder_path, delete_pickle=False):
+    """Write a chunk store next to a pickled LangChain store (index.pkl) in `folder_path`."""
+    from langchain.vectorstores import FAISS
+
+    store = FAISS.load_local(folder_path, embeddings=None, allow_dangerous_deserialization=True)
+    docs = [store.docstore.search(store.index_to_docstore_id[position]) for position in range(store.index.ntotal)]
+    write_chunk_store(folder_path, docs)
+    if delete_pickle:
+        os.remove(os.path.join(folder_path, PICKLE_FILE))
+    return len(docs)
+
+
+def add_lexical_index(folder_path):
+    """Write bm25.npz for a chunk store written before BM25 existed."""
+    chunks = ChunkStore.load(folder_path)
+    write_lexical_index(folder_path, [chunks.text(row) for row in range(len(chunks))])
+    return len(chunks)
+
+
+def convert_meeting_index(folder_path):
+    """Replace the chunks.jsonl of a meeting index written before chunk stores existed."""
+    jsonl_path = os.path.join(folder_path, "chunks.jsonl")
+    with open(jsonl_path, encoding="utf-8") as f:
+        docs = [Document(page_content=chunk["text"], metadata=chunk["metadata"]) for chunk in map(json.loads, f)]
+    write_chunk_store(folder_path, docs)
+    os.remove(jsonl_path)
+    return len(docs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--convert", default="vector_store", help="directory holding the vector stores to convert")
+    parser.add_argument("--delete-pickles", action="store_true", help="remove each index.pkl once converted")
+    args = parser.parse_args()
+
+    for folder_name in sorted(os.listdir(args.convert)):
+        folder_path = os.path.join(args.convert, folder_name)
+        try:
+            if os.path.isfile(os.path.join(folder_path, "chunks.jsonl")):
+                count = convert_meeting_index(folder_path)
+            elif os.path.isfile(os.path.join(folder_path, PICKLE_FILE)) and not is_chunk_store(folder_path):
+                count = convert_store(folder_path, args.delete_pickles)
+            elif is_chunk_store(folder_path) and not os.path.isfile(os.path.join(folder_path, LEXICAL_FILE)):
+                count = add_lexical_index(folder_path)
+            else:
+                continue
+            print(f"✅ Converted {folder_name} ({count} chunks)")
+        except Exception as e:
+            print(f"❌ Failed to convert {folder_name}: {e}")
@@ -0,0 +1,147 @@
+"""Token-budgeted context packing shared by the RAG handler and the Knowledge Graph app.
+
+Retrieval hands over up to 100 ranked chunks, and many of them are the same
+text: a meeting is in its own store and in db_faiss, and neighbouring chunks
+overlap. The packer walks the chunks best first, drops any whose MinHash
+signature says it is a near-duplicate of a better one, and keeps adding
+chunks while they fit the token budget.
+
+Tokens are counted with the tokenizer of the model that reads the prompt
+(its tokenizer.json from the Hub cache), not a words x 1.3 guess. When the
+tokenizer cannot be loaded the packer falls back to ~4 characters a token
+and says so once.
+
+    CONTEXT_TOKEN_BUDGET=4000   context tokens per prompt
+    CONTEXT_TOKENIZER           Hub model whose tokenizer.json counts tokens
+                                (default: the LLM the caller talks to)
+    CONTEXT_DEDUP_THRESHOLD=0.8 estimated Jaccard similarity of word 3-grams
+                                at which a chunk counts as a duplicate
+"""
+import os
+import re
+import zlib
+import numpy as np
+from model_loader import LazyModel, MODEL_CACHE_DIR, hub_file
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "4000"))
+CONTEXT_TOKENIZER = os.getenv("CONTEXT_TOKENIZER") or None
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+CHARS_PER_TOKEN = 4
+
+# Universal hashing modulo a Mersenne prime; a * crc32 + b stays below 2**63, so uint64 never overflows.
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)[:, None]
+_WORD = re.compile(r"\w+")
+
+
+def minhash(text, size=SHINGLE_SIZE):
+    """MinHash signature of the word `size`-grams of `text`."""
+    words = _WORD.findall(text.lower())
+    shingles = {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_A * hashes + _B) % _PRIME).min(axis=1)
+
+
+def _load_tokenizer(model_name, cache_folder):
+    from tokenizers import Tokenizer
+    # A cached tokenizer.json is used without asking the Hub whether it changed.
+    return Tokenizer.from_file(hub_file(model_name, "tokenizer.json", cache_folder))
+
+
+class PackedContext:
+    def __init__(self, indices, tokens, duplicates, over_budget, exact):
+        self.indices = indices          # chunks kept, best first
+        self.tokens = tokens            # context tokens, separators included
+        self.duplicates = duplicates    # chunks dropped as near-duplicates
+        self.over_budget = over_budget  # chunks that did not fit
+        self.exact = exact              # False when tokens are the character estimate
+
+    def summary(self):
+        count = "tokens" if self.exact else "tokens (estimated)"
+        return (f"{len(self.indices)} chunks, {self.tokens} {count}; dropped {self.duplicates} near-duplicates "
+                f"and {self.over_budget} over budget")
+
+
+class ContextPacker:
+    def __init__(self, tokenizer_name=None, budget=CONTEXT_TOKEN_BUDGET, threshold=CONTEXT_DEDUP_THRESHOLD,
+                 cache_folder=MODEL_CACHE_DIR):
+        self.tokenizer_name = CONTEXT_TOKENIZER or tokenizer_name
+        self.budget = budget
+        self.threshold = threshold
+        self.tokenizer = LazyModel(f"{self.tokenizer_name} tokenizer", lambda: _load_tokenizer(self.tokenizer_name, cache_folder))
+        self._failed = False
+
+    def _tokenizer(self):
+        # LazyModel retries a failed load on every get(); a gated or unreachable Hub repo would then cost
+        # a download attempt per count, so the first failure switches to the estimate for good.
+        if self.tokenizer_name is None or self._failed:
+            return None
+        try:
+            return self.tokenizer.get()
+        except Exception as e:
+            self._failed = True
+            print(f"[!] No tokenizer for {self.tokenizer_name} ({e}); estimating {CHARS_PER_TOKEN} characters per token")
+            return None
+
+    @property
+    def exact(self):
+        return self._tokenizer() is not None
+
+    def count_many(self, texts):
+        tokenizer = self._tokenizer()
+        if tokenizer is None:
+            return [-(-len(text) // CHARS_PER_TOKEN) for text in texts]
+        return [len(encoding.ids) for encoding in tokenizer.encode_batch(list(texts), add_special_tokens=False)]
+
+    def count(self, text):
+        return self.count_many([text])[0]
+
+    def count_messages(self, messages):
+        """Prompt tokens of a chat request (message contents only; chat-template tokens are not counted)."""
+        return sum(self.count_many([message["content"] for message in messages]))
+
+    def pack(self, entries, texts=None, scores=None, reserved=0, budget=None, separator="\n\n"):
+        """Choose which of `entries` (prompt strings, best first unless `scores` is given) go in the context.
+
+        Near-duplicates are judged on `texts` (defaults to `entries`), so a
+        citation header does not make two copies of a chunk look different.
+        `reserved` tokens of the budget (self.budget unless `budget` is given)
+        are kept for the rest of the prompt.
+        """
+        entries = list(entries)
+        texts = entries if texts is None else list(texts)
+        order = range(len(entries)) if scores is None else np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
+        budget = (self.budget if budget is None else budget) - reserved
+
+        # Duplicates are dropped before counting, so only the surviving chunks are tokenized.
+        candidates, signatures, seen = [], [], set()
+        duplicates = 0
+        for i in map(int, order):
+            text = texts[i]
+            if text in seen:
+                duplicates += 1
+                continue
+            seen.add(text)
+            signature = minhash(text)
+            if signatures and (np.asarray(signatures) == signature).mean(axis=1).max() >= self.threshold:
+                duplicates += 1
+                continue
+            candidates.append(i)
+            signatures.append(signature)
+
+        lengths = self.count_many([entries[i] for i in candidates])
+        separator_tokens = self.count(separator) if candidates else 0
+        indices = []
+        tokens = over_budget = 0
+        for i, length in zip(candidates, lengths):
+            cost = length + (separator_tokens if indices else 0)
+            if tokens + cost > budget:
+                over_budget += 1
+                continue
+            indices.append(i)
+            tokens += cost
+        return PackedContext(indices, tokens, duplicates, over_budget, self._tokenizer() is not None)
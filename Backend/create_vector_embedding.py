@@ -1,17 +1,35 @@
 import os
 import re
+import time
+import shutil
+import argparse
+import functools
+try:
+    import resource  # peak RSS reporting; not available on Windows
+except ImportError:
+    resource = None
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import numpy as np
 import nltk
-import wordninja
 import fitz  # PyMuPDF for PDF parsing
 from tqdm import tqdm
 from docx import Document as DocxDocument
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
-from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from meeting_index import build_meeting_index, MEETING_INDEX_NAME, ITEM_HEADING, item_key
+from index_factory import build_index, save_index_params, INDEX_TYPES
+from chunk_store import save_faiss_store, is_chunk_store
+from lexical_index import LEXICAL_FILE
+from query_expansion import save_vocabulary, VOCABULARY_FILE
+from meeting_catalog import save_catalog, CATALOG_FILE
+from meeting_summaries import refresh_summaries, SUMMARIES_DIR
+from ingest_manifest import IngestManifest, file_hash, chunk_hash
+from text_normalizer import clean_text as normalize_text, fix_spacing_in_chunk
+from embedding_backends import BACKENDS, EMBEDDING_BACKEND, load_embeddings, model_id
+from embedding_stage import EmbeddingStage, VectorSpool, EMBED_BATCH_SIZE, VECTOR_DTYPES
 
-# Ensure sentence tokenizer is available
-nltk.download('punkt')
 from nltk.tokenize import sent_tokenize
 
 # Configuration
@@ -23,63 +41,137 @@ CHUNK_OVERLAP = 200
 MIN_CHUNK_LENGTH = 300
 MAX_CHUNK_LENGTH = 2000
 COMBINED_INDEX_NAME = "db_faiss"
+SPOOL_FILE = "corpus_vectors.npy"
+SENTENCE_ENDINGS = (".", "!", "?", ":", ";", '"', "'", ")")
+STAGES = ("parse", "clean", "chunk", "embed", "index write")
 
+# Seconds spent per ingestion stage in this process; pool workers send theirs back with each file.
+stage_times = Counter()
+
+_open_stages = set()
+
+@contextmanager
+def timed(stage):
+    # Nested regions of the same stage are only counted once, by the outermost one.
+    if stage in _open_stages:
+        yield
+        return
+    _open_stages.add(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_times[stage] += time.perf_counter() - start
+        _open_stages.discard(stage)
+
+def timed_stage(stage):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@timed_stage("clean")
 def clean_text(text):
-    if not text:
-        return ""
-    text = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', text)
-    text = re.sub(r'(?<=\w)-\s+(?=\w)', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[•▪�]+', ' ', text)
-    text = re.sub(r'(?i)\b(?:page|pase)\s*\d+\b', '', text)
-    text = re.sub(r'_{2,}', '', text)
-    return text.strip()
-
-def fix_spacing_in_chunk(chunk):
-    if " " not in chunk:
-        return " ".join(wordninja.split(chunk))
-    words = chunk.split()
-    fixed_words = []
-    for word in words:
-        if len(word) > 15 and word.isalpha():
-            split = wordninja.split(word)
-            fixed_words.extend(split if len(split) > 1 else [word])
-        else:
-            fixed_words.append(word)
-    return " ".join(fixed_words)
+    return normalize_text(text)
+
+_RESOLUTION = re.compile(r'Resolution with respect to[:\-]?\s*(.+)', re.IGNORECASE)
 
 def detect_item_and_resolution(text):
-    item_match = re.search(r'Item No\.\s*\d+', text, re.IGNORECASE)
-    resolution_match = re.search(r'Resolution with respect to[:\-]?\s*(.+)', text, re.IGNORECASE)
+    item_match = ITEM_HEADING.search(text)
+    resolution_match = _RESOLUTION.search(text)
     return (
-        item_match.group(0) if item_match else None,
+        f"Item No. {item_match.group(1)}" if item_match else None,
         resolution_match.group(1).strip() if resolution_match else None
     )
 
-def split_text_into_chunks(text, metadata):
-    sentences = sent_tokenize(text)
-    chunks = []
+@timed_stage("chunk")
+def _finish_chunk(text, metadata, first_page, last_page, items):
+    fixed_chunk = fix_spacing_in_chunk(text.strip())
+    if not MIN_CHUNK_LENGTH <= len(fixed_chunk) <= MAX_CHUNK_LENGTH:
+        return None
+    if first_page is not None:
+        metadata = dict(metadata, page=first_page, page_end=last_page)
+    if items:
+        metadata = dict(metadata, item_no=f"Item No. {items[0][1]}", items=[key for key, _ in items])
+    return Document(page_content=fixed_chunk, metadata=metadata)
+
+# "Item No. 37.02" would otherwise be cut into two sentences after "No."
+_ITEM_NO_GAP = re.compile(r"(\b[il]?tem\s+no\s*\.)\s+(?=\d)", re.IGNORECASE)
+
+def ensure_punkt():
+    # Only reaches the network when the tokenizer data is missing, and never at import time.
+    try:
+        nltk.data.find("tokenizers/punkt")
+    except LookupError:
+        nltk.download("punkt", quiet=True)
+
+def tokenize_sentences(text):
+    return sent_tokenize(_ITEM_NO_GAP.sub(r"\1", text))
+
+def _split_at_items(sentence):
+    """Cut a sentence where agenda item headings start; yields (piece, (item key, number as written) or None)."""
+    matches = list(ITEM_HEADING.finditer(sentence))
+    if not matches:
+        yield sentence, None
+        return
+    if matches[0].start() > 0:
+        yield sentence[:matches[0].start()], None
+    for match, end in zip(matches, [m.start() for m in matches[1:]] + [len(sentence)]):
+        yield sentence[match.start():end], (item_key(match.group(1)), match.group(1))
+
+def iter_sentence_chunks(sentences, metadata):
+    """Yield chunk Documents as they fill from (sentence, page) pairs; page is None when the source has no pages.
+
+    A chunk is closed at each agenda item heading once it is long enough to
+    keep, so chunks follow item boundaries; the `items` metadata lists every
+    item (canonical key) whose text a chunk contains.
+    """
     current_chunk = ""
-
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-
-        if len(current_chunk) + len(sentence) + 1 <= CHUNK_SIZE:
-            current_chunk += " " + sentence
-        else:
-            fixed_chunk = fix_spacing_in_chunk(current_chunk.strip())
-            if MIN_CHUNK_LENGTH <= len(fixed_chunk) <= MAX_CHUNK_LENGTH:
-                chunks.append(Document(page_content=fixed_chunk, metadata=metadata))
-            current_chunk = sentence
+    first_page = last_page = None
+    current_item = None
+    items = []
+
+    for sentence, page in sentences:
+        for piece, heading in _split_at_items(sentence.strip()):
+            piece = piece.strip()
+            if not piece:
+                continue
+
+            if heading is not None:
+                if len(current_chunk.strip()) >= MIN_CHUNK_LENGTH:
+                    chunk = _finish_chunk(current_chunk, metadata, first_page, last_page, items)
+                    if chunk is not None:
+                        yield chunk
+                    current_chunk = ""
+                    first_page = last_page = None
+                    items = []
+                current_item = heading
+
+            if len(current_chunk) + len(piece) + 1 <= CHUNK_SIZE:
+                current_chunk += " " + piece
+                first_page = page if first_page is None else first_page
+                last_page = page
+            else:
+                chunk = _finish_chunk(current_chunk, metadata, first_page, last_page, items)
+                if chunk is not None:
+                    yield chunk
+                current_chunk = piece
+                first_page = last_page = page
+                items = []
+            if current_item is not None and current_item not in items:
+                items.append(current_item)
 
     if current_chunk.strip():
-        fixed_chunk = fix_spacing_in_chunk(current_chunk.strip())
-        if MIN_CHUNK_LENGTH <= len(fixed_chunk) <= MAX_CHUNK_LENGTH:
-            chunks.append(Document(page_content=fixed_chunk, metadata=metadata))
+        chunk = _finish_chunk(current_chunk, metadata, first_page, last_page, items)
+        if chunk is not None:
+            yield chunk
 
-    return chunks
+@timed_stage("chunk")
+def split_text_into_chunks(text, metadata):
+    return list(iter_sentence_chunks(((sentence, None) for sentence in tokenize_sentences(text)), metadata))
 
 def process_docx_paragraphs(docx_path):
     doc = DocxDocument(docx_path)
@@ -127,71 +219,290 @@ def process_docx_paragraphs(docx_path):
 
     return all_chunks
 
-def process_pdf_text(pdf_path):
-    doc = fitz.open(pdf_path)
-    file_name = os.path.basename(pdf_path)
-    all_chunks = []
-    full_text = ""
-
-    for page in doc:
-        text = clean_text(page.get_text("text"))
-        full_text += " " + text
+def iter_pdf_pages(pdf_path):
+    """Yield (page number, cleaned text) one page at a time."""
+    with fitz.open(pdf_path) as doc:
+        for page_no, page in enumerate(doc, start=1):
+            yield page_no, clean_text(page.get_text("text"))
+
+def iter_page_sentences(pages):
+    """Yield (sentence, page) pairs; a sentence cut by a page break is carried over and tagged with the page it starts on."""
+    remainder, remainder_page = "", None
+    for page_no, text in pages:
+        if not text:
+            continue
+        with timed("chunk"):
+            sentences = tokenize_sentences(f"{remainder} {text}" if remainder else text)
+        pages_of = [remainder_page if remainder else page_no] + [page_no] * (len(sentences) - 1)
+        remainder = ""
+        if sentences and not sentences[-1].endswith(SENTENCE_ENDINGS):
+            remainder, remainder_page = sentences.pop(), pages_of.pop()
+        yield from zip(sentences, pages_of)
+    if remainder:
+        yield remainder, remainder_page
 
-    meta = {"source": file_name}
-    all_chunks.extend(split_text_into_chunks(full_text.strip(), meta))
-    return all_chunks
+def process_pdf_text(pdf_path):
+    meta = {"source": os.path.basename(pdf_path)}
+    return list(iter_sentence_chunks(iter_page_sentences(iter_pdf_pages(pdf_path)), meta))
 
-def store_per_doc_embeddings(embedder):
-    files = [f for f in os.listdir(DATA_FOLDER) if f.lower().endswith(('.docx', '.pdf'))]
-    all_chunks = []
+def load_chunks(file_path):
+    # Whatever a file costs beyond cleaning and chunking is charged to parsing.
+    start = time.perf_counter()
+    nested = stage_times["clean"] + stage_times["chunk"]
+    chunks = []
+    if file_path.lower().endswith('.docx'):
+        chunks = process_docx_paragraphs(file_path)
+    elif file_path.lower().endswith('.pdf'):
+        chunks = process_pdf_text(file_path)
+    stage_times["parse"] += time.perf_counter() - start - (stage_times["clean"] + stage_times["chunk"] - nested)
+    return chunks
 
-    if not files:
-        print("No supported files found.")
+def parse_file(file_path):
+    """Pool worker: chunks of one file plus the stage seconds they took."""
+    before = Counter(stage_times)
+    chunks = load_chunks(file_path)
+    return chunks, Counter({stage: stage_times[stage] - before[stage] for stage in STAGES})
+
+def parse_files(paths, workers=1):
+    """Yield the chunks of each path in input order, parsing up to `workers` files at once."""
+    if workers <= 1:
+        for path in paths:
+            yield load_chunks(path)
         return
-
-    for file in tqdm(files, desc="Processing Files"):
-        file_path = os.path.join(DATA_FOLDER, file)
-
-        if file.lower().endswith('.docx'):
-            chunks = process_docx_paragraphs(file_path)
-        elif file.lower().endswith('.pdf'):
-            chunks = process_pdf_text(file_path)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunks, times in pool.map(parse_file, paths):
+            stage_times.update(times)
+            yield chunks
+
+def list_data_files():
+    return sorted(f for f in os.listdir(DATA_FOLDER) if f.lower().endswith(('.docx', '.pdf')))
+
+def embed_corpus(stage, manifest, full=False, workers=1):
+    """Chunks for every file in data/, parsing and embedding only what changed.
+
+    New or changed files are parsed by `workers` processes and embedded by
+    `stage` in file order as they arrive; their vectors go to the manifest's
+    per-file cache rather than being kept in memory. Returns (entries, changes)
+    where entries is a list of (file, chunks) in file order and changes lists
+    the added / changed / removed / unchanged files.
+    """
+    files = list_data_files()
+    entries = {}
+    pending = []
+    changes = {"added": [], "changed": [], "removed": [], "unchanged": []}
+    embedded = reused = 0
+
+    for file in files:
+        digest = file_hash(os.path.join(DATA_FOLDER, file))
+        cached = None if full else manifest.cached(file, digest)
+        if cached is not None:
+            entries[file] = cached
+            changes["unchanged"].append(file)
         else:
-            continue
+            changes["changed" if file in manifest.files else "added"].append(file)
+            pending.append((file, digest))
 
+    parsed = parse_files([os.path.join(DATA_FOLDER, file) for file, _ in pending], workers)
+    for (file, digest), chunks in tqdm(zip(pending, parsed), total=len(pending), desc="Processing Files"):
         if not chunks:
             print(f"⚠️ No valid chunks for {file}")
-            continue
-
-        all_chunks.extend(chunks)
 
+        previous = {} if full else manifest.previous_vectors(file)
+        hashes = [chunk_hash(chunk.page_content) for chunk in chunks]
+        missing = [i for i, h in enumerate(hashes) if h not in previous]
+        with timed("embed"):
+            new_vectors = stage.embed([chunks[i].page_content for i in missing])
+        dimension = new_vectors.shape[1] if new_vectors is not None else len(next(iter(previous.values()), ()))
+        vectors = np.empty((len(chunks), dimension), dtype=np.float32)
+        if missing:
+            vectors[missing] = new_vectors
+        for i, h in enumerate(hashes):
+            if h in previous:
+                vectors[i] = previous[h]
+        embedded += len(missing)
+        reused += len(chunks) - len(missing)
+
+        manifest.update(file, digest, chunks, hashes, vectors)
+        entries[file] = chunks
+
+    for file in sorted(set(manifest.files) - set(files)):
+        manifest.remove(file)
+        changes["removed"].append(file)
+
+    print(
+        f"📄 {len(changes['added'])} added, {len(changes['changed'])} changed, {len(changes['removed'])} removed, "
+        f"{len(changes['unchanged'])} unchanged; embedded {embedded} chunks, reused {reused}"
+    )
+    return [(file, entries[file]) for file in files], changes
+
+def spool_vectors(entries, manifest, dtype="float32", path=None):
+    """Copy every file's cached vectors, in file order, into one preallocated VectorSpool.
+
+    Returns (spool, [(file, chunks, rows)]) where rows is the file's slice of spool.vectors.
+    """
+    spool = VectorSpool(sum(len(chunks) for _, chunks in entries), dtype, path)
+    spooled = []
+    for file, chunks in entries:
+        rows = spool.append(manifest.vectors(file)) if chunks else slice(0, 0)
+        spooled.append((file, chunks, rows))
+    return spool, spooled
+
+def report_stage_times(wall_seconds, workers):
+    label = f"summed over {workers} workers" if workers > 1 else "single process"
+    print(f"⏱️ Ingestion time by stage ({label}):")
+    for stage in STAGES:
+        print(f"   {stage:<12} {stage_times[stage]:8.2f}s")
+    print(f"   {'wall clock':<12} {wall_seconds:8.2f}s")
+    if resource is not None:
+        # ru_maxrss is KiB on Linux
+        print(f"   {'peak RSS':<12} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:8.1f} MiB")
+
+def _save_faiss_store(out_dir, chunks, vectors, index_type="flat", index_params=None, batch_size=None):
+    index, params = build_index(vectors, index_type, batch_size=batch_size, **(index_params or {}))
+    save_faiss_store(out_dir, index, chunks, params, vectors, batch_size)
+    return params
+
+def store_per_doc_embeddings(spooled, vectors, changes):
+    for file in changes["removed"]:
+        doc_vector_dir = os.path.join(BASE_VECTOR_STORE, os.path.splitext(file)[0])
+        if os.path.isfile(os.path.join(doc_vector_dir, "index.faiss")):
+            shutil.rmtree(doc_vector_dir)
+            print(f"🗑️ Removed index for deleted file {file}")
+
+    rewrite = set(changes["added"]) | set(changes["changed"])
+    for file, chunks, rows in spooled:
+        doc_vector_dir = os.path.join(BASE_VECTOR_STORE, os.path.splitext(file)[0])
+        # Stores still holding a pickled docstore or lacking BM25 are rewritten too; their vectors are already in hand.
+        current = is_chunk_store(doc_vector_dir) and os.path.isfile(os.path.join(doc_vector_dir, LEXICAL_FILE))
+        if not chunks or (file not in rewrite and current):
+            continue
         try:
-            vector_store = FAISS.from_documents(chunks, embedder)
-            doc_vector_dir = os.path.join(BASE_VECTOR_STORE, os.path.splitext(file)[0])
-            os.makedirs(doc_vector_dir, exist_ok=True)
-            vector_store.save_local(doc_vector_dir)
+            _save_faiss_store(doc_vector_dir, chunks, vectors[rows])
             print(f"✅ Indexed {len(chunks)} chunks from {file}")
         except Exception as e:
-            print(f"❌ Failed to embed/index {file}: {e}")
+            print(f"❌ Failed to index {file}: {e}")
 
-    return all_chunks
-
-def store_combined_embeddings(all_chunks, embedder):
+def store_combined_embeddings(all_chunks, vectors, index_type="flat", index_params=None, batch_size=None):
     if not all_chunks:
         print("❌ No chunks to combine.")
-        return
+        return False
     try:
-        combined_index = FAISS.from_documents(all_chunks, embedder)
-        combined_index.save_local(os.path.join(BASE_VECTOR_STORE, COMBINED_INDEX_NAME))
-        print(f"✅ Combined index saved to '{COMBINED_INDEX_NAME}'")
+        combined_dir = os.path.join(BASE_VECTOR_STORE, COMBINED_INDEX_NAME)
+        params = _save_faiss_store(combined_dir, all_chunks, vectors, index_type, index_params, batch_size)
+        save_index_params(combined_dir, params)
+        print(f"✅ Combined {index_type} index saved to '{COMBINED_INDEX_NAME}' ({params})")
+        return True
     except Exception as e:
         print(f"❌ Failed to create combined FAISS index: {e}")
+        return False
+
+def store_meeting_index(all_chunks, vectors, index_type="flat", index_params=None, batch_size=None):
+    if not all_chunks:
+        print("❌ No chunks to index.")
+        return False
+    try:
+        build_meeting_index(
+            all_chunks, vectors, os.path.join(BASE_VECTOR_STORE, MEETING_INDEX_NAME),
+            index_type=index_type, index_params=index_params, batch_size=batch_size
+        )
+        return True
+    except Exception as e:
+        print(f"❌ Failed to create meeting index: {e}")
+        return False
+
+def parse_index_params(pairs):
+    params = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        params[key] = int(value)
+    return params
 
 if __name__ == "__main__":
-    embedder = HuggingFaceEmbeddings(
-        model_name=EMBEDDING_MODEL,
-        encode_kwargs={"normalize_embeddings": True}
+    parser = argparse.ArgumentParser(description="Build the BoG vector stores from the files in data/.")
+    parser.add_argument(
+        "--layout",
+        choices=["consolidated", "per-meeting", "both"],
+        default="consolidated",
+        help="consolidated: one meeting_index with a metadata side table; "
+             "per-meeting: legacy one FAISS store per file plus db_faiss "
+             "(not loaded by the API while a meeting_index exists)"
     )
-
-    all_chunks = store_per_doc_embeddings(embedder)
-    store_combined_embeddings(all_chunks, embedder)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat",
+                        help="FAISS index for db_faiss and meeting_index (flat is exact search; "
+                             "fp16 and pq store compressed vectors and re-score from vectors.npy)")
+    parser.add_argument("--index-param", action="append", default=[], metavar="KEY=VALUE",
+                        help="index build/search parameter, e.g. nlist=64, m=16, nprobe=8, M=32, ef_search=64, "
+                             "rescore=4 (candidates per result re-scored exactly; 0 keeps no float32 copy)")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the ingest manifest and re-parse and re-embed every file")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to parse and chunk files; output order does not depend on it")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE,
+                        help="chunks per embedding call and per index add")
+    parser.add_argument("--vector-dtype", choices=VECTOR_DTYPES, default="float32",
+                        help="precision of the corpus vector buffer the indexes are built from")
+    parser.add_argument("--embedding-backend", choices=BACKENDS, default=EMBEDDING_BACKEND,
+                        help="torch (sentence-transformers), onnx or onnx-int8 (ONNX Runtime)")
+    parser.add_argument("--memmap", action="store_true",
+                        help=f"keep the corpus vector buffer in {BASE_VECTOR_STORE}/{SPOOL_FILE} instead of RAM")
+    parser.add_argument("--refresh-summaries", action="store_true",
+                        help=f"rewrite every meeting summary in {SUMMARIES_DIR}/, not just those of new or changed files")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    index_params = parse_index_params(args.index_param)
+    ensure_punkt()
+
+    # Loaded here so parse workers never load the model, and after the Hub is switched offline for a cached model.
+    embedder = load_embeddings(EMBEDDING_MODEL, args.embedding_backend, {"normalize_embeddings": True})
+    # Vectors from another backend differ slightly, so switching backends re-embeds everything.
+    manifest = IngestManifest(BASE_VECTOR_STORE, model_id(EMBEDDING_MODEL, args.embedding_backend), {
+        "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP,
+        "min_chunk_length": MIN_CHUNK_LENGTH, "max_chunk_length": MAX_CHUNK_LENGTH,
+        "pdf_pages": True, "item_boundaries": True
+    })
+
+    # Each chunk is embedded at most once; every index below is built from these vectors.
+    stage = EmbeddingStage(embedder, args.batch_size)
+    entries, changes = embed_corpus(stage, manifest, full=args.full, workers=args.workers)
+    all_chunks = [chunk for _, chunks in entries for chunk in chunks]
+    index_config = {"index_type": args.index_type, "index_params": index_params, "docstore": "chunk_store", "lexical": "bm25"}
+
+    with timed("index write"):
+        spool, spooled = spool_vectors(
+            entries, manifest, args.vector_dtype,
+            os.path.join(BASE_VECTOR_STORE, SPOOL_FILE) if args.memmap else None
+        )
+        try:
+            if args.layout in ("per-meeting", "both"):
+                store_per_doc_embeddings(spooled, spool.vectors, changes)
+                if not args.full and manifest.index_current(COMBINED_INDEX_NAME, index_config):
+                    print(f"✔️ '{COMBINED_INDEX_NAME}' is up to date")
+                elif store_combined_embeddings(all_chunks, spool.vectors, args.index_type, index_params, args.batch_size):
+                    manifest.mark_index(COMBINED_INDEX_NAME, index_config)
+
+            if args.layout in ("consolidated", "both"):
+                if not args.full and manifest.index_current(MEETING_INDEX_NAME, index_config):
+                    print(f"✔️ '{MEETING_INDEX_NAME}' is up to date")
+                elif store_meeting_index(all_chunks, spool.vectors, args.index_type, index_params, args.batch_size):
+                    manifest.mark_index(MEETING_INDEX_NAME, index_config)
+        finally:
+            spool.close()
+
+        # Acronyms ("Finance Committee (FC)") for the query expander; only re-mined when the corpus changed.
+        corpus_changed = args.full or any(changes[kind] for kind in ("added", "changed", "removed"))
+        if corpus_changed or not os.path.isfile(os.path.join(BASE_VECTOR_STORE, VOCABULARY_FILE)):
+            acronyms = save_vocabulary(BASE_VECTOR_STORE, [chunk.page_content for chunk in all_chunks])
+            print(f"✅ Mined {len(acronyms)} acronyms for query expansion")
+        # Meeting numbers and dates for query routing, whichever layout was written.
+        if corpus_changed or not os.path.isfile(os.path.join(BASE_VECTOR_STORE, CATALOG_FILE)):
+            catalog = save_catalog(BASE_VECTOR_STORE, [(file, [chunk.page_content for chunk in chunks]) for file, chunks in entries])
+            print(f"✅ Cataloged {len(catalog)} minutes files for query routing")
+        # Summaries for meeting-overview questions; existing ones are kept unless their file changed.
+        written = refresh_summaries(SUMMARIES_DIR, entries, changes, force=args.refresh_summaries)
+        if written:
+            print(f"✅ Wrote {written} meeting summaries to '{SUMMARIES_DIR}'")
+
+        manifest.save()
+
+    stage.report()
+    report_stage_times(time.perf_counter() - start, args.workers)
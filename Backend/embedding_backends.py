@@ -0,0 +1,161 @@
+"""Pluggable sentence-embedding backends for MiniLM.
+
+    torch      sentence-transformers on PyTorch (the original path)
+    onnx       the same model exported to ONNX, run with ONNX Runtime
+    onnx-int8  the dynamically int8-quantized ONNX export
+
+The ONNX backends tokenize with the model's own tokenizer.json and apply
+the same mean pooling and L2 normalization as sentence-transformers, so
+they need neither torch nor sentence-transformers at runtime. The ONNX
+files come from the model's Hub repo (onnx/*.onnx); a different file or a
+local path can be set with EMBEDDING_ONNX_FILE. To quantize an fp32 export
+yourself:
+
+    python embedding_backends.py --quantize model.onnx model_int8.onnx
+
+Select the backend with EMBEDDING_BACKEND (default torch). That the ONNX
+backends stay within cosine 0.99 of torch is checked by
+`python -m pytest tests/test_embedding_backends.py`; their speed is
+measured by `python benchmark.py embeddings`.
+"""
+import argparse
+import json
+import os
+import numpy as np
+from model_loader import MODEL_CACHE_DIR, hub_file, load_cached_first
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+ONNX_FILES = {"onnx": "onnx/model.onnx", "onnx-int8": "onnx/model_quint8_avx2.onnx"}
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE") or None
+# 0 lets ONNX Runtime pick (one thread per physical core)
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+DEFAULT_MAX_LENGTH = 256
+
+
+def model_id(model_name, backend):
+    """Identity of the vectors a backend produces, for caches and the ingest manifest."""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+def _hub_file(model_name, file_name, cache_folder=None):
+    if os.path.isfile(file_name):
+        return file_name
+    return hub_file(model_name, file_name, cache_folder)
+
+
+class SentenceTransformerBackend:
+    def __init__(self, model_name, cache_folder=None, local_files_only=False):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, cache_folder=cache_folder, local_files_only=local_files_only)
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32):
+        return self.model.encode(texts, normalize_embeddings=normalize_embeddings, batch_size=batch_size)
+
+
+class OnnxBackend:
+    """MiniLM through ONNX Runtime: tokenize, run the encoder, mean-pool over the attention mask."""
+
+    def __init__(self, model_name, file_name, cache_folder=None, threads=EMBEDDING_THREADS):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(_hub_file(model_name, "tokenizer.json", cache_folder))
+        self.tokenizer.enable_truncation(self._max_length(model_name, cache_folder))
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]")
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            _hub_file(model_name, file_name, cache_folder), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    @staticmethod
+    def _max_length(model_name, cache_folder):
+        # sentence-transformers truncates at max_seq_length, which is shorter than the tokenizer's limit
+        try:
+            with open(_hub_file(model_name, "sentence_bert_config.json", cache_folder), encoding="utf-8") as f:
+                return json.load(f).get("max_seq_length", DEFAULT_MAX_LENGTH)
+        except Exception:
+            return DEFAULT_MAX_LENGTH
+
+    def _run(self, texts, normalize_embeddings):
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feed = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: value for name, value in feed.items() if name in self.input_names})[0]
+        weights = mask[:, :, None].astype(np.float32)
+        vectors = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if normalize_embeddings:
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = np.empty((len(texts), 0), dtype=np.float32) if not texts else None
+        # Batches of similar length waste less work on padding, as in sentence-transformers.
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            batch = self._run([texts[i] for i in rows], normalize_embeddings)
+            if vectors is None:
+                vectors = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            vectors[rows] = batch
+        return vectors[0] if single else vectors
+
+
+class BackendEmbeddings:
+    """LangChain-style embed_query / embed_documents over a backend, matching HuggingFaceEmbeddings."""
+
+    def __init__(self, backend, encode_kwargs=None):
+        self.backend = backend
+        self.encode_kwargs = encode_kwargs or {}
+
+    def embed_documents(self, texts):
+        # HuggingFaceEmbeddings replaces newlines before encoding; do the same so vectors agree.
+        texts = [text.replace("\n", " ") for text in texts]
+        return self.backend.encode(texts, **self.encode_kwargs).tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def load_backend(model_name, backend=EMBEDDING_BACKEND, cache_folder=MODEL_CACHE_DIR, onnx_file=EMBEDDING_ONNX_FILE):
+    """An object with SentenceTransformer's encode(texts, normalize_embeddings=...) for `backend`."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+    if backend == "torch":
+        return load_cached_first(lambda local: SentenceTransformerBackend(model_name, cache_folder, local), model_name, cache_folder)
+    return OnnxBackend(model_name, onnx_file or ONNX_FILES[backend], cache_folder)
+
+
+def load_embeddings(model_name, backend=EMBEDDING_BACKEND, encode_kwargs=None, cache_folder=MODEL_CACHE_DIR):
+    """LangChain embeddings for `backend`; torch keeps using HuggingFaceEmbeddings itself."""
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return load_cached_first(
+            lambda local: HuggingFaceEmbeddings(model_name=model_name, cache_folder=cache_folder, encode_kwargs=encode_kwargs or {},
+                                                model_kwargs={"local_files_only": local}),
+            model_name, cache_folder
+        )
+    return BackendEmbeddings(load_backend(model_name, backend, cache_folder), encode_kwargs)
+
+
+def quantize(src, dst):
+    """Dynamic int8 quantization of an fp32 ONNX export (weights int8, activations quantized at run time)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(src, dst, weight_type=QuantType.QUInt8)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quantize", nargs=2, metavar=("FP32_ONNX", "INT8_ONNX"), required=True)
+    args = parser.parse_args()
+    quantize(*args.quantize)
+    print(f"✅ Wrote {args.quantize[1]} ({os.path.getsize(args.quantize[1]) / 2**20:.1f} MB)")
@@ -0,0 +1,74 @@
+"""Batched, bounded-memory embedding for ingestion.
+
+EmbeddingStage embeds texts `batch_size` at a time straight into a
+preallocated float32 array and keeps throughput counters. VectorSpool holds
+the corpus vectors in one preallocated float32 or float16 array, optionally
+a memory-mapped .npy file, which the index builders then read back in
+batches instead of stacking every vector into one in-memory matrix.
+"""
+import os
+import time
+import numpy as np
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+VECTOR_DTYPES = ("float32", "float16")
+
+
+class EmbeddingStage:
+    def __init__(self, embedder, batch_size=EMBED_BATCH_SIZE):
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.chunks = 0
+        self.seconds = 0.0
+
+    def embed(self, texts, out=None):
+        """Embed `texts` batch by batch into `out` (a float32 array is allocated when not given)."""
+        for start in range(0, len(texts), self.batch_size):
+            batch_start = time.perf_counter()
+            batch = np.asarray(self.embedder.embed_documents(texts[start:start + self.batch_size]), dtype=np.float32)
+            self.seconds += time.perf_counter() - batch_start
+            self.chunks += len(batch)
+            if out is None:
+                out = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            out[start:start + len(batch)] = batch
+        return out
+
+    def throughput(self):
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def report(self):
+        print(f"🧮 Embedded {self.chunks} chunks in {self.seconds:.2f}s ({self.throughput():.1f} chunks/s, batch {self.batch_size})")
+
+
+class VectorSpool:
+    """Append-only (rows, dimension) vector buffer allocated once, in memory or memory-mapped at `path`."""
+
+    def __init__(self, rows, dtype="float32", path=None):
+        self.rows = rows
+        self.dtype = np.dtype(dtype)
+        self.path = path
+        self.vectors = None
+        self.filled = 0
+
+    def _allocate(self, dimension):
+        shape = (self.rows, dimension)
+        if self.path:
+            self.vectors = np.lib.format.open_memmap(self.path, mode="w+", dtype=self.dtype, shape=shape)
+        else:
+            self.vectors = np.empty(shape, dtype=self.dtype)
+
+    def append(self, vectors):
+        """Copy `vectors` in after the rows already written; returns the slice they occupy."""
+        if self.vectors is None:
+            self._allocate(vectors.shape[1])
+        rows = slice(self.filled, self.filled + len(vectors))
+        self.vectors[rows] = vectors
+        self.filled = rows.stop
+        return rows
+
+    def close(self):
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        self.vectors = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,228 @@
+"""Builds the FAISS index behind a vector store: exact flat, IVF-PQ, HNSW,
+or compressed float16 / PQ codes.
+
+The resolved build/search parameters are persisted next to the index
+(index_params.json for LangChain stores, meta.json for the meeting index)
+so a loader re-applies the same nprobe / efSearch the index was built for.
+
+Compressed indexes ("fp16": 2 bytes per dimension, "pq": m bytes per
+vector) keep a fraction of the float32 vectors in each worker's memory.
+With `rescore` > 0 the full-precision vectors are also written to
+vectors.npy; a search then takes rescore * k candidates from the
+compressed index and re-scores them exactly against that file, which is
+memory-mapped and so shared between workers through the page cache.
+`python benchmark.py compress` reports memory against recall.
+"""
+import json
+import math
+import os
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivfpq", "hnsw", "fp16", "pq")
+INDEX_PARAMS_FILE = "index_params.json"
+RESCORE_VECTORS_FILE = "vectors.npy"
+TRAIN_POINTS_PER_LIST = 256
+
+DEFAULT_PARAMS = {
+    "flat": {},
+    "ivfpq": {"nlist": None, "m": 16, "nbits": 8, "nprobe": 16},
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 64},
+    "fp16": {"rescore": 4},
+    "pq": {"m": 48, "nbits": 8, "rescore": 10},
+}
+
+
+def resolve_params(index_type, num_vectors, dimension, **overrides):
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+    params = dict(DEFAULT_PARAMS[index_type])
+    params.update({key: value for key, value in overrides.items() if value is not None})
+
+    if index_type == "ivfpq":
+        # k-means wants ~39 training points per centroid; small corpora get fewer lists and PQ bits.
+        if params["nlist"] is None:
+            params["nlist"] = int(4 * math.sqrt(max(num_vectors, 1)))
+        params["nlist"] = max(1, min(params["nlist"], num_vectors // 39))
+        params["nbits"] = max(1, min(params["nbits"], int(math.log2(max(num_vectors, 2)))))
+        if dimension % params["m"]:
+            raise ValueError(f"ivfpq: dimension {dimension} is not divisible by m={params['m']}")
+        params["nprobe"] = min(params["nprobe"], params["nlist"])
+    elif index_type == "pq":
+        params["nbits"] = max(1, min(params["nbits"], int(math.log2(max(num_vectors, 2)))))
+        if dimension % params["m"]:
+            raise ValueError(f"pq: dimension {dimension} is not divisible by m={params['m']}")
+    return params
+
+
+def _rows(vectors, order, start, stop):
+    rows = vectors[start:stop] if order is None else vectors[order[start:stop]]
+    return np.ascontiguousarray(rows, dtype=np.float32)
+
+
+def build_index(vectors, index_type="flat", metric="l2", order=None, batch_size=None, **overrides):
+    """Create, train and fill an index for `vectors`; returns (index, resolved params).
+
+    `vectors` may be a float16 array or a memmap: rows are added `batch_size`
+    at a time (in `order` when given), so only one batch is ever materialized
+    as float32.
+    """
+    if not isinstance(vectors, np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+    num_vectors, dimension = vectors.shape
+    params = resolve_params(index_type, num_vectors, dimension, **overrides)
+    faiss_metric = faiss.METRIC_INNER_PRODUCT if metric == "ip" else faiss.METRIC_L2
+    batch_size = batch_size or max(num_vectors, 1)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dimension) if metric == "ip" else faiss.IndexFlatL2(dimension)
+    elif index_type == "ivfpq":
+        quantizer = faiss.IndexFlatIP(dimension) if metric == "ip" else faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, params["nlist"], params["m"], params["nbits"], faiss_metric)
+        # FAISS subsamples to this many training points anyway; taking an even spread keeps memory bounded.
+        sample_size = min(num_vectors, params["nlist"] * TRAIN_POINTS_PER_LIST)
+        sample = np.linspace(0, num_vectors - 1, sample_size).astype(np.int64)
+        index.train(np.ascontiguousarray(vectors[sample], dtype=np.float32))
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, params["M"], faiss_metric)
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif index_type == "fp16":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss_metric)
+    else:
+        # IndexPQ rejects SearchParameters, so meeting filters could not use it; a single-list
+        # IVF scans the same PQ codes exhaustively and honours ID selectors.
+        quantizer = faiss.IndexFlatIP(dimension) if metric == "ip" else faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, 1, params["m"], params["nbits"], faiss_metric)
+        sample_size = min(num_vectors, 2 ** params["nbits"] * TRAIN_POINTS_PER_LIST)
+        sample = np.linspace(0, num_vectors - 1, sample_size).astype(np.int64)
+        index.train(np.ascontiguousarray(vectors[sample], dtype=np.float32))
+
+    for start in range(0, num_vectors, batch_size):
+        index.add(_rows(vectors, order, start, start + batch_size))
+    apply_search_params(index, {"type": index_type, **params})
+    return index, {"type": index_type, "metric": metric, **params}
+
+
+def apply_search_params(index, params):
+    if not params:
+        return
+    if params.get("type") in ("ivfpq", "pq"):
+        ivf = faiss.extract_index_ivf(index)
+        ivf.nprobe = params.get("nprobe", 1)
+        # Needed for reconstruct(), which reranking uses to read stored vectors back.
+        ivf.make_direct_map()
+    elif params.get("type") == "hnsw":
+        index.hnsw.efSearch = params["ef_search"]
+
+
+class RescoringIndex:
+    """A compressed index whose top candidates are re-scored against memory-mapped float32 vectors.
+
+    Quacks like the faiss.Index calls the stores make (search with params,
+    reconstruct, reconstruct_batch, ntotal, d); reconstruct reads the exact
+    vectors, so reranking is unaffected by the compression.
+    """
+
+    def __init__(self, index, vectors, rescore):
+        if vectors.shape[0] != index.ntotal:
+            raise ValueError(f"{vectors.shape[0]} full-precision vectors for an index of {index.ntotal}")
+        self.index = index
+        self.vectors = vectors
+        self.rescore = rescore
+        self.d = index.d
+        self.metric_type = index.metric_type
+
+    @property
+    def ntotal(self):
+        return self.index.ntotal
+
+    def search(self, queries, k, params=None):
+        queries = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, self.d)
+        _, candidates = self.index.search(queries, min(k * self.rescore, self.ntotal), params=params)
+        inner_product = self.metric_type == faiss.METRIC_INNER_PRODUCT
+        scores = np.full((len(queries), k), -np.inf if inner_product else np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for i, query in enumerate(queries):
+            # Sorted ids read the memmap front to back.
+            rows = np.sort(candidates[i][candidates[i] >= 0])
+            exact = np.asarray(self.vectors[rows], dtype=np.float32)
+            if inner_product:
+                row_scores = exact @ query
+                best = np.argsort(-row_scores, kind="stable")[:k]
+            else:
+                row_scores = ((exact - query) ** 2).sum(axis=1)
+                best = np.argsort(row_scores, kind="stable")[:k]
+            scores[i, :len(best)] = row_scores[best]
+            ids[i, :len(best)] = rows[best]
+        return scores, ids
+
+    def reconstruct(self, row):
+        return np.asarray(self.vectors[row], dtype=np.float32)
+
+    def reconstruct_batch(self, rows):
+        return np.asarray(self.vectors[np.asarray(rows, dtype=np.int64)], dtype=np.float32)
+
+
+def write_index(folder_path, index_file, index, params, vectors=None, order=None, batch_size=None):
+    """Write `index`, plus its float32 vectors (rows in `order`) when `params` ask for rescoring.
+
+    The vectors go first, so a reloader that sees the new index also finds them.
+    """
+    vectors_path = os.path.join(folder_path, RESCORE_VECTORS_FILE)
+    if not params.get("rescore"):
+        faiss.write_index(index, os.path.join(folder_path, index_file))
+        if os.path.isfile(vectors_path):
+            os.remove(vectors_path)
+        return
+    # Filled a batch at a time, like build_index, so a memmapped float16 spool is never fully materialized.
+    num_vectors = vectors.shape[0]
+    batch_size = batch_size or max(num_vectors, 1)
+    tmp_path = vectors_path + ".tmp.npy"
+    full = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(num_vectors, vectors.shape[1]))
+    for start in range(0, num_vectors, batch_size):
+        full[start:start + batch_size] = _rows(vectors, order, start, start + batch_size)
+    full.flush()
+    del full
+    os.replace(tmp_path, vectors_path)
+    faiss.write_index(index, os.path.join(folder_path, index_file))
+
+
+def read_index(folder_path, index_file, params=None):
+    """Read an index written by write_index and apply its search parameters."""
+    index = faiss.read_index(os.path.join(folder_path, index_file))
+    apply_search_params(index, params)
+    if params and params.get("rescore"):
+        vectors = np.load(os.path.join(folder_path, RESCORE_VECTORS_FILE), mmap_mode="r")
+        return RescoringIndex(index, vectors, params["rescore"])
+    return index
+
+
+def search_parameters(index, selector):
+    """SearchParameters of the right subtype for `index`, restricted to `selector`."""
+    if isinstance(index, RescoringIndex):
+        index = index.index
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def index_memory_bytes(index):
+    """Bytes the index holds in process memory (a rescoring index's vectors are memory-mapped)."""
+    if isinstance(index, RescoringIndex):
+        index = index.index
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def save_index_params(folder_path, params):
+    with open(os.path.join(folder_path, INDEX_PARAMS_FILE), "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=2)
+
+
+def load_index_params(folder_path):
+    path = os.path.join(folder_path, INDEX_PARAMS_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
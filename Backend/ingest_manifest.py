@@ -0,0 +1,119 @@
+"""Content-addressed bookkeeping for incremental ingestion.
+
+vector_store/ingest_manifest.json maps every file in data/ to the SHA-256 of
+its bytes and the hashes of its chunks. The parsed chunks and their vectors
+are cached under vector_store/.ingest/<file sha256>.npz, so an unchanged file
+is neither parsed nor embedded again, and a changed file only embeds the
+chunks whose text is new.
+"""
+import hashlib
+import json
+import os
+import numpy as np
+from langchain_core.documents import Document
+
+MANIFEST_FILE = "ingest_manifest.json"
+CACHE_DIR = ".ingest"
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class IngestManifest:
+    def __init__(self, vector_store_dir, model_name, chunker):
+        self.vector_store_dir = vector_store_dir
+        self.cache_dir = os.path.join(vector_store_dir, CACHE_DIR)
+        self.path = os.path.join(vector_store_dir, MANIFEST_FILE)
+        self.model_name = model_name
+        self.chunker = chunker
+        self.files = {}
+        self.indexes = {}
+
+        if os.path.isfile(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            # Vectors from another model are useless; another chunker config means every file must be re-split.
+            if saved.get("model") == model_name:
+                self.files = saved.get("files", {})
+                self.indexes = saved.get("indexes", {})
+                if saved.get("chunker") != chunker:
+                    for entry in self.files.values():
+                        entry["stale"] = True
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}.npz")
+
+    def cached(self, file_name, digest):
+        """Chunks of a file whose content is unchanged and cached, else None."""
+        entry = self.files.get(file_name)
+        if entry is None or entry["sha256"] != digest or entry.get("stale"):
+            return None
+        path = self._cache_path(digest)
+        if not os.path.isfile(path):
+            return None
+        with np.load(path) as cache:
+            chunks = [json.loads(chunk) for chunk in cache["chunks"]]
+        return [Document(page_content=chunk["text"], metadata=dict(chunk["metadata"], source=file_name)) for chunk in chunks]
+
+    def vectors(self, file_name):
+        """The cached float32 vectors of `file_name`, one row per chunk (None when not cached)."""
+        entry = self.files.get(file_name)
+        path = self._cache_path(entry["sha256"]) if entry else None
+        if path is None or not os.path.isfile(path):
+            return None
+        with np.load(path) as cache:
+            return cache["vectors"]
+
+    def previous_vectors(self, file_name):
+        """chunk hash -> vector from the last indexed version of `file_name`."""
+        vectors = self.vectors(file_name)
+        if vectors is None:
+            return {}
+        return dict(zip(self.files[file_name]["chunks"], vectors))
+
+    def update(self, file_name, digest, chunks, hashes, vectors):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        np.savez(
+            self._cache_path(digest),
+            vectors=np.asarray(vectors, dtype=np.float32),
+            chunks=np.array([json.dumps({"text": c.page_content, "metadata": c.metadata}, ensure_ascii=False) for c in chunks])
+        )
+        self.files[file_name] = {"sha256": digest, "chunks": hashes}
+
+    def remove(self, file_name):
+        self.files.pop(file_name, None)
+
+    def index_current(self, name, config):
+        """True when index `name` was last built from exactly these files with this config."""
+        built = self.indexes.get(name)
+        return (
+            built is not None
+            and os.path.isdir(os.path.join(self.vector_store_dir, name))
+            and built["config"] == config
+            and built["files"] == {file_name: entry["sha256"] for file_name, entry in self.files.items()}
+        )
+
+    def mark_index(self, name, config):
+        self.indexes[name] = {"config": config, "files": {file_name: entry["sha256"] for file_name, entry in self.files.items()}}
+
+    def save(self):
+        os.makedirs(self.vector_store_dir, exist_ok=True)
+        referenced = {f"{entry['sha256']}.npz" for entry in self.files.values()}
+        if os.path.isdir(self.cache_dir):
+            for cache_file in os.listdir(self.cache_dir):
+                if cache_file not in referenced:
+                    os.remove(os.path.join(self.cache_dir, cache_file))
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "chunker": self.chunker, "files": self.files, "indexes": self.indexes}, f, indent=2)
+        os.replace(tmp_path, self.path)
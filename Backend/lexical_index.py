@@ -0,0 +1,136 @@
+"""BM25 inverted index over the chunks of a vector store.
+
+MiniLM embeds exact tokens ("Item No. 12", people's and scheme names)
+poorly; BM25 matches them directly. The index is built from the same rows
+as the FAISS index next to it (row i = FAISS id i) and saved as bm25.npz:
+
+    terms     the vocabulary, newline-separated UTF-8
+    offsets   postings of term t are postings[offsets[t]:offsets[t + 1]]
+    postings  row ids, ascending within a term
+    weights   the BM25 contribution of each posting, precomputed
+
+Because the per-posting weights are precomputed, scoring a query is one
+vectorized add per query term.
+"""
+import os
+import re
+import numpy as np
+
+LEXICAL_FILE = "bm25.npz"
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_TERM_LENGTH = 40
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from had has have in into is it its no not of on or that the their "
+    "this to was were what when where which who will with about did does do how under".split()
+)
+
+
+def tokenize(text):
+    """Lowercased word and number tokens; dotted numbers also in item_key form ("37.05" -> "37.5")."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS or len(token) > MAX_TERM_LENGTH:
+            continue
+        tokens.append(token)
+        if "." in token and token.partition(".")[0].isdigit():
+            canonical = ".".join(str(int(part)) for part in token.split("."))
+            if canonical != token:
+                tokens.append(canonical)
+    return tokens
+
+
+class LexicalIndex:
+    def __init__(self, terms, offsets, postings, weights, num_rows):
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.postings = postings
+        self.weights = weights
+        self.num_rows = num_rows
+
+    @classmethod
+    def build(cls, texts, k1=BM25_K1, b=BM25_B):
+        term_ids = {}
+        term_col, row_col, tf_col = [], [], []
+        lengths = []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                term_col.append(term_ids.setdefault(token, len(term_ids)))
+                row_col.append(row)
+                tf_col.append(count)
+
+        terms = list(term_ids)
+        term_col = np.asarray(term_col, dtype=np.int64)
+        rows = np.asarray(row_col, dtype=np.int32)
+        tf = np.asarray(tf_col, dtype=np.float32)
+        # Postings grouped by term; rows were appended in ascending order, so a stable sort keeps them sorted.
+        order = np.argsort(term_col, kind="stable")
+        term_col, rows, tf = term_col[order], rows[order], tf[order]
+        df = np.bincount(term_col, minlength=len(terms))
+        offsets = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+
+        lengths = np.asarray(lengths, dtype=np.float32)
+        num_rows = len(lengths)
+        avg_length = float(lengths.mean()) if num_rows and lengths.mean() > 0 else 1.0
+        idf = np.log1p((num_rows - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths[rows] / avg_length)
+        weights = (idf[term_col] * tf * (k1 + 1) / (tf + norm)).astype(np.float32)
+        return cls(terms, offsets, rows, weights, num_rows)
+
+    def save(self, out_dir):
+        terms = "\n".join(self.term_ids).encode("utf-8")
+        path = os.path.join(out_dir, LEXICAL_FILE)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(
+                f, terms=np.frombuffer(terms, dtype=np.uint8), offsets=self.offsets,
+                postings=self.postings, weights=self.weights, num_rows=np.int64(self.num_rows)
+            )
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, store_dir, num_rows):
+        """The index saved in `store_dir`, or None when there is none (stores ingested before BM25
+        existed) or it does not cover the store's `num_rows` rows."""
+        path = os.path.join(store_dir, LEXICAL_FILE)
+        if not os.path.isfile(path):
+            return None
+        with np.load(path) as data:
+            if int(data["num_rows"]) != num_rows:
+                print(f"[!] Ignoring stale {LEXICAL_FILE} in '{store_dir}'")
+                return None
+            blob = data["terms"].tobytes().decode("utf-8")
+            terms = blob.split("\n") if blob else []
+            return cls(terms, data["offsets"], data["postings"], data["weights"], num_rows)
+
+    def __len__(self):
+        return self.num_rows
+
+    def search(self, query, k, mask=None):
+        """(rows, scores) of the k best-scoring rows for `query`, restricted to `mask` rows when given."""
+        scores = np.zeros(self.num_rows, dtype=np.float32)
+        # A repeated query term counts once, so an amplified query that restates its terms is not skewed.
+        for token in dict.fromkeys(tokenize(query)):
+            term = self.term_ids.get(token)
+            if term is not None:
+                start, end = self.offsets[term], self.offsets[term + 1]
+                scores[self.postings[start:end]] += self.weights[start:end]
+        if mask is not None:
+            scores[~mask] = 0
+        rows = np.flatnonzero(scores)
+        if 0 < k < rows.shape[0]:
+            rows = rows[np.argpartition(-scores[rows], k - 1)[:k]]
+        rows = rows[np.argsort(-scores[rows], kind="stable")][:k]
+        return rows, scores[rows]
+
+
+def write_lexical_index(out_dir, texts):
+    index = LexicalIndex.build(texts)
+    index.save(out_dir)
+    return index
@@ -0,0 +1,114 @@
+import os
+import json
+import requests
+from requests.adapters import HTTPAdapter
+
+TOGETHER_API_URL = os.getenv("TOGETHER_API_URL", "https://api.together.ai/v1/chat/completions")
+
+
+class LLMStreamError(Exception):
+    """A streamed completion failed, possibly after some of its text was sent; str() reads "System error: ..."."""
+
+
+class TogetherClient:
+    """Chat-completions client for Together AI with pooled sync and async connections.
+
+    Errors are returned as "System error: ..." strings rather than raised,
+    matching what the RAG handler has always passed back to its callers.
+    A stream cannot take back text it already yielded, so astream_chat
+    raises LLMStreamError instead.
+    """
+
+    def __init__(self, api_key, model_name, api_url=None, timeout=60, max_connections=32):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.api_url = api_url or TOGETHER_API_URL
+        self.timeout = timeout
+        self.max_connections = max_connections
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._async_client = None
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _payload(self, messages, stream=False):
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": 1024,
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "stream": stream
+        }
+
+    def chat(self, messages: list) -> str:
+        try:
+            response = self.session.post(
+                self.api_url,
+                headers=self._headers(),
+                json=self._payload(messages),
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+        except Exception as e:
+            return f"System error: {e}"
+
+    def _get_async_client(self):
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            )
+        return self._async_client
+
+    async def achat(self, messages: list) -> str:
+        try:
+            response = await self._get_async_client().post(
+                self.api_url,
+                headers=self._headers(),
+                json=self._payload(messages)
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+        except Exception as e:
+            return f"System error: {e}"
+
+    async def astream_chat(self, messages: list):
+        """Yield completion text as Together streams it (server-sent events); raises LLMStreamError on failure."""
+        try:
+            async with self._get_async_client().stream(
+                "POST",
+                self.api_url,
+                headers=self._headers(),
+                json=self._payload(messages, stream=True)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    token = (choices[0].get("delta") or {}).get("content")
+                    if token:
+                        yield token
+        except Exception as e:
+            raise LLMStreamError(f"System error: {e}") from e
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def close(self):
+        self.session.close()
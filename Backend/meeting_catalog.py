@@ -0,0 +1,237 @@
+"""Catalog of the ingested meetings, used to route queries to their chunks.
+
+Written at ingestion as vector_store/meeting_catalog.json, one entry per
+minutes file:
+
+    source   file name without extension; also the name of its per-meeting
+             store and of its source in the meeting index
+    meeting  BoG meeting number (-1 when the file name has none)
+    date     YYYYMMDD (-1 when unknown); from the file name, else from the
+             "held on <date>" line of the minutes
+    year     the meeting's year (-1 when unknown)
+    chunks   number of chunks
+
+Once loaded, meeting numbers and meeting dates are kept in sorted arrays,
+so "BoG 55", "the meeting held on 7.12.2019" or "meetings between March
+2019 and Dec 2021" are binary searches rather than a regex pass over every
+folder name per query. A vector store ingested before the catalog existed
+gets one built from its folder names when it is loaded.
+
+    python meeting_catalog.py vector_store "meetings between March 2019 and Dec 2021"
+"""
+import argparse
+import json
+import os
+import re
+import numpy as np
+from meeting_index import MEETING_INDEX_NAME, parse_meeting_name
+from query_expansion import MONTHS, QueryExpander, date_entities
+
+CATALOG_FILE = "meeting_catalog.json"
+# Chunks from the start of the minutes searched for the "held on" date
+DATE_SEARCH_CHUNKS = 3
+MIN_DATE, MAX_DATE = 0, 99991231
+
+_HELD_ON = re.compile(r"\bheld\s+on\s+(?:[a-z]+day,?\s+)?(?:the\s+)?(.{6,30})", re.IGNORECASE)
+_MONTH = r"(?:" + "|".join(sorted([name for name in MONTHS] + [name[:3] for name in MONTHS] + ["Sept"], key=len, reverse=True)) + r")\.?"
+# A date, a month or a year, as date_entities reads them
+_TERM = (
+    r"(?:\d{1,2}[./-]\d{1,2}[./-](?:\d{4}|\d{2})"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}[\s,]+\d{{4}}"
+    rf"|{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}"
+    rf"|{_MONTH}[\s,]+\d{{4}}"
+    r"|20\d{2})"
+)
+_RANGE = re.compile(
+    rf"\bbetween\s+({_TERM})\s+and\s+({_TERM})|\b({_TERM})\s*(?:to|till|until|through|-|–)\s*({_TERM})(?![\d.])",
+    re.IGNORECASE
+)
+_OPEN_RANGE = re.compile(rf"\b(since|after|before|until|till|prior\s+to|up\s+to)\s+(?:the\s+)?({_TERM})(?![\d.])", re.IGNORECASE)
+
+
+def _bounds(entities):
+    """(first, last) YYYYMMDD covered by the first date, month or year in `entities`, or None."""
+    if entities.dates:
+        year, month, day = entities.dates[0]
+        date = year * 10000 + month * 100 + day
+        return date, date
+    if entities.months:
+        year, month = entities.months[0]
+        return year * 10000 + month * 100 + 1, year * 10000 + month * 100 + 31
+    if entities.years:
+        year = min(entities.years)
+        return year * 10000 + 101, year * 10000 + 1231
+    return None
+
+
+def date_ranges(query):
+    """Inclusive (first, last) YYYYMMDD ranges the query restricts meetings to.
+
+    "between March 2019 and Dec 2021" and "2019-2021" give one range;
+    "since 2020" / "before 5.12.2023" open ones; any other date, month or
+    year in the query covers just that day, month or year.
+    """
+    ranges = []
+    if not any(char.isdigit() for char in query):
+        return ranges
+    rest = query
+    for match in _RANGE.finditer(query):
+        start, end = (term for term in match.groups() if term is not None)
+        first, last = _bounds(date_entities(start)), _bounds(date_entities(end))
+        if first and last:
+            ranges.append((first[0], last[1]))
+            rest = rest.replace(match.group(0), " ")
+    for match in _OPEN_RANGE.finditer(rest):
+        bounds = _bounds(date_entities(match.group(2)))
+        if bounds is None:
+            continue
+        word = match.group(1).lower()
+        if word == "since":
+            ranges.append((bounds[0], MAX_DATE))
+        elif word == "after":
+            ranges.append((bounds[1] + 1, MAX_DATE))
+        elif word in ("until", "till") or word.startswith("up"):
+            ranges.append((MIN_DATE, bounds[1]))
+        else:
+            ranges.append((MIN_DATE, bounds[0] - 1))
+        rest = rest.replace(match.group(0), " ")
+
+    found = date_entities(rest)
+    for year, month, day in found.dates:
+        date = year * 10000 + month * 100 + day
+        ranges.append((date, date))
+    for year, month in found.months:
+        ranges.append((year * 10000 + month * 100 + 1, year * 10000 + month * 100 + 31))
+    for year in sorted(found.years - {date[0] for date in found.dates} - {month[0] for month in found.months}):
+        ranges.append((year * 10000 + 101, year * 10000 + 1231))
+    return ranges
+
+
+def meeting_date_from_text(texts):
+    """YYYYMMDD of the first "held on <date>" in `texts`, or -1."""
+    for text in texts:
+        for match in _HELD_ON.finditer(text):
+            bounds = _bounds(date_entities(match.group(1)))
+            if bounds is not None and bounds[0] == bounds[1]:
+                return bounds[0]
+    return -1
+
+
+def catalog_entry(source, chunk_texts=(), chunks=None):
+    meeting, date, year = parse_meeting_name(source)
+    if date < 0:
+        # "74th_BoG_meeting_Editable_2024" carries a year, but the minutes say when it was held.
+        found = meeting_date_from_text(chunk_texts[:DATE_SEARCH_CHUNKS])
+        if found > 0:
+            date, year = found, found // 10000
+    return {"source": source, "meeting": meeting, "date": date, "year": year,
+            "chunks": len(chunk_texts) if chunks is None else chunks}
+
+
+class MeetingCatalog:
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda entry: (entry["meeting"] < 0, entry["meeting"], entry["source"]))
+        meetings = np.array([entry["meeting"] for entry in self.entries], dtype=np.int32)
+        # Entries are sorted by meeting number, unnumbered ones last, so the numbered prefix is searchable as is.
+        self._numbered = int((meetings >= 0).sum())
+        self.meetings = meetings[:self._numbered]
+
+        # Each dated entry covers [first, last]: its day, or its whole year when only the year is known.
+        first = np.array([
+            entry["date"] if entry["date"] > 0 else entry["year"] * 10000 + 101 if entry["year"] > 0 else -1
+            for entry in self.entries
+        ], dtype=np.int64)
+        last = np.array([
+            entry["date"] if entry["date"] > 0 else entry["year"] * 10000 + 1231 for entry in self.entries
+        ], dtype=np.int64)
+        dated = np.flatnonzero(first >= 0)
+        order = dated[np.argsort(first[dated], kind="stable")]
+        self._date_order = order
+        self.first_dates = first[order]
+        self.last_dates = last[order]
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, files):
+        """Catalog of `files`, an iterable of (file name, chunk texts in order)."""
+        return cls([catalog_entry(os.path.splitext(file)[0], texts) for file, texts in files])
+
+    @classmethod
+    def from_stores(cls, stores):
+        """Catalog from the loaded store names and meeting index, for vector stores without a catalog file."""
+        entries = {}
+        meeting_index = stores.get(MEETING_INDEX_NAME)
+        if meeting_index is not None:
+            codes, counts = np.unique(meeting_index.source, return_counts=True)
+            for code, count in zip(codes.tolist(), counts.tolist()):
+                source = meeting_index.sources[code]
+                entries[source] = catalog_entry(source, chunks=count)
+        for name, store in stores.items():
+            if name not in entries and name not in ("db_faiss", MEETING_INDEX_NAME):
+                entries[name] = catalog_entry(name, chunks=store.index.ntotal)
+        return cls(entries.values())
+
+    def save(self, vector_store_dir):
+        path = os.path.join(vector_store_dir, CATALOG_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"meetings": self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, vector_store_dir):
+        """The catalog written at ingestion, or None when `vector_store_dir` has none."""
+        path = os.path.join(vector_store_dir, CATALOG_FILE)
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["meetings"])
+
+    def by_meeting(self, first, last=None):
+        """Entries of meetings numbered `first`..`last` (inclusive)."""
+        last = first if last is None else last
+        start = np.searchsorted(self.meetings, first, side="left")
+        end = np.searchsorted(self.meetings, last, side="right")
+        return self.entries[start:end]
+
+    def by_date(self, first, last):
+        """Entries of meetings held between YYYYMMDD `first` and `last` (inclusive)."""
+        # Entries known only by year start up to a year before their last day, so start the search a year early.
+        start = np.searchsorted(self.first_dates, first - 10000, side="left")
+        end = np.searchsorted(self.first_dates, last, side="right")
+        hits = start + np.flatnonzero(self.last_dates[start:end] >= first)
+        return [self.entries[i] for i in self._date_order[hits].tolist()]
+
+    def resolve(self, meetings=(), ranges=()):
+        """Entries matching any of the meeting numbers or any of the date ranges."""
+        found = {}
+        for meeting in sorted(meetings):
+            for entry in self.by_meeting(meeting):
+                found[entry["source"]] = entry
+        for first, last in ranges:
+            for entry in self.by_date(first, last):
+                found[entry["source"]] = entry
+        return list(found.values())
+
+
+def save_catalog(vector_store_dir, files):
+    catalog = MeetingCatalog.build(files)
+    catalog.save(vector_store_dir)
+    return catalog
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("vector_store_dir")
+    parser.add_argument("query")
+    args = parser.parse_args()
+
+    catalog = MeetingCatalog.load(args.vector_store_dir)
+    if catalog is None:
+        raise SystemExit(f"No {CATALOG_FILE} in '{args.vector_store_dir}'; run create_vector_embedding.py")
+    meetings = QueryExpander().entities(args.query).meetings
+    ranges = date_ranges(args.query)
+    print(f"meetings {sorted(meetings)}, date ranges {ranges}")
+    for entry in catalog.resolve(meetings, ranges):
+        print(f"  BoG {entry['meeting']:>3}  {entry['date']:>8}  {entry['chunks']:>5} chunks  {entry['source']}")
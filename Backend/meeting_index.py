@@ -0,0 +1,274 @@
+"""Single FAISS index over every meeting with a compact metadata side table.
+
+Rows are stored grouped by meeting, so "BoG 55" or "2019" becomes a row
+mask (a contiguous ID range in the common case) that FAISS applies inside
+one search call instead of the handler searching one store per meeting.
+
+Build it from the per-meeting stores already on disk with:
+
+    python meeting_index.py --from-stores vector_store
+"""
+import argparse
+import json
+import os
+import re
+import faiss
+import numpy as np
+from chunk_store import ChunkStore, CHUNK_STORE_FILES, is_chunk_store, load_faiss_store, write_chunk_store
+from index_factory import build_index, read_index, search_parameters, write_index, INDEX_TYPES
+from lexical_index import LexicalIndex
+
+MEETING_INDEX_NAME = "meeting_index"
+INDEX_FILE = "index.faiss"
+ROWS_FILE = "rows.npz"
+META_FILE = "meta.json"
+MEETING_INDEX_FILES = (INDEX_FILE, ROWS_FILE, META_FILE) + CHUNK_STORE_FILES
+
+_MEETING_NUMBER = re.compile(r"(\d{1,3})(?:st|nd|rd|th)?[\s_]", re.IGNORECASE)
+_DOTTED_DATE = re.compile(r"(?<!\d)(\d{1,2})\.(\d{1,2})\.(\d{4}|\d{2})(?!\d)")
+_RUN_TOGETHER_DATE = re.compile(r"(?<!\d)(\d{2})(\d{2})\.(\d{4})(?!\d)")
+_YEAR = re.compile(r"(?<!\d)(20\d{2})(?!\d)")
+# Agenda item headings as they appear in the minutes, OCR slips included ("Tem No. 37.05", "item No.37.03").
+ITEM_HEADING = re.compile(r"\b[il]?tem\s+no\s*\.?\s*[:\-]?\s*(\d{1,3}(?:\.\d{1,3})?)", re.IGNORECASE)
+# Item references in questions: "Item No. 5.3", "item 70.05", "item number 12".
+ITEM_REFERENCE = re.compile(r"\bitem\s*(?:no\.?|number|#)?\s*(\d{1,3}(?:\.\d{1,3})?)\b", re.IGNORECASE)
+
+
+def parse_meeting_name(name):
+    """Pull (meeting number, YYYYMMDD date, year) out of a minutes file or folder name; -1 when unknown."""
+    meeting_match = _MEETING_NUMBER.match(name)
+    meeting = int(meeting_match.group(1)) if meeting_match else -1
+
+    date = -1
+    year = -1
+    date_match = _DOTTED_DATE.search(name) or _RUN_TOGETHER_DATE.search(name)
+    if date_match:
+        day, month, year = (int(part) for part in date_match.groups())
+        if year < 100:
+            year += 2000
+        if 1 <= month <= 12 and 1 <= day <= 31:
+            date = year * 10000 + month * 100 + day
+    else:
+        year_match = _YEAR.search(name)
+        if year_match:
+            year = int(year_match.group(1))
+
+    return meeting, date, year
+
+
+def item_key(number):
+    """Canonical item number: "37.02" and "37.2" both become "37.2"."""
+    return ".".join(str(int(part)) for part in number.split("."))
+
+
+def find_items(text):
+    """Canonical keys of the item headings in `text`, in order of first appearance."""
+    return list(dict.fromkeys(item_key(match.group(1)) for match in ITEM_HEADING.finditer(text)))
+
+
+def parse_item_reference(query):
+    """(meeting, item key) of the item `query` refers to, or None. Minutes number items
+    "<meeting>.<n>", so "item 38.10" names BoG 38; the meeting is None for "item 5"."""
+    match = ITEM_REFERENCE.search(query)
+    if not match:
+        return None
+    key = item_key(match.group(1))
+    meeting, dotted, _ = key.partition(".")
+    return (int(meeting) if dotted else None), key
+
+
+class MeetingIndex:
+    def __init__(self, index, columns, sources, items, chunks, item_rows=None, lexical=None):
+        self.index = index
+        self.meeting = columns["meeting"]
+        self.year = columns["year"]
+        self.date = columns["date"]
+        self.item = columns["item"]
+        self.source = columns["source"]
+        self.sources = sources
+        self.items = items
+        self.chunks = chunks
+        # (meeting, item key) -> sorted rows of every chunk belonging to that agenda item
+        self.item_rows = item_rows or {}
+        # BM25 over the same rows; None for an index written before it existed
+        self.lexical = lexical
+
+    @property
+    def ntotal(self):
+        return self.index.ntotal
+
+    @classmethod
+    def load(cls, index_dir):
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        index = read_index(index_dir, INDEX_FILE, meta.get("index"))
+        with np.load(os.path.join(index_dir, ROWS_FILE)) as rows:
+            columns = {name: rows[name] for name in rows.files}
+        chunks = ChunkStore.load(index_dir)
+        if not index.ntotal == meta["rows"] == len(chunks) == columns["meeting"].shape[0]:
+            raise ValueError(f"Meeting index files in '{index_dir}' are out of sync (partially written?)")
+        item_rows = {}
+        for key, rows in meta.get("item_rows", {}).items():
+            meeting, item = key.split("|", 1)
+            item_rows[int(meeting), item] = np.asarray(rows, dtype=np.int64)
+        return cls(index, columns, meta["sources"], meta["items"], chunks, item_rows, LexicalIndex.load(index_dir, len(chunks)))
+
+    def select(self, meetings=None, years=None, sources=None):
+        """Boolean row mask for chunks from any of `meetings`, `years` or `sources` (source names)."""
+        mask = np.zeros(self.ntotal, dtype=bool)
+        if meetings:
+            mask |= np.isin(self.meeting, list(meetings))
+        if years:
+            mask |= np.isin(self.year, list(years))
+        if sources:
+            sources = set(sources)
+            codes = [code for code, source in enumerate(self.sources) if source in sources]
+            mask |= np.isin(self.source, codes)
+        return mask
+
+    def lookup_item(self, meetings, item):
+        """Rows of `item` in any of `meetings`, straight from the item table (no vector search)."""
+        found = []
+        for meeting in meetings:
+            # Minutes number items "<meeting>.<n>", so "item 5 of BoG 38" means item 38.5.
+            key = item if "." in item else f"{meeting}.{item}"
+            for candidate in dict.fromkeys(((meeting, item), (meeting, key))):
+                if candidate in self.item_rows:
+                    found.append(self.item_rows[candidate])
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def _search_params(self, mask):
+        # Returns the bitmap too: FAISS only borrows it, so the caller must keep it alive during the search.
+        positions = np.flatnonzero(mask)
+        bitmap = None
+        if positions[-1] - positions[0] + 1 == positions.shape[0]:
+            selector = faiss.IDSelectorRange(int(positions[0]), int(positions[-1]) + 1)
+        else:
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(self.ntotal, faiss.swig_ptr(bitmap))
+        return search_parameters(self.index, selector), bitmap
+
+    def search(self, query_vector, k, mask=None):
+        """Return the k best (score, row) pairs, restricted to `mask` rows when given."""
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        if mask is None:
+            k = min(k, self.ntotal)
+            scores, positions = self.index.search(query, k)
+        else:
+            k = min(k, int(mask.sum()))
+            if k == 0:
+                return []
+            params, bitmap = self._search_params(mask)
+            scores, positions = self.index.search(query, k, params=params)
+        return [(float(score), int(row)) for score, row in zip(scores[0], positions[0]) if row >= 0]
+
+    def vectors(self, rows):
+        return np.vstack([self.index.reconstruct(int(row)) for row in rows]).astype(np.float32)
+
+    def document(self, row):
+        doc = self.chunks.document(row)
+        doc.metadata["source_folder"] = self.sources[self.source[row]]
+        return doc
+
+    def stats(self):
+        return {
+            "rows": self.ntotal,
+            "meetings": sorted(int(m) for m in np.unique(self.meeting) if m >= 0),
+            "indexed_items": len(self.item_rows)
+        }
+
+
+def build_meeting_index(docs, vectors, out_dir, source_names=None, index_type="flat", index_params=None, batch_size=None):
+    """Write a MeetingIndex for `docs` and their normalized `vectors` to `out_dir`.
+
+    `source_names` optionally gives the name to parse meeting metadata from
+    for each doc (defaults to the file name in doc.metadata["source"]).
+    `index_type` / `index_params` are passed to index_factory.build_index,
+    which adds `batch_size` rows at a time (vectors may be a memmap).
+    """
+    if not isinstance(vectors, np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+    if source_names is None:
+        source_names = [os.path.splitext(doc.metadata.get("source", ""))[0] for doc in docs]
+
+    parsed = [parse_meeting_name(name) for name in source_names]
+    # Group rows by meeting (stable within a meeting) so each meeting is one contiguous ID range.
+    order = sorted(range(len(docs)), key=lambda i: (parsed[i][0] < 0, parsed[i][0], source_names[i]))
+
+    sources, items = [], []
+    source_codes, item_codes = {}, {}
+    columns = {name: np.full(len(docs), -1, dtype=dtype) for name, dtype in
+               (("meeting", np.int16), ("year", np.int16), ("date", np.int32), ("item", np.int32), ("source", np.int32))}
+    item_rows = {}
+
+    for row, i in enumerate(order):
+        doc = docs[i]
+        meeting, date, year = parsed[i]
+        columns["meeting"][row] = meeting
+        columns["date"][row] = date
+        columns["year"][row] = year
+
+        source = source_names[i]
+        if source not in source_codes:
+            source_codes[source] = len(sources)
+            sources.append(source)
+        columns["source"][row] = source_codes[source]
+
+        item = doc.metadata.get("item_no")
+        if item:
+            if item not in item_codes:
+                item_codes[item] = len(items)
+                items.append(item)
+            columns["item"][row] = item_codes[item]
+
+        # Chunks from the item-aware chunker list their items; older chunks only reveal the headings they contain.
+        for key in doc.metadata.get("items") or find_items(doc.page_content):
+            item_rows.setdefault(f"{meeting}|{key}", []).append(row)
+
+    index, params = build_index(vectors, index_type, metric="ip", order=np.asarray(order), batch_size=batch_size, **(index_params or {}))
+
+    os.makedirs(out_dir, exist_ok=True)
+    write_index(out_dir, INDEX_FILE, index, params, vectors, np.asarray(order), batch_size)
+    np.savez(os.path.join(out_dir, ROWS_FILE), **columns)
+    write_chunk_store(out_dir, [docs[i] for i in order])
+    legacy_chunks = os.path.join(out_dir, "chunks.jsonl")
+    if os.path.isfile(legacy_chunks):
+        os.remove(legacy_chunks)
+    # meta.json is written last; load() refuses files whose row counts disagree.
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "dimension": int(vectors.shape[1]), "rows": len(order), "index": params,
+            "sources": sources, "items": items, "item_rows": item_rows
+        }, f, ensure_ascii=False)
+    print(f"✅ Meeting index with {len(order)} chunks from {len(sources)} sources saved to '{out_dir}'")
+
+
+def build_from_stores(vector_store_dir, skip=("db_faiss", MEETING_INDEX_NAME), **index_options):
+    """Consolidate the per-meeting stores (chunk stores or legacy pickles) without re-embedding anything."""
+    from langchain.vectorstores import FAISS
+
+    docs, vectors, source_names = [], [], []
+    for folder_name in sorted(os.listdir(vector_store_dir)):
+        folder_path = os.path.join(vector_store_dir, folder_name)
+        if folder_name in skip:
+            continue
+        if is_chunk_store(folder_path):
+            store = load_faiss_store(folder_path, None)
+        elif os.path.isfile(os.path.join(folder_path, "index.pkl")):
+            store = FAISS.load_local(folder_path, embeddings=None, allow_dangerous_deserialization=True)
+        else:
+            continue
+        for position in range(store.index.ntotal):
+            docs.append(store.docstore.search(store.index_to_docstore_id[position]))
+            vectors.append(store.index.reconstruct(position))
+            source_names.append(folder_name)
+
+    build_meeting_index(docs, np.vstack(vectors), os.path.join(vector_store_dir, MEETING_INDEX_NAME), source_names, **index_options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from-stores", default="vector_store", help="directory holding the per-meeting FAISS stores")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    args = parser.parse_args()
+    build_from_stores(args.from_stores, index_type=args.index_type)
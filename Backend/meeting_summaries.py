@@ -0,0 +1,183 @@
+"""Per-meeting summaries and the overview questions they answer.
+
+summaries/<minutes file>.summary.txt holds one summary per minutes file:
+a "Summary of <name>:" line followed by the meeting's key sentences. The
+ingestion pipeline writes one for every new file without a summary and
+rewrites it when the file changes (or for all files with
+--refresh-summaries); summaries already on disk are otherwise left alone.
+The summaries are extractive: the sentences of the minutes with the most
+distinctive terms, favouring resolutions and decisions, in their original
+order, so no LLM call is needed at ingestion.
+
+The RAG handler loads them into a SummaryIndex keyed by meeting number and
+answers overview questions ("What happened in the 60th BoG meeting?") from
+the summary plus a few chunks instead of the full retrieval path.
+
+    SUMMARIES_DIR=summaries     where the summaries are written and read
+"""
+import math
+import os
+import re
+from collections import Counter
+from langchain.docstore.document import Document
+from lexical_index import tokenize
+from meeting_index import parse_meeting_name
+
+SUMMARIES_DIR = os.getenv("SUMMARIES_DIR", "summaries")
+SUMMARY_SUFFIX = ".summary.txt"
+# About 1200 tokens; longer summaries are cut at a sentence boundary when loaded
+SUMMARY_MAX_CHARS = 4800
+MIN_SENTENCE_CHARS = 40
+MAX_SENTENCE_CHARS = 500
+# OCR runs words together ("ofElectronics&Communication"); such sentences read badly in a summary
+MAX_WORD_CHARS = 25
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z(\"'])")
+_NON_WORD = re.compile(r"\W+")
+_DECISION = re.compile(r"\b(?:resolved|approved|decided|ratified|recommended|agreed|noted|considered)\b", re.IGNORECASE)
+# "What was decided about fees in BoG 55?" is a topical question, not an overview.
+_OVERVIEW = re.compile(
+    r"\b(?:summar(?:y|ise|ize|ies)|overview|highlights?|gist|recap|key\s+(?:decisions|points|outcomes)"
+    r"|what\s+happened\s+(?:in|at|during)\b"
+    r"|what\s+(?:was|were)\s+(?:discussed|decided|the\s+(?:decisions|outcomes))(?!\s+(?:about|on|regarding|for)\b)"
+    r"|(?:tell|inform)\s+(?:me|us)\s+about\s+(?:the\s+)?(?:[\w-]+\s+)?(?:bog|meeting)"
+    r"|(?:outcomes?|agenda)\s+of\s+(?:the\s+)?(?:[\w-]+\s+)?(?:bog|meeting))\b",
+    re.IGNORECASE
+)
+
+
+def is_overview_query(query):
+    """True for questions about a meeting as a whole ("summarize", "what happened in", "key decisions")."""
+    return _OVERVIEW.search(query) is not None
+
+
+def _sentences(text):
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not MIN_SENTENCE_CHARS <= len(sentence) <= MAX_SENTENCE_CHARS:
+            continue
+        if any(len(word) > MAX_WORD_CHARS for word in sentence.split()):
+            continue
+        yield sentence
+
+
+def summarize(texts, max_chars=SUMMARY_MAX_CHARS):
+    """Extractive summary of a meeting's chunk texts: its highest-scoring sentences in document order."""
+    # Overlapping chunks repeat sentences, sometimes with different spacing; keep the first copy.
+    unique = {}
+    for text in texts:
+        for sentence in _sentences(text):
+            unique.setdefault(_NON_WORD.sub("", sentence.lower()), sentence)
+    sentences = list(unique.values())
+    if not sentences:
+        return ""
+    tokens = [tokenize(sentence) for sentence in sentences]
+    # Terms that recur in a meeting are its subject; ones in every sentence say nothing, and
+    # ones in a single sentence are mostly OCR noise, so they carry no weight.
+    sentence_freq = Counter(term for terms in tokens for term in set(terms))
+    weights = {
+        term: math.log1p(count) * math.log(len(sentences) / count + 1) if count > 1 else 0.0
+        for term, count in sentence_freq.items()
+    }
+
+    scores = []
+    for position, (sentence, terms) in enumerate(zip(sentences, tokens)):
+        terms = set(terms)
+        if sum(1 for term in terms if weights[term]) < len(terms) / 2:
+            scores.append(0.0)
+            continue
+        score = sum(weights[term] for term in terms) / math.sqrt(len(terms) + 1)
+        if _DECISION.search(sentence):
+            score *= 1.5
+        # The opening sentences name the meeting, its date and its chair.
+        if position < 3:
+            score *= 1.2
+        scores.append(score)
+
+    chosen, length = [], 0
+    for i in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+        if not scores[i]:
+            break
+        if length + len(sentences[i]) + 1 > max_chars:
+            continue
+        chosen.append(i)
+        length += len(sentences[i]) + 1
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def summary_path(summaries_dir, source):
+    return os.path.join(summaries_dir, source + SUMMARY_SUFFIX)
+
+
+def write_summary(summaries_dir, source, texts):
+    os.makedirs(summaries_dir, exist_ok=True)
+    path = summary_path(summaries_dir, source)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(f"Summary of {source}:\n{summarize(texts)}\n")
+    os.replace(path + ".tmp", path)
+
+
+def refresh_summaries(summaries_dir, entries, changes, force=False):
+    """Write summaries for new or changed minutes files and drop those of removed ones; returns how many were written."""
+    for file in changes["removed"]:
+        path = summary_path(summaries_dir, os.path.splitext(file)[0])
+        if os.path.isfile(path):
+            os.remove(path)
+    changed = set(changes["changed"])
+    written = 0
+    for file, chunks in entries:
+        source = os.path.splitext(file)[0]
+        if chunks and (force or file in changed or not os.path.isfile(summary_path(summaries_dir, source))):
+            write_summary(summaries_dir, source, [chunk.page_content for chunk in chunks])
+            written += 1
+    return written
+
+
+def summaries_signature(summaries_dir=SUMMARIES_DIR):
+    """(name, mtime, size) of every summary file, so a reload can tell when ingestion rewrote any of them."""
+    if not os.path.isdir(summaries_dir):
+        return ()
+    signature = []
+    for file_name in sorted(os.listdir(summaries_dir)):
+        if file_name.endswith(SUMMARY_SUFFIX):
+            stat = os.stat(os.path.join(summaries_dir, file_name))
+            signature.append((file_name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _trim(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(". ", 0, max_chars)
+    return text[:cut + 1 if cut > 0 else max_chars]
+
+
+class SummaryIndex:
+    def __init__(self, summaries):
+        # meeting number -> [(source, summary text)], sources in name order
+        self.by_meeting = {}
+        for source, text in sorted(summaries.items()):
+            meeting = parse_meeting_name(source)[0]
+            if meeting >= 0:
+                self.by_meeting.setdefault(meeting, []).append((source, text))
+
+    @classmethod
+    def load(cls, summaries_dir=SUMMARIES_DIR, max_chars=SUMMARY_MAX_CHARS):
+        summaries = {}
+        if os.path.isdir(summaries_dir):
+            for file_name in os.listdir(summaries_dir):
+                if file_name.endswith(SUMMARY_SUFFIX):
+                    with open(os.path.join(summaries_dir, file_name), encoding="utf-8") as f:
+                        summaries[file_name[:-len(SUMMARY_SUFFIX)]] = _trim(f.read().strip(), max_chars)
+        return cls(summaries)
+
+    def __len__(self):
+        return sum(len(summaries) for summaries in self.by_meeting.values())
+
+    def documents(self, meeting):
+        """The summaries of `meeting` as Documents; a meeting ingested twice has one summary per file,
+        which the context packer then drops as duplicates."""
+        return [
+            Document(page_content=text, metadata={"source": source + SUMMARY_SUFFIX, "meeting": meeting})
+            for source, text in self.by_meeting.get(meeting, [])
+        ]
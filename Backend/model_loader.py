@@ -0,0 +1,165 @@
+"""Deferred, cache-first model loading and a startup-time breakdown.
+
+Loading the embedding model imports torch and sentence-transformers and,
+unless the Hugging Face Hub is told it is offline, sends a HEAD request to
+huggingface.co for every model file. Services wrap their models in a
+LazyModel instead: nothing is imported or loaded until the first call or a
+background prewarm, so the API answers health checks before the model is
+in memory. When the model is already in the local cache it is loaded with
+local_files_only=True, so no network calls are made; anything that is not
+cached is still downloaded. (Setting HF_HUB_OFFLINE instead would apply to
+the whole process, and only if it ran before huggingface_hub is imported.)
+
+    MODEL_OFFLINE=auto     1: always offline, 0: never, auto: offline when cached
+    MODEL_CACHE_DIR        cache folder (default: the Hugging Face hub cache)
+    LAZY_MODEL_LOADING=1   0 loads every model while the service starts
+    PREWARM_MODELS=1       load lazy models on a background thread at startup
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+MODEL_OFFLINE = os.getenv("MODEL_OFFLINE", "auto").lower()
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR") or None
+LAZY_MODEL_LOADING = os.getenv("LAZY_MODEL_LOADING", "1") == "1"
+PREWARM_MODELS = os.getenv("PREWARM_MODELS", "1") == "1"
+
+
+class StartupProfile:
+    """Milliseconds spent in each startup phase, in the order they finished."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.ready_ms = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def record(self, name, ms):
+        with self._lock:
+            self.phases[name] = round(ms, 1)
+
+    def mark_ready(self):
+        self.ready_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        breakdown = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases.items())
+        print(f"[⏱️] Ready in {self.ready_ms:.0f} ms ({breakdown})")
+
+    def stats(self):
+        with self._lock:
+            return {"ready_ms": self.ready_ms, "phases": dict(self.phases)}
+
+
+# Created when the service imports this module, which it does before anything heavy.
+startup = StartupProfile()
+
+
+def hub_cache_dir(cache_dir=None):
+    if cache_dir:
+        return cache_dir
+    if os.getenv("HF_HUB_CACHE"):
+        return os.getenv("HF_HUB_CACHE")
+    return os.path.join(os.getenv("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface")), "hub")
+
+
+def cached_locally(model_name, cache_dir=None):
+    """True when a snapshot of `model_name` ("org/name") is in the hub cache."""
+    snapshots = os.path.join(hub_cache_dir(cache_dir), "models--" + model_name.replace("/", "--"), "snapshots")
+    if not os.path.isdir(snapshots):
+        return False
+    return any(os.path.isfile(os.path.join(snapshots, snapshot, "config.json")) for snapshot in os.listdir(snapshots))
+
+
+def load_cached_first(load, model_name, cache_dir=None):
+    """`load(local_files_only)` with True when MODEL_OFFLINE says `model_name` should come from the cache.
+
+    In auto mode a cached model whose snapshot turns out incomplete is
+    downloaded after all; MODEL_OFFLINE=1 never downloads.
+    """
+    if MODEL_OFFLINE in ("1", "true"):
+        return load(True)
+    if MODEL_OFFLINE == "auto" and cached_locally(model_name, cache_dir):
+        try:
+            return load(True)
+        except Exception as e:
+            print(f"[!] {model_name} is not fully cached ({e}); downloading it")
+    return load(False)
+
+
+def hub_file(model_name, file_name, cache_dir=None):
+    """Local path of `file_name` from the Hub repo `model_name`: the cached copy if there is one, else a download."""
+    from huggingface_hub import hf_hub_download
+    if MODEL_OFFLINE not in ("0", "false"):
+        try:
+            return hf_hub_download(model_name, file_name, cache_dir=cache_dir, local_files_only=True)
+        except Exception:
+            if MODEL_OFFLINE in ("1", "true"):
+                raise
+    return hf_hub_download(model_name, file_name, cache_dir=cache_dir)
+
+
+class LazyModel:
+    """Builds a model with `loader()` on first use (once, thread-safe) and records how long it took."""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._model = None
+        self._error = None
+        self._lock = threading.Lock()
+        self._prewarm = None
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    print(f"[⏳] Loading {self.name}...")
+                    start = time.perf_counter()
+                    try:
+                        model = self._loader()
+                    except Exception as e:
+                        self._error = e
+                        raise
+                    load_ms = (time.perf_counter() - start) * 1000
+                    startup.record(f"load {self.name}", load_ms)
+                    self._model, self._error = model, None
+                    print(f"[✓] {self.name} loaded in {load_ms:.0f} ms")
+        return self._model
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def prewarm(self, warmup=None):
+        """Load on a daemon thread, then run `warmup(model)` once (e.g. a first encode call)."""
+        if self._prewarm is not None or self.loaded:
+            return
+
+        def run():
+            try:
+                model = self.get()
+                if warmup is not None:
+                    start = time.perf_counter()
+                    warmup(model)
+                    startup.record(f"warm up {self.name}", (time.perf_counter() - start) * 1000)
+            except Exception as e:
+                print(f"[!] Prewarming {self.name} failed: {e}")
+
+        self._prewarm = threading.Thread(target=run, name=f"prewarm-{self.name}", daemon=True)
+        self._prewarm.start()
+
+    def status(self):
+        if self._model is not None:
+            return "ready"
+        if self._lock.locked():
+            return "loading"
+        if self._error is not None:
+            return f"failed: {self._error}"
+        return "not loaded"
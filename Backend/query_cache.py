@@ -0,0 +1,133 @@
+"""LRU/TTL caches for amplified queries and query embeddings.
+
+Shared by the FastAPI handler and Knowledge_Graph/query_helper.py. Entries
+live in memory and, when a SQLite path is configured, are written through to
+disk so a restarted worker starts warm.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "2048"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "86400"))
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH") or None
+
+
+def normalize_query(query):
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip("?!. ")
+
+
+class LRUCache:
+    def __init__(self, name, max_entries=1024, ttl=None, persist_path=None, encode=None, decode=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._db = None
+        if persist_path:
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {name} (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+            self._db.commit()
+
+    def _expired(self, expires_at):
+        return expires_at is not None and expires_at < time.time()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(f"SELECT value, expires_at FROM {self.name} WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    value = self.decode(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def _remember(self, key, value, expires_at):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, self.encode(value), expires_at)
+                )
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.name}")
+                self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class QueryCache:
+    """normalized query -> amplified query, and text -> embedding vector."""
+
+    def __init__(self, namespace, max_entries=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL, persist_path=QUERY_CACHE_PATH):
+        # The namespace (embedding model name) keeps vectors from different models apart in a shared file.
+        self.namespace = namespace
+        self.amplified = LRUCache("amplified_queries", max_entries, ttl, persist_path)
+        self.embeddings = LRUCache(
+            "embeddings", max_entries, ttl, persist_path,
+            encode=lambda vector: np.asarray(vector, dtype=np.float32).tobytes(),
+            decode=lambda blob: np.frombuffer(blob, dtype=np.float32)
+        )
+
+    def get_amplified(self, query):
+        return self.amplified.get(normalize_query(query))
+
+    def set_amplified(self, query, amplified_query):
+        self.amplified.set(normalize_query(query), amplified_query)
+
+    def embed(self, embed_fn, text):
+        key = f"{self.namespace}:{text}"
+        vector = self.embeddings.get(key)
+        if vector is None:
+            vector = np.asarray(embed_fn(text), dtype=np.float32)
+            self.embeddings.set(key, vector)
+        return vector
+
+    def stats(self):
+        return {"amplified": self.amplified.stats(), "embeddings": self.embeddings.stats()}
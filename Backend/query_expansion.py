@@ -0,0 +1,299 @@
+"""Local, deterministic query expansion (replaces the LLM amplification call).
+
+The amplification prompt asked the LLM to repeat the query's BoG numbers,
+item numbers, years and names in other phrasings. QueryExpander does the
+same with precompiled patterns:
+
+    meetings  "74th BoG", "BoG 74", "seventy-fourth meeting"  -> 74th BoG meeting, BoG 74, seventy-fourth meeting
+    items     "item 5.3", "item 3 of BoG 5"                    -> Item No. 5.03, Item No. 5.3, 5.03
+    dates     "23.02.2015", "23 Feb 2015", "March 2019"        -> 23.02.2015, 23/02/2015, 23 February 2015, ...
+    synonyms  "recruitment", "FC"                              -> appointment, Finance Committee, ...
+
+Acronyms are mined from the corpus at ingestion ("Finance Committee (FC)")
+and saved as vector_store/query_vocabulary.json; synonyms whose words never
+occur in the corpus (the BM25 vocabulary) are dropped, so expansions only
+add terms that can match.
+
+    python query_expansion.py "decisions of the seventy-fourth meeting on faculty recruitment"
+"""
+import argparse
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from lexical_index import tokenize
+
+VOCABULARY_FILE = "query_vocabulary.json"
+MAX_MEETING_NUMBER = 199
+
+_ONES = ["", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven", "twelve",
+         "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+_ORDINAL_WORDS = {"one": "first", "two": "second", "three": "third", "five": "fifth", "eight": "eighth",
+                  "nine": "ninth", "twelve": "twelfth"}
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+
+# Domain phrasings the minutes use interchangeably; keys and values are lowercase phrases.
+SYNONYMS = {
+    "bog": ["board of governors"],
+    "board of governors": ["bog"],
+    "recruitment": ["appointment", "selection"],
+    "appointment": ["recruitment", "selection"],
+    "hiring": ["recruitment", "appointment"],
+    "fee": ["fees", "charges"],
+    "fees": ["fee", "charges"],
+    "salary": ["pay", "emoluments"],
+    "budget": ["estimates", "grant"],
+    "decided": ["resolved", "approved"],
+    "decision": ["resolved", "approved"],
+    "resolved": ["decided", "approved"],
+    "approved": ["approval", "ratified"],
+    "ratified": ["approved", "ratification"],
+    "construction": ["building", "works"],
+    "building": ["construction"],
+    "students": ["student"],
+    "faculty": ["teaching staff"],
+    "staff": ["employees"],
+    "mou": ["memorandum of understanding"],
+    "memorandum of understanding": ["mou"],
+    "minutes": ["proceedings"],
+    "chairman": ["chairperson"],
+    "chairperson": ["chairman"],
+}
+
+_ACRONYM = re.compile(r"\b((?:[A-Z][a-z]+|of|and|for|the|&)(?:\s+(?:[A-Z][a-z]+|of|and|for|the|&)){1,7})\s*\(\s*([A-Z][A-Za-z&]{1,9})\s*\)")
+_FILLER_WORDS = frozenset(("of", "and", "for", "the", "&"))
+
+
+def number_words(n):
+    """Cardinal words for 1 <= n <= 199 ("seventy-four")."""
+    if n >= 100:
+        rest = n - 100
+        return "one hundred" + (f" {number_words(rest)}" if rest else "")
+    if n < 20:
+        return _ONES[n]
+    tens, ones = divmod(n, 10)
+    return _TENS[tens] + (f"-{_ONES[ones]}" if ones else "")
+
+
+def ordinal_words(n):
+    """Ordinal words for 1 <= n <= 199 ("seventy-fourth")."""
+    words = number_words(n)
+    head, sep, last = words.rpartition("-" if "-" in words.split(" ")[-1] else " ")
+    if last in _ORDINAL_WORDS:
+        last = _ORDINAL_WORDS[last]
+    elif last.endswith("y"):
+        last = last[:-1] + "ieth"
+    else:
+        last += "th"
+    return head + sep + last
+
+
+def ordinal(n):
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def _number_key(words):
+    return " ".join(re.split(r"[\s-]+", words.lower()))
+
+
+_NUMBER_BY_WORD = {}
+for _n in range(1, MAX_MEETING_NUMBER + 1):
+    for _words in (ordinal_words(_n), number_words(_n)):
+        _NUMBER_BY_WORD[_number_key(_words)] = _n
+        if _n > 100:
+            _NUMBER_BY_WORD[_number_key(_words.replace("hundred", "hundred and"))] = _n
+# Longest first so "seventy fourth" wins over "seventy"; words may be joined by spaces or hyphens.
+_NUMBER_WORDS = "|".join(key.replace(" ", r"[\s-]+") for key in sorted(_NUMBER_BY_WORD, key=len, reverse=True))
+_MEETING_NOUN = r"(?:bog|board(?:\s+of\s+governors)?|meeting)"
+
+_MEETING_PATTERNS = (
+    # The suffix is required: "2 board resolutions" and "top 10 meeting decisions" are counts.
+    re.compile(rf"\b(\d{{1,3}})(?:st|nd|rd|th)\s+{_MEETING_NOUN}\b", re.IGNORECASE),
+    re.compile(rf"\b(?:bog|meeting)\s*(?:no\.?|number|#)?\s*(\d{{1,3}})\b(?!\.\d)", re.IGNORECASE),
+    re.compile(rf"\b({_NUMBER_WORDS})\s+{_MEETING_NOUN}\b", re.IGNORECASE),
+)
+# "the first (BoG) meeting of 2019" counts meetings within a period; it is not BoG 1.
+_PERIOD_QUALIFIER = re.compile(
+    r"(?:\s+meeting)?\s+(?:of|in|during|for|held\s+(?:in|on|during))\s+(?:the\s+)?(?:year\s+)?(?:\d|[a-z]+\.?,?\s+\d)", re.IGNORECASE
+)
+# First words of spelled-out numbers; the (slow) spelled-out pattern above only runs when one occurs.
+_NUMBER_WORD_STARTS = frozenset(key.split()[0] for key in _NUMBER_BY_WORD)
+_ITEM = re.compile(r"\bitem\s*(?:no\.?|number|#)?\s*(\d{1,3})(?:\.(\d{1,3}))?\b", re.IGNORECASE)
+_NUMERIC_DATE = re.compile(r"(?<![\d.])(\d{1,2})[./-](\d{1,2})[./-](\d{4}|\d{2})(?![\d.])")
+_MONTH_NAMES = {name.lower(): i for i, name in enumerate(MONTHS, 1)}
+_MONTH_NAMES.update({name[:3].lower(): i for i, name in enumerate(MONTHS, 1)})
+_MONTH_NAMES["sept"] = 9
+_MONTH = r"(" + "|".join(sorted(_MONTH_NAMES, key=len, reverse=True)) + r")\.?"
+_DAY_MONTH_YEAR = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}[\s,]+(\d{{4}})\b", re.IGNORECASE)
+_MONTH_DAY_YEAR = re.compile(rf"\b{_MONTH}\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE)
+_MONTH_YEAR = re.compile(rf"\b{_MONTH}[\s,]+(\d{{4}})\b", re.IGNORECASE)
+_YEAR = re.compile(r"(?<![\d.])(20\d{2})(?![\d.])")
+
+
+def mine_acronyms(texts, min_count=1):
+    """acronym -> expansion from "Long Name (LN)" definitions in `texts`."""
+    seen = defaultdict(Counter)
+    for text in texts:
+        if "(" not in text:
+            continue
+        for phrase, acronym in _ACRONYM.findall(text):
+            letters = [char for char in acronym if char.isupper()]
+            words = phrase.split()
+            # The shortest tail of the phrase whose capitalized words spell the acronym.
+            for start in range(len(words) - 1, -1, -1):
+                tail = words[start:]
+                if tail[0] in _FILLER_WORDS:
+                    continue
+                initials = [word[0] for word in tail if word not in _FILLER_WORDS]
+                if initials == letters:
+                    seen[acronym][" ".join(tail)] += 1
+                    break
+                if len(initials) > len(letters):
+                    break
+    return {
+        acronym: counts.most_common(1)[0][0]
+        for acronym, counts in sorted(seen.items())
+        if counts.most_common(1)[0][1] >= min_count and len(acronym) > 1
+    }
+
+
+def save_vocabulary(vector_store_dir, texts):
+    acronyms = mine_acronyms(texts)
+    path = os.path.join(vector_store_dir, VOCABULARY_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"acronyms": acronyms}, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+    return acronyms
+
+
+class QueryEntities:
+    def __init__(self):
+        self.meetings = set()
+        self.items = []
+        self.dates = []
+        self.months = []
+        self.years = set()
+
+
+def date_entities(text):
+    """QueryEntities with only the dates, months and years of `text` filled in."""
+    found = QueryEntities()
+    if not any(char.isdigit() for char in text):
+        return found
+    for match in _NUMERIC_DATE.finditer(text):
+        day, month, year = (int(part) for part in match.groups())
+        found.dates.append((year + 2000 if year < 100 else year, month, day))
+    for match in _DAY_MONTH_YEAR.finditer(text):
+        found.dates.append((int(match.group(3)), _MONTH_NAMES[match.group(2).lower()], int(match.group(1))))
+    for match in _MONTH_DAY_YEAR.finditer(text):
+        found.dates.append((int(match.group(3)), _MONTH_NAMES[match.group(1).lower()], int(match.group(2))))
+    dated_months = {(year, month) for year, month, _ in found.dates}
+    for match in _MONTH_YEAR.finditer(text):
+        year_month = (int(match.group(2)), _MONTH_NAMES[match.group(1).lower()])
+        if year_month not in dated_months:
+            found.months.append(year_month)
+    found.dates = [date for date in dict.fromkeys(found.dates) if 1 <= date[1] <= 12 and 1 <= date[2] <= 31]
+    found.years = {int(year) for year in _YEAR.findall(text)} | {date[0] for date in found.dates}
+    found.years |= {year for year, _ in found.months}
+    return found
+
+
+class QueryExpander:
+    def __init__(self, acronyms=None, synonyms=SYNONYMS):
+        self.synonyms = {phrase: list(alternatives) for phrase, alternatives in synonyms.items()}
+        for acronym, expansion in (acronyms or {}).items():
+            self.synonyms.setdefault(acronym.lower(), []).append(expansion)
+            self.synonyms.setdefault(expansion.lower(), []).append(acronym)
+        # Phrases are matched on word boundaries of the lowercased query, longest first.
+        self._phrase = re.compile(
+            r"\b(" + "|".join(re.escape(phrase) for phrase in sorted(self.synonyms, key=len, reverse=True)) + r")\b"
+        ) if self.synonyms else None
+
+    @classmethod
+    def load(cls, vector_store_dir):
+        """An expander with the acronyms mined at ingestion, if vector_store_dir has them."""
+        path = os.path.join(vector_store_dir, VOCABULARY_FILE)
+        if not os.path.isfile(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f).get("acronyms", {}))
+
+    def entities(self, query):
+        found = date_entities(query)
+        spelled = not _NUMBER_WORD_STARTS.isdisjoint(re.findall(r"[a-z]+", query.lower()))
+        for pattern in _MEETING_PATTERNS if spelled else _MEETING_PATTERNS[:-1]:
+            for match in pattern.finditer(query):
+                number = match.group(1)
+                # Spelled-out ordinals only name a BoG meeting when no date qualifies them.
+                if not number.isdigit() and _PERIOD_QUALIFIER.match(query, match.end()):
+                    continue
+                value = int(number) if number.isdigit() else _NUMBER_BY_WORD.get(_number_key(number))
+                if value:
+                    found.meetings.add(value)
+        for match in _ITEM.finditer(query):
+            found.items.append((int(match.group(1)), int(match.group(2)) if match.group(2) else None))
+        return found
+
+    def _synonym_phrases(self, query, vocabulary):
+        lowered = query.lower()
+        phrases = []
+        for phrase in dict.fromkeys(match.group(1) for match in self._phrase.finditer(lowered)) if self._phrase else ():
+            for alternative in self.synonyms[phrase]:
+                # Skip alternatives the corpus never uses; they cannot match anything.
+                if vocabulary is not None and not all(token in vocabulary for token in tokenize(alternative)):
+                    continue
+                if alternative.lower() not in lowered:
+                    phrases.append(alternative)
+        return phrases
+
+    def expand(self, query, vocabulary=None):
+        """`query` followed by other phrasings of its meetings, items, dates and synonyms.
+
+        `vocabulary` is an optional container of corpus terms (e.g. a BM25
+        term table) used to drop synonyms that cannot match.
+        """
+        found = self.entities(query)
+        phrases = []
+        for meeting in sorted(found.meetings):
+            phrases += [f"{ordinal(meeting)} BoG meeting", f"BoG {meeting}", f"{ordinal_words(meeting)} meeting"]
+        meetings = sorted(found.meetings)
+        for major, minor in found.items:
+            if minor is None:
+                # "item 5 of BoG 38" is numbered 38.05 in the minutes.
+                keys = [(meeting, major) for meeting in meetings] or [(major, None)]
+            else:
+                keys = [(major, minor)]
+            for first, second in keys:
+                if second is None:
+                    phrases += [f"Item No. {first}"]
+                else:
+                    phrases += [f"Item No. {first}.{second:02d}", f"Item No. {first}.{second}", f"{first}.{second:02d}"]
+        for year, month, day in found.dates:
+            phrases += [
+                f"{day:02d}.{month:02d}.{year}", f"{day:02d}/{month:02d}/{year}", f"{day}.{month}.{year}",
+                f"{day} {MONTHS[month - 1]} {year}", f"{MONTHS[month - 1]} {year}"
+            ]
+        for year, month in found.months:
+            phrases += [f"{MONTHS[month - 1]} {year}", f"{month:02d}.{year}"]
+        for year in sorted(found.years):
+            phrases.append(str(year))
+        phrases += self._synonym_phrases(query, vocabulary)
+
+        lowered = query.lower()
+        # Case-insensitive dedup: the static synonyms and the mined acronyms can both produce a phrase.
+        unique = {}
+        for phrase in phrases:
+            unique.setdefault(phrase.lower(), phrase)
+        extra = [phrase for key, phrase in unique.items() if key not in lowered]
+        return query if not extra else f"{query} {' ; '.join(extra)}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("query")
+    parser.add_argument("--vector-store-dir", default="vector_store")
+    args = parser.parse_args()
+    print(QueryExpander.load(args.vector_store_dir).expand(args.query))
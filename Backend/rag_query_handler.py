@@ -1,74 +1,134 @@
 import os
+import asyncio
 import re
-import requests
-import heapq
+import time
 import numpy as np
-from langchain.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain.docstore.document import Document
+from concurrent.futures import ThreadPoolExecutor
+from store_registry import VectorStoreRegistry, file_signature
+from retrieval import fan_out_search, rank_by_vectors, reciprocal_rank_fusion
+from llm_client import LLMStreamError, TogetherClient
+from meeting_index import MEETING_INDEX_NAME, parse_item_reference
+from meeting_catalog import date_ranges
+from meeting_summaries import SummaryIndex, SUMMARIES_DIR, is_overview_query, summaries_signature
+from query_cache import QueryCache, normalize_query
+from query_expansion import QueryExpander, VOCABULARY_FILE
+from answer_cache import SemanticAnswerCache, make_source_key
+from context_packer import ContextPacker
+from model_loader import LazyModel, LAZY_MODEL_LOADING, MODEL_CACHE_DIR, startup
+from embedding_backends import EMBEDDING_BACKEND, load_embeddings, model_id
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# hybrid fuses BM25 and vector rankings (stores without a bm25.npz use vector search); vector is the old path
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")
+# Fused results sent to the LLM, and candidates taken from each ranking before fusing
+HYBRID_TOP_K = int(os.getenv("HYBRID_TOP_K", "20"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "100"))
+# local: rule-based expansion (query_expansion.py, well under 1 ms); llm: the Together amplification call
+QUERY_EXPANSION = os.getenv("QUERY_EXPANSION", "local")
+# Overview questions about one meeting are answered from its summary (meeting_summaries.py) plus a few chunks
+SUMMARY_ROUTE = os.getenv("SUMMARY_ROUTE", "1") == "1"
+SUMMARY_TOP_CHUNKS = int(os.getenv("SUMMARY_TOP_CHUNKS", "3"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "2500"))
+
+
+class LazyEmbeddings(Embeddings):
+    """Embeddings from an embedding backend (see embedding_backends.py), loaded on first use.
+
+    An Embeddings subclass, so FAISS.load_local accepts it and a legacy
+    store's text similarity_search embeds the query through embed_query.
+    """
+
+    def __init__(self, model_name, backend=EMBEDDING_BACKEND, encode_kwargs=None, cache_folder=MODEL_CACHE_DIR):
+        self.model_name = model_name
+        self.backend = backend
+        self.encode_kwargs = encode_kwargs or {}
+        self.cache_folder = cache_folder
+        self.model = LazyModel(model_id(model_name, backend), self._load)
+
+    def _load(self):
+        return load_embeddings(self.model_name, self.backend, self.encode_kwargs, self.cache_folder)
+
+    def embed_query(self, text):
+        return self.model.get().embed_query(text)
+
+    def embed_documents(self, texts):
+        return self.model.get().embed_documents(texts)
 
 
 class TextRAGHandler:
     def __init__(self, vector_store_dir="vector_store", together_api_key=None, model_name="mistralai/Mixtral-8x7B-Instruct-v0.1"):
         self.vector_store_dir = vector_store_dir
-        # Updated: Using BAAI's bge-base-en-v1.5 embedding model
-        self.embedding_model = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
+        self.embedding_model = LazyEmbeddings(
+            model_name=EMBEDDING_MODEL,
             encode_kwargs={"normalize_embeddings": True}
         )
-        self.vector_stores = {}
+        if not LAZY_MODEL_LOADING:
+            self.embedding_model.model.get()
+        self.store_registry = VectorStoreRegistry(vector_store_dir, self.embedding_model)
+        # Backends produce slightly different vectors, so each gets its own cached embeddings.
+        self.query_cache = QueryCache(namespace=model_id(EMBEDDING_MODEL, EMBEDDING_BACKEND))
+        self.answer_cache = SemanticAnswerCache()
+        self.query_expansion = QUERY_EXPANSION
+        self.query_expander = QueryExpander.load(vector_store_dir)
+        self._vocabulary_signature = file_signature(os.path.join(vector_store_dir, VOCABULARY_FILE))
+        self.summary_index = SummaryIndex.load(SUMMARIES_DIR)
+        self._summaries_signature = summaries_signature(SUMMARIES_DIR)
+        self.search_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("SEARCH_WORKERS", "8")),
+            thread_name_prefix="faiss-search"
+        )
         self.TOGETHER_API_KEY = together_api_key or os.getenv("TOGETHER_API_KEY")
         self.MODEL_NAME = model_name
 
         if not self.TOGETHER_API_KEY:
             raise ValueError("Together API key missing. Set TOGETHER_API_KEY env variable or pass it explicitly.")
 
+        self.llm_client = TogetherClient(self.TOGETHER_API_KEY, self.MODEL_NAME)
+        # Counts tokens with the LLM's own tokenizer (CONTEXT_TOKENIZER overrides it)
+        self.context_packer = ContextPacker(self.MODEL_NAME)
+
         self._load_all_vector_stores()
+        # Ingestion rewrites the vocabulary and the summaries with the stores; pick them up with them rather than at restart.
+        self.store_registry.add_reload_hook(self._reload_side_files)
+
+    def _reload_side_files(self, stores_changed):
+        signature = file_signature(os.path.join(self.vector_store_dir, VOCABULARY_FILE))
+        if stores_changed or signature != self._vocabulary_signature:
+            self.query_expander = QueryExpander.load(self.vector_store_dir)
+            self._vocabulary_signature = signature
+            print(f"[🔤] Reloaded query vocabulary ({len(self.query_expander.synonyms)} phrases)")
+        signature = summaries_signature(SUMMARIES_DIR)
+        if signature != self._summaries_signature:
+            self.summary_index = SummaryIndex.load(SUMMARIES_DIR)
+            self._summaries_signature = signature
+            print(f"[📝] Reloaded {len(self.summary_index)} meeting summaries")
+
+    @property
+    def vector_stores(self):
+        return self.store_registry.stores
 
     def _load_all_vector_stores(self):
         print("[📁] Loading vector stores...")
-        self.vector_stores.clear()
+        with startup.phase("vector stores"):
+            return self.store_registry.reload()
 
-        if not os.path.exists(self.vector_store_dir):
-            print(f"[!] Directory '{self.vector_store_dir}' does not exist.")
-            return
+    def prewarm(self):
+        """Load the embedding model in the background and run one encode so the first query pays for neither."""
+        self.embedding_model.model.prewarm(lambda model: model.embed_query("warm up"))
+        self.context_packer.tokenizer.prewarm()
 
-        for folder_name in os.listdir(self.vector_store_dir):
-            subfolder_path = os.path.join(self.vector_store_dir, folder_name)
-            if os.path.isdir(subfolder_path):
-                try:
-                    db = FAISS.load_local(subfolder_path, embeddings=self.embedding_model, allow_dangerous_deserialization=True)
-                    self.vector_stores[folder_name] = db
-                    print(f"[✓] Loaded vector DB: {folder_name}")
-                except Exception as e:
-                    print(f"[!] Failed to load {folder_name}: {e}")
-        print(f"[📁] Vector stores available: {list(self.vector_stores.keys())}")
+    def model_status(self):
+        return {"embedding": self.embedding_model.model.status(), "tokenizer": self.context_packer.tokenizer.status()}
 
     def _query_together_ai(self, messages: list) -> str:
-        try:
-            response = requests.post(
-                "https://api.together.ai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.TOGETHER_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.MODEL_NAME,
-                    "messages": messages,
-                    "max_tokens": 1024,
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "stream": False
-                   },
-                timeout=60
-            )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
-        except Exception as e:
-            return f"System error: {e}"
+        return self.llm_client.chat(messages)
 
-    def _generate_amplified_query(self, query: str, num_variations: int = 3) -> str:
-        prompt = [
+    async def _aquery_together_ai(self, messages: list) -> str:
+        return await self.llm_client.achat(messages)
+
+    def _amplification_messages(self, query: str, num_variations: int = 3) -> list:
+        return [
             {
                 "role": "system",
                 "content": (
@@ -84,55 +144,68 @@ class TextRAGHandler:
                 "content": f"Original user query: '{query}'\n\nGenerate a single amplified query with {num_variations} variations merged together."
             }
         ]
-        response = self._query_together_ai(prompt)
+
+    def _amplified_or_original(self, query: str, response: str) -> str:
         if response and not response.startswith("System error:"):
-            return response.strip()
+            amplified_query = response.strip()
+            self.query_cache.set_amplified(query, amplified_query)
+            return amplified_query
         return query
 
-    def _extract_bog_folders_from_query(self, query: str):
-        folder_names = list(self.vector_stores.keys())
-        detected = set()
+    def _expand_locally(self, query: str) -> str:
+        # The BM25 vocabulary of the corpus, so synonyms the minutes never use are left out.
+        vector_stores = self.vector_stores
+        store = vector_stores.get(MEETING_INDEX_NAME) or vector_stores.get("db_faiss")
+        lexical = getattr(store, "lexical", None)
+        return self.query_expander.expand(query, lexical.term_ids if lexical is not None else None)
 
+    def _generate_amplified_query(self, query: str, num_variations: int = 3) -> str:
+        if self.query_expansion != "llm":
+            return self._expand_locally(query)
+        cached = self.query_cache.get_amplified(query)
+        if cached is not None:
+            return cached
+        response = self._query_together_ai(self._amplification_messages(query, num_variations))
+        return self._amplified_or_original(query, response)
+
+    async def _agenerate_amplified_query(self, query: str, num_variations: int = 3) -> str:
+        if self.query_expansion != "llm":
+            return self._expand_locally(query)
+        cached = self.query_cache.get_amplified(query)
+        if cached is not None:
+            return cached
+        response = await self._aquery_together_ai(self._amplification_messages(query, num_variations))
+        return self._amplified_or_original(query, response)
+
+    def _extract_meeting_filters(self, query: str):
         bog_range_matches = re.findall(r"\bBoG\s*(\d{1,3})\s*(?:to|-)\s*(\d{1,3})\b", query, flags=re.IGNORECASE)
         bog_single_matches = re.findall(r"\bBoG\s*(\d{1,3})\b", query, flags=re.IGNORECASE)
+        bog_ordinal_matches = re.findall(r"\b(\d{1,3})(?:st|nd|rd|th)\s+(?:BoG|meeting)\b", query, flags=re.IGNORECASE)
 
-        year_range_matches = re.findall(r"\b(20\d{2})\s*(?:to|-)\s*(20\d{2})\b", query)
-        year_single_matches = re.findall(r"\b(20\d{2})\b", query)
-
-        folder_map_by_bog = {}
-        folder_map_by_year = {}
-
-        for folder in folder_names:
-            bog_match = re.search(r'(\d{1,3})', folder)
-            year_match = re.search(r'(20\d{2})', folder)
-
-            if bog_match:
-                bog_num = int(bog_match.group(1))
-                folder_map_by_bog.setdefault(bog_num, []).append(folder)
-
-            if year_match:
-                year = int(year_match.group(1))
-                folder_map_by_year.setdefault(year, []).append(folder)
-
+        meetings = {int(bog_str) for bog_str in bog_single_matches + bog_ordinal_matches}
+        # Also "seventy-fourth meeting" and "meeting no. 74"
+        meetings.update(self.query_expander.entities(query).meetings)
         for start, end in bog_range_matches:
-            for bog_num in range(int(start), int(end) + 1):
-                detected.update(folder_map_by_bog.get(bog_num, []))
+            meetings.update(range(int(start), int(end) + 1))
 
-        for bog_str in bog_single_matches:
-            bog_num = int(bog_str)
-            detected.update(folder_map_by_bog.get(bog_num, []))
+        # Years, months, dates and ranges of them ("between March 2019 and Dec 2021") as YYYYMMDD ranges
+        return meetings, date_ranges(query)
 
-        for start, end in year_range_matches:
-            for year in range(int(start), int(end) + 1):
-                detected.update(folder_map_by_year.get(year, []))
+    def _resolve_meetings(self, query: str):
+        """Catalog entries (meeting_catalog.py) of the meetings the query names or dates."""
+        meetings, ranges = self._extract_meeting_filters(query)
+        if not meetings and not ranges:
+            return []
+        return self.store_registry.catalog.resolve(meetings, ranges)
 
-        for year_str in year_single_matches:
-            year = int(year_str)
-            detected.update(folder_map_by_year.get(year, []))
+    def _extract_bog_folders_from_query(self, query: str, vector_stores=None, entries=None):
+        vector_stores = self.vector_stores if vector_stores is None else vector_stores
+        entries = self._resolve_meetings(query) if entries is None else entries
+        detected = {entry["source"] for entry in entries if entry["source"] in vector_stores}
 
         if not detected:
             print("[ℹ️] No BoG or year found. Using fallback 'db_faiss' vector store.")
-            if "db_faiss" in self.vector_stores:
+            if "db_faiss" in vector_stores:
                 return ["db_faiss"], True
             else:
                 raise ValueError("[❌] No matching folders found and fallback 'db_faiss' does not exist.")
@@ -140,28 +213,68 @@ class TextRAGHandler:
         print(f"[📌] Matched folders from query: {list(detected)}")
         return list(detected), False
 
-    def _rerank_documents(self, docs, query, batch_size=100):
-        # Preprocess query for BGE: prepend "query: "
-        bge_query = f"query: {query}"
-        query_embedding = self.embedding_model.embed_query(bge_query)
-        all_ranked = []
-
-        for i in range(0, len(docs), batch_size):
-            batch = docs[i:i + batch_size]
-            batch_ranked = []
-
-            for doc in batch:
-                doc_embedding = self.embedding_model.embed_query(f"passage: {doc.page_content[:512]}")
-                similarity = np.dot(query_embedding, doc_embedding) / (np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding) + 1e-8)
-                batch_ranked.append((similarity, doc))
-
-            all_ranked.extend(batch_ranked)
-
-        top_docs = heapq.nlargest(100, all_ranked, key=lambda x: x[0])
-        return [doc for _, doc in top_docs]
-
-    def _query_with_context(self, query: str, context: str) -> str:
-        messages = [
+    def _route_overview(self, query: str, meetings, plan):
+        """Add the meeting's summaries to `plan` when the query asks for an overview of exactly one meeting."""
+        if not SUMMARY_ROUTE or len(meetings) != 1 or not is_overview_query(query):
+            return plan
+        summaries = self.summary_index.documents(next(iter(meetings)))
+        if summaries:
+            print(f"[📝] Overview of BoG {sorted(meetings)}: answering from {len(summaries)} summaries")
+            plan["summaries"] = summaries
+        return plan
+
+    def _plan_search(self, query: str, vector_stores):
+        meeting_index = vector_stores.get(MEETING_INDEX_NAME)
+        entries = self._resolve_meetings(query)
+        meetings = {entry["meeting"] for entry in entries if entry["meeting"] >= 0}
+        if meeting_index is None:
+            store_keys, is_fallback = self._extract_bog_folders_from_query(query, vector_stores, entries)
+            plan = {"stores": store_keys, "fallback": is_fallback}
+            return plan if is_fallback else self._route_overview(query, meetings, plan)
+
+        item = parse_item_reference(query)
+        if item is not None:
+            # "item 38.10" names its meeting even when the query does not.
+            item_meeting, item = item
+            item_meetings = meetings or ({item_meeting} if item_meeting is not None else set())
+            item_rows = meeting_index.lookup_item(item_meetings, item)
+            if len(item_rows):
+                print(f"[📌] Item {item} of BoG {sorted(item_meetings)}: {len(item_rows)} chunks, skipping vector search")
+                return {"stores": [MEETING_INDEX_NAME], "item_rows": item_rows}
+
+        # Sources without a meeting number (e.g. an ordinance) can still match by date.
+        sources = [entry["source"] for entry in entries if entry["meeting"] < 0]
+        rows = meeting_index.select(meetings, sources=sources) if entries else None
+        if rows is None or not rows.any():
+            print(f"[ℹ️] No BoG or year matched. Searching all of '{MEETING_INDEX_NAME}'.")
+            return {"stores": [MEETING_INDEX_NAME], "rows": None}
+
+        print(f"[📌] Matched BoG {sorted(meetings)} ({len(entries)} sources): {int(rows.sum())} chunks")
+        return self._route_overview(query, meetings, {"stores": [MEETING_INDEX_NAME], "rows": rows})
+
+    def _item_documents(self, plan, vector_stores, top_k):
+        meeting_index = vector_stores[MEETING_INDEX_NAME]
+        return [meeting_index.document(row) for row in plan["item_rows"][:top_k]]
+
+    def _packed_item_documents(self, query, plan, vector_stores, top_k):
+        return self._pack_context(query, self._item_documents(plan, vector_stores, top_k))
+
+    def _rerank_documents(self, docs, query, doc_vectors=None, query_vector=None, top_n=100):
+        if not docs:
+            return []
+
+        if doc_vectors is None:
+            # No stored vectors to reuse: embed every candidate in one batched call.
+            query_vector = self.embedding_model.embed_query(f"query: {query}")
+            doc_vectors = self.embedding_model.embed_documents([f"passage: {doc.page_content[:512]}" for doc in docs])
+        elif query_vector is None:
+            query_vector = self.embedding_model.embed_query(query)
+
+        positions, _ = rank_by_vectors(query_vector, doc_vectors, top_n)
+        return [docs[i] for i in positions]
+
+    def _context_messages(self, query: str, context: str) -> list:
+        return [
             {
                 "role": "system",
                 "content": "You are a helpful assistant. Answer user questions based only on the provided context."
@@ -171,45 +284,325 @@ class TextRAGHandler:
                 "content": f"Context:\n{context}\n\nUser Query:\n{query}\n\nAnswer the question based on the context above."
             }
         ]
-        response = self._query_together_ai(messages)
+
+    def _answer_or_error(self, response: str) -> str:
         if not response:
             return "[Error] No response from Together AI."
-        if response.startswith("System error:"):
-            return response
         return response
 
+    def _log_llm_call(self, messages, start):
+        prompt_tokens = self.context_packer.count_messages(messages)
+        print(f"[⏱️] LLM answered in {(time.perf_counter() - start) * 1000:.0f} ms for a {prompt_tokens}-token prompt")
+
+    def _query_with_context(self, query: str, context: str) -> str:
+        messages = self._context_messages(query, context)
+        start = time.perf_counter()
+        response = self._query_together_ai(messages)
+        self._log_llm_call(messages, start)
+        return self._answer_or_error(response)
+
+    async def _aquery_with_context(self, query: str, context: str) -> str:
+        messages = self._context_messages(query, context)
+        start = time.perf_counter()
+        response = await self._aquery_together_ai(messages)
+        self._log_llm_call(messages, start)
+        return self._answer_or_error(response)
+
+    async def _astream_with_context(self, query: str, context: str):
+        messages = self._context_messages(query, context)
+        start = time.perf_counter()
+        async for token in self.llm_client.astream_chat(messages):
+            yield token
+        self._log_llm_call(messages, start)
+
+    def _lexical_index(self, store):
+        return getattr(store, "lexical", None) if SEARCH_MODE == "hybrid" else None
+
+    def _hybrid_rows(self, vector_rows, lexical, query, top_k, mask=None):
+        lexical_rows, _ = lexical.search(query, HYBRID_CANDIDATES, mask)
+        rows = reciprocal_rank_fusion([vector_rows, lexical_rows.tolist()])[:min(top_k, HYBRID_TOP_K)]
+        print(f"[🔀] Fused {len(vector_rows)} vector and {len(lexical_rows)} BM25 candidates, keeping {len(rows)}")
+        return rows
+
+    def _retrieve(self, amplified_query, plan, vector_stores, top_k):
+        print(f"[🧠] Amplified Query:\n{amplified_query}")
+        print(f"[📂] Using vector stores: {plan['stores']}")
+
+        query_vector = self.query_cache.embed(self.embedding_model.embed_query, amplified_query)
+
+        if "rows" in plan:
+            meeting_index = vector_stores[MEETING_INDEX_NAME]
+            lexical = self._lexical_index(meeting_index)
+            if lexical is not None:
+                vector_rows = [row for _, row in meeting_index.search(query_vector, HYBRID_CANDIDATES, plan["rows"])]
+                rows = self._hybrid_rows(vector_rows, lexical, amplified_query, top_k, plan["rows"])
+                return [meeting_index.document(row) for row in rows]
+
+            rows = [row for _, row in meeting_index.search(query_vector, top_k, plan["rows"])]
+            if not rows:
+                return []
+            docs = [meeting_index.document(row) for row in rows]
+            return self._rerank_documents(docs, amplified_query, meeting_index.vectors(rows), query_vector)
+
+        if plan["fallback"]:
+            fallback_store = vector_stores["db_faiss"]
+            lexical = self._lexical_index(fallback_store)
+            if lexical is not None:
+                _, positions = fallback_store.index.search(query_vector.reshape(1, -1), min(HYBRID_CANDIDATES, len(lexical)))
+                vector_rows = [int(row) for row in positions[0] if row >= 0]
+                rows = self._hybrid_rows(vector_rows, lexical, amplified_query, top_k)
+                return [fallback_store.docstore.document(row) for row in rows]
+            return fallback_store.similarity_search_by_vector(query_vector.tolist(), k=top_k)
+
+        store_keys = plan["stores"]
+        stores = {store_key: vector_stores[store_key] for store_key in store_keys}
+        hits = fan_out_search(stores, query_vector, top_k, self.search_executor)
+        if not hits:
+            return []
+
+        candidate_docs = []
+        for _, store_key, doc, _ in hits:
+            doc.metadata["source_folder"] = store_key
+            candidate_docs.append(doc)
+        candidate_vectors = np.vstack([vector for _, _, _, vector in hits])
+
+        print(f"[🔍] Reranking {len(candidate_docs)} documents from {len(stores)} stores with their stored vectors...")
+        return self._rerank_documents(candidate_docs, amplified_query, candidate_vectors, query_vector)
+
+    def _pack_context(self, query, top_docs, budget=None):
+        """The best chunks that fit `budget` (CONTEXT_TOKEN_BUDGET by default), with near-duplicates dropped."""
+        packed = self.context_packer.pack(
+            [self._cite(doc) + doc.page_content for doc in top_docs],
+            texts=[doc.page_content for doc in top_docs],
+            reserved=self.context_packer.count_messages(self._context_messages(query, "")),
+            budget=budget
+        )
+        print(f"[🧮] Packed {len(top_docs)} retrieved chunks into {packed.summary()}")
+        return [top_docs[i] for i in packed.indices]
+
+    def _overview_documents(self, query, plan, vector_stores):
+        """The meeting's summary and its SUMMARY_TOP_CHUNKS best chunks for the unexpanded query, within SUMMARY_TOKEN_BUDGET."""
+        top_docs = plan["summaries"] + self._retrieve(query, plan, vector_stores, SUMMARY_TOP_CHUNKS)[:SUMMARY_TOP_CHUNKS]
+        return self._pack_context(query, top_docs, budget=SUMMARY_TOKEN_BUDGET)
+
+    def _build_context(self, top_docs) -> str:
+        print(f"[📄] Top {len(top_docs)} Retrieved Chunks:\n")
+        for i, doc in enumerate(top_docs, 1):
+            print(f"#{i} [📂 Source: {doc.metadata.get('source_folder', 'unknown')}]:\n{doc.page_content[:300]}...\n{'-'*60}")
+
+        return "\n\n".join(self._cite(doc) + doc.page_content for doc in top_docs)
+
+    def _cite(self, doc):
+        # Chunks ingested page by page carry their PDF page range, which lets the answer cite pages.
+        page, page_end = doc.metadata.get("page"), doc.metadata.get("page_end")
+        if page is None:
+            return ""
+        pages = f"p. {page}" if page_end in (None, page) else f"pp. {page}-{page_end}"
+        source = doc.metadata.get("source_folder") or doc.metadata.get("source", "")
+        return f"[{source}, {pages}]\n"
+
+    def _source_key(self, top_docs):
+        return make_source_key(
+            (doc.metadata.get("source_folder") or doc.metadata.get("source"), doc.page_content)
+            for doc in top_docs
+        )
+
+    def _check_key(self, query, plan, vector_stores, top_k):
+        """Source key of what `query` itself retrieves with local expansion (well under 1 ms, no LLM call)."""
+        return self._source_key(self._pack_context(query, self._retrieve(self._expand_locally(query), plan, vector_stores, top_k)))
+
+    def _cached_answer(self, query, plan, vector_stores, top_k):
+        """Look for a cached answer to a near-identical query; returns (entry or None, query vector).
+
+        The new query is run through retrieval with its own expansion, and the
+        closest cached answer is only reused if that retrieves the same chunks
+        as the cached query did.
+        """
+        query_vector = self.query_cache.embed(self.embedding_model.embed_query, normalize_query(query))
+        for entry in self.answer_cache.candidates(query_vector, self.store_registry.generation)[:1]:
+            if self._check_key(query, plan, vector_stores, top_k) == entry["check_key"]:
+                self.answer_cache.record(entry)
+                print(f"[♻️] Answer cache hit, skipped ~{entry['llm_ms']:.0f} ms of LLM calls")
+                return entry, query_vector
+        self.answer_cache.record(None)
+        return None, query_vector
+
+    def _source_metadata(self, top_docs):
+        return [
+            {
+                "source": doc.metadata.get("source_folder") or doc.metadata.get("source"),
+                "item_no": doc.metadata.get("item_no"),
+                "page": doc.metadata.get("page"),
+                "page_end": doc.metadata.get("page_end")
+            }
+            for doc in top_docs
+        ]
+
+    def _remember_answer(self, query, plan, vector_stores, top_k, query_vector, amplified_query, top_docs, answer, llm_ms):
+        if answer.startswith(("System error:", "[Error]")):
+            return
+        source_key = self._source_key(top_docs)
+        # Lookups compare what the new query retrieves with local expansion, so the entry keeps the same for this query.
+        check_key = source_key if self.query_expansion != "llm" else self._check_key(query, plan, vector_stores, top_k)
+        self.answer_cache.store(
+            query_vector, source_key, answer, llm_ms,
+            generation=self.store_registry.generation, amplified_query=amplified_query,
+            check_key=check_key, sources=self._source_metadata(top_docs)
+        )
+
     def handle_input(self, query: str, top_k: int = 100) -> str:
-        self._load_all_vector_stores()
+        # One snapshot per query; a concurrent reload swaps in a new dict instead of mutating this one.
+        vector_stores = self.vector_stores
 
         try:
-            store_keys, is_fallback = self._extract_bog_folders_from_query(query)
+            plan = self._plan_search(query, vector_stores)
         except ValueError as ve:
             return str(ve)
 
+        if "item_rows" in plan:
+            # An exact item lookup needs neither the amplification call nor vector search.
+            top_docs = self._packed_item_documents(query, plan, vector_stores, top_k)
+            return self._query_with_context(query, self._build_context(top_docs))
+
+        if "summaries" in plan:
+            # A meeting overview is answered from its summary: no amplification and a fraction of the prompt.
+            top_docs = self._overview_documents(query, plan, vector_stores)
+            return self._query_with_context(query, self._build_context(top_docs))
+
+        cached, query_vector = self._cached_answer(query, plan, vector_stores, top_k)
+        if cached is not None:
+            return cached["answer"]
+
+        start = time.perf_counter()
         amplified_query = self._generate_amplified_query(query)
-        print(f"[🧠] Amplified Query:\n{amplified_query}")
-        print(f"[📂] Using vector stores: {store_keys}")
-
-        if is_fallback:
-            fallback_store = self.vector_stores["db_faiss"]
-            top_docs = fallback_store.similarity_search(amplified_query, k=top_k)
-        else:
-            candidate_docs = []
-            for store_key in store_keys:
-                docs = self.vector_stores[store_key].similarity_search(amplified_query, k=top_k)
-                for doc in docs:
-                    doc.metadata["source_folder"] = store_key
-                    candidate_docs.append(doc)
-
-            print(f"[🔍] Reranking {len(candidate_docs)} documents in batches of 100...")
-            top_docs = self._rerank_documents(candidate_docs, amplified_query)
+        llm_ms = (time.perf_counter() - start) * 1000
+        top_docs = self._retrieve(amplified_query, plan, vector_stores, top_k)
 
         if not top_docs:
             return "[⚠️] No relevant context found in the selected documents."
 
-        print(f"[📄] Top {len(top_docs)} Retrieved Chunks:\n")
-        for i, doc in enumerate(top_docs, 1):
-            print(f"#{i} [📂 Source: {doc.metadata.get('source_folder', 'unknown')}]:\n{doc.page_content[:300]}...\n{'-'*60}")
+        top_docs = self._pack_context(query, top_docs)
+        context = self._build_context(top_docs)
+        start = time.perf_counter()
+        answer = self._query_with_context(query, context)
+        llm_ms += (time.perf_counter() - start) * 1000
+
+        self._remember_answer(query, plan, vector_stores, top_k, query_vector, amplified_query, top_docs, answer, llm_ms)
+        return answer
+
+    async def ahandle_input(self, query: str, top_k: int = 100, executor=None) -> str:
+        """Async variant of handle_input.
+
+        LLM calls are awaited on the event loop; embedding, FAISS search,
+        reranking and context packing run on `executor` (the loop's default
+        pool when None).
+        """
+        loop = asyncio.get_running_loop()
+        vector_stores = self.vector_stores
+
+        try:
+            plan = self._plan_search(query, vector_stores)
+        except ValueError as ve:
+            return str(ve)
+
+        if "item_rows" in plan:
+            top_docs = await loop.run_in_executor(executor, self._packed_item_documents, query, plan, vector_stores, top_k)
+            return await self._aquery_with_context(query, self._build_context(top_docs))
+
+        if "summaries" in plan:
+            top_docs = await loop.run_in_executor(executor, self._overview_documents, query, plan, vector_stores)
+            return await self._aquery_with_context(query, self._build_context(top_docs))
+
+        cached, query_vector = await loop.run_in_executor(executor, self._cached_answer, query, plan, vector_stores, top_k)
+        if cached is not None:
+            return cached["answer"]
+
+        start = time.perf_counter()
+        amplified_query = await self._agenerate_amplified_query(query)
+        llm_ms = (time.perf_counter() - start) * 1000
+        top_docs = await loop.run_in_executor(executor, self._retrieve, amplified_query, plan, vector_stores, top_k)
 
-        combined_context = "\n\n".join(doc.page_content for doc in top_docs)
-        return self._query_with_context(query, combined_context)
+        if not top_docs:
+            return "[⚠️] No relevant context found in the selected documents."
+
+        # Token counting and near-duplicate checks are CPU work (and may load the tokenizer), so off the loop too.
+        top_docs = await loop.run_in_executor(executor, self._pack_context, query, top_docs)
+        context = self._build_context(top_docs)
+        start = time.perf_counter()
+        answer = await self._aquery_with_context(query, context)
+        llm_ms += (time.perf_counter() - start) * 1000
+
+        await loop.run_in_executor(
+            executor, self._remember_answer, query, plan, vector_stores, top_k, query_vector, amplified_query, top_docs, answer, llm_ms
+        )
+        return answer
+
+    async def astream_input(self, query: str, top_k: int = 100, executor=None):
+        """Streaming variant of ahandle_input yielding (event, data) pairs.
+
+        Emits one "sources" event with the retrieved chunk metadata before any
+        answer text, then "token" events as the LLM produces them, then "done".
+        Failures are reported as an "error" event instead of "done"; an answer
+        whose stream failed partway is not cached.
+        """
+        loop = asyncio.get_running_loop()
+        vector_stores = self.vector_stores
+
+        try:
+            plan = self._plan_search(query, vector_stores)
+        except ValueError as ve:
+            yield "error", {"message": str(ve)}
+            return
+
+        if "item_rows" in plan or "summaries" in plan:
+            if "item_rows" in plan:
+                top_docs = await loop.run_in_executor(executor, self._packed_item_documents, query, plan, vector_stores, top_k)
+            else:
+                top_docs = await loop.run_in_executor(executor, self._overview_documents, query, plan, vector_stores)
+            yield "sources", self._source_metadata(top_docs)
+            context = self._build_context(top_docs)
+            try:
+                async for token in self._astream_with_context(query, context):
+                    yield "token", {"text": token}
+            except LLMStreamError as e:
+                yield "error", {"message": str(e)}
+                return
+            yield "done", {"cached": False}
+            return
+
+        cached, query_vector = await loop.run_in_executor(executor, self._cached_answer, query, plan, vector_stores, top_k)
+        if cached is not None:
+            yield "sources", cached["sources"]
+            yield "token", {"text": cached["answer"]}
+            yield "done", {"cached": True}
+            return
+
+        start = time.perf_counter()
+        amplified_query = await self._agenerate_amplified_query(query)
+        llm_ms = (time.perf_counter() - start) * 1000
+        top_docs = await loop.run_in_executor(executor, self._retrieve, amplified_query, plan, vector_stores, top_k)
+
+        if not top_docs:
+            yield "error", {"message": "[⚠️] No relevant context found in the selected documents."}
+            return
+
+        top_docs = await loop.run_in_executor(executor, self._pack_context, query, top_docs)
+        yield "sources", self._source_metadata(top_docs)
+
+        context = self._build_context(top_docs)
+        parts = []
+        start = time.perf_counter()
+        try:
+            async for token in self._astream_with_context(query, context):
+                parts.append(token)
+                yield "token", {"text": token}
+        except LLMStreamError as e:
+            yield "error", {"message": str(e)}
+            return
+        llm_ms += (time.perf_counter() - start) * 1000
+
+        answer = self._answer_or_error("".join(parts))
+        await loop.run_in_executor(
+            executor, self._remember_answer, query, plan, vector_stores, top_k, query_vector, amplified_query, top_docs, answer, llm_ms
+        )
+        yield "done", {"cached": False}
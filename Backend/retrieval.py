@@ -0,0 +1,90 @@
+import heapq
+import itertools
+import numpy as np
+
+
+def embed_query_vector(embedding_model, text):
+    return np.asarray(embedding_model.embed_query(text), dtype=np.float32)
+
+
+def _reconstruct(index, positions):
+    try:
+        return index.reconstruct_batch(positions)
+    except (AttributeError, RuntimeError):
+        return np.vstack([index.reconstruct(int(i)) for i in positions])
+
+
+def search_with_vectors(store, query_vector, k):
+    """Search one LangChain FAISS store and return (docs, stored vectors).
+
+    The vectors come straight out of the FAISS index, so callers can rescore
+    candidates without running the embedding model again.
+    """
+    index = store.index
+    k = min(k, index.ntotal)
+    if k <= 0:
+        return [], np.empty((0, index.d), dtype=np.float32)
+
+    query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+    _, positions = index.search(query, k)
+    positions = positions[0][positions[0] >= 0].astype(np.int64)
+
+    docs = [store.docstore.search(store.index_to_docstore_id[int(i)]) for i in positions]
+    return docs, np.asarray(_reconstruct(index, positions), dtype=np.float32)
+
+
+def rank_by_vectors(query_vector, doc_vectors, top_n):
+    """Return (positions, scores) of the top_n rows of doc_vectors by cosine similarity, best first."""
+    doc_vectors = np.asarray(doc_vectors, dtype=np.float32)
+    if doc_vectors.shape[0] == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    query = np.asarray(query_vector, dtype=np.float32)
+    norms = np.linalg.norm(doc_vectors, axis=1) * np.linalg.norm(query) + 1e-8
+    scores = (doc_vectors @ query) / norms
+
+    top_n = min(top_n, scores.shape[0])
+    if top_n < scores.shape[0]:
+        positions = np.argpartition(-scores, top_n - 1)[:top_n]
+    else:
+        positions = np.arange(scores.shape[0])
+    positions = positions[np.argsort(-scores[positions], kind="stable")]
+    return positions, scores[positions]
+
+
+def fan_out_search(stores, query_vector, k, executor=None):
+    """Search several stores with one query vector and merge their hits.
+
+    `stores` maps a store name to a LangChain FAISS store. Each store is
+    searched on `executor` when one is given (FAISS releases the GIL during
+    search) and the per-store result lists are merged into the k best
+    (score, store_name, doc, vector) hits overall.
+    """
+    query = np.asarray(query_vector, dtype=np.float32)
+
+    def search(item):
+        name, store = item
+        docs, vectors = search_with_vectors(store, query, k)
+        hits = [(float(score), name, doc, vector) for score, doc, vector in zip(vectors @ query, docs, vectors)]
+        hits.sort(key=lambda hit: -hit[0])
+        return hits
+
+    items = list(stores.items())
+    if executor is None or len(items) < 2:
+        per_store = [search(item) for item in items]
+    else:
+        per_store = list(executor.map(search, items))
+
+    return list(itertools.islice(heapq.merge(*per_store, key=lambda hit: -hit[0]), k))
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse ranked lists of row ids: a row scores sum(1 / (k + rank)) over the lists it is in. Best first.
+
+    Only ranks are used, so BM25 and cosine scores need no common scale.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, 1):
+            scores[row] = scores.get(row, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda row: -scores[row])
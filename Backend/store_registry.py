@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+from meeting_index import MeetingIndex, MEETING_INDEX_FILES, MEETING_INDEX_NAME, META_FILE
+from meeting_catalog import MeetingCatalog, CATALOG_FILE
+from chunk_store import CHUNK_STORE_FILES, FAISS_INDEX_FILE, is_chunk_store, load_faiss_store
+from index_factory import apply_search_params, load_index_params, INDEX_PARAMS_FILE, RESCORE_VECTORS_FILE
+from lexical_index import LEXICAL_FILE
+
+INDEX_FILES = ("index.faiss", "index.pkl")
+CHUNK_STORE_INDEX_FILES = (FAISS_INDEX_FILE,) + CHUNK_STORE_FILES
+# Files only some stores have (BM25, rescoring vectors, search parameters); rewriting one reloads the store too
+OPTIONAL_INDEX_FILES = (LEXICAL_FILE, RESCORE_VECTORS_FILE, INDEX_PARAMS_FILE)
+
+
+def file_signature(path):
+    """(mtime, size) of `path`, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class VectorStoreRegistry:
+    """Keeps every FAISS store under `vector_store_dir` resident in memory.
+
+    Stores are loaded once and afterwards only directories whose index files
+    changed (mtime/size manifest) are reloaded. The name -> store mapping is
+    rebuilt off to the side and swapped in with a single assignment, so a
+    query that grabbed `stores` keeps a consistent snapshot for its lifetime.
+
+    Folders holding a consolidated MeetingIndex (see meeting_index.py) are
+    loaded as such; every other folder is a LangChain FAISS store, backed by
+    a memory-mapped chunk store (chunk_store.py) when it has one and by the
+    legacy pickled docstore otherwise. Once a meeting_index folder exists
+    the handler queries nothing else, so the per-meeting stores and db_faiss
+    next to it are not loaded (and are dropped if they were) unless
+    `legacy_stores` is set, e.g. by a benchmark that compares the layouts.
+
+    The meeting catalog (meeting_catalog.py) is reloaded with the stores, or
+    built from their names when the directory has no catalog file. Other
+    files written at ingestion are reloaded by hooks (add_reload_hook) that
+    run after every reload pass.
+    """
+
+    def __init__(self, vector_store_dir, embedding_model, legacy_stores=False):
+        self.vector_store_dir = vector_store_dir
+        self.embedding_model = embedding_model
+        self.legacy_stores = legacy_stores
+        self._stores = {}
+        self._manifest = {}
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_event = threading.Event()
+        self.reload_count = 0
+        # Bumped whenever the set of loaded stores changes; caches key their validity on it.
+        self.generation = 0
+        self.last_reload = None
+        self._catalog = MeetingCatalog([])
+        # (mtime, size) of the catalog file it was loaded from; None when built from the store names
+        self._catalog_signature = -1
+        self._reload_hooks = []
+        # Legacy store folders left out of the last scan, so the notice is printed once per change
+        self._skipped = 0
+
+    @property
+    def stores(self):
+        return self._stores
+
+    @property
+    def catalog(self):
+        return self._catalog
+
+    def add_reload_hook(self, hook):
+        """Call `hook(stores_changed)` after each reload pass, e.g. to pick up a rewritten side file."""
+        self._reload_hooks.append(hook)
+
+    def _load_catalog(self, stores, force=False):
+        signature = file_signature(os.path.join(self.vector_store_dir, CATALOG_FILE))
+        if not force and signature == self._catalog_signature:
+            return
+        try:
+            catalog = MeetingCatalog.load(self.vector_store_dir) if signature is not None else None
+        except Exception as e:
+            print(f"[!] Failed to load {CATALOG_FILE}: {e}")
+            catalog = None
+        if catalog is None:
+            catalog = MeetingCatalog.from_stores(stores)
+        self._catalog, self._catalog_signature = catalog, signature
+        print(f"[📇] Meeting catalog: {len(catalog)} sources")
+
+    def _is_meeting_index(self, folder_path):
+        return os.path.isfile(os.path.join(folder_path, META_FILE))
+
+    def _signature(self, folder_path):
+        signature = []
+        if self._is_meeting_index(folder_path):
+            index_files = MEETING_INDEX_FILES
+        elif is_chunk_store(folder_path):
+            index_files = CHUNK_STORE_INDEX_FILES
+        else:
+            index_files = INDEX_FILES
+        for file_name in index_files:
+            file_path = os.path.join(folder_path, file_name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+            signature.append((file_name, stat.st_mtime_ns, stat.st_size))
+        for file_name in OPTIONAL_INDEX_FILES:
+            try:
+                stat = os.stat(os.path.join(folder_path, file_name))
+            except OSError:
+                continue
+            signature.append((file_name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _scan(self):
+        manifest = {}
+        if not os.path.exists(self.vector_store_dir):
+            print(f"[!] Directory '{self.vector_store_dir}' does not exist.")
+            return manifest
+
+        for folder_name in sorted(os.listdir(self.vector_store_dir)):
+            subfolder_path = os.path.join(self.vector_store_dir, folder_name)
+            if not os.path.isdir(subfolder_path):
+                continue
+            signature = self._signature(subfolder_path)
+            if signature is not None:
+                manifest[folder_name] = signature
+        if not self.legacy_stores and MEETING_INDEX_NAME in manifest:
+            skipped = len(manifest) - 1
+            manifest = {MEETING_INDEX_NAME: manifest[MEETING_INDEX_NAME]}
+            if skipped and skipped != self._skipped:
+                print(f"[ℹ️] Skipping {skipped} per-meeting stores; '{MEETING_INDEX_NAME}' replaces them")
+            self._skipped = skipped
+        return manifest
+
+    def _load_store(self, folder_path):
+        if self._is_meeting_index(folder_path):
+            return MeetingIndex.load(folder_path)
+        if is_chunk_store(folder_path):
+            # Applies the saved search parameters (and rescoring) itself.
+            return load_faiss_store(folder_path, self.embedding_model)
+        from langchain.vectorstores import FAISS
+        store = FAISS.load_local(folder_path, embeddings=self.embedding_model, allow_dangerous_deserialization=True)
+        apply_search_params(store.index, load_index_params(folder_path))
+        return store
+
+    def reload(self):
+        with self._reload_lock:
+            start = time.perf_counter()
+            manifest = self._scan()
+            stores = {}
+            loaded, failed = [], []
+
+            for folder_name, signature in manifest.items():
+                current = self._stores.get(folder_name)
+                if current is not None and self._manifest.get(folder_name) == signature:
+                    stores[folder_name] = current
+                    continue
+
+                subfolder_path = os.path.join(self.vector_store_dir, folder_name)
+                try:
+                    stores[folder_name] = self._load_store(subfolder_path)
+                    loaded.append(folder_name)
+                    print(f"[✓] Loaded vector DB: {folder_name}")
+                except Exception as e:
+                    failed.append(folder_name)
+                    print(f"[!] Failed to load {folder_name}: {e}")
+                    if current is not None:
+                        # Keep serving the previous version rather than dropping the store.
+                        stores[folder_name] = current
+                        manifest[folder_name] = self._manifest[folder_name]
+                    else:
+                        manifest.pop(folder_name)
+
+            removed = sorted(set(self._stores) - set(stores))
+            self._manifest = {name: sig for name, sig in manifest.items() if name in stores}
+            self._stores = stores
+            self._load_catalog(stores, force=bool(loaded or removed))
+
+            self.reload_count += 1
+            if loaded or removed:
+                self.generation += 1
+            self.last_reload = {
+                "finished_at": time.time(),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "reloaded": loaded,
+                "removed": removed,
+                "failed": failed,
+                "store_count": len(stores),
+            }
+
+            if loaded or removed:
+                print(f"[📁] Vector stores available: {list(stores.keys())}")
+            for hook in self._reload_hooks:
+                try:
+                    hook(bool(loaded or removed))
+                except Exception as e:
+                    print(f"[!] Reload hook failed: {e}")
+            return self.last_reload
+
+    def start_auto_reload(self, interval):
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop_event.clear()
+
+        def watch():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"[!] Vector store reload failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="vector-store-reload", daemon=True)
+        self._watcher.start()
+        print(f"[🔁] Watching '{self.vector_store_dir}' for changes every {interval}s")
+
+    def stop_auto_reload(self):
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def stats(self):
+        return {
+            "store_count": len(self._stores),
+            "reload_count": self.reload_count,
+            "generation": self.generation,
+            "auto_reload": self._watcher is not None,
+            "last_reload": self.last_reload,
+        }
@@ -0,0 +1,82 @@
+"""Local stand-in for the Together chat-completions API, used by benchmark.py.
+
+    python stub_llm_server.py --port 9000 --delay 0.5 --prefill 0.2
+
+Requests with "stream": true get the same answer as server-sent events,
+one word per chunk, with the delay spread evenly across the chunks.
+--prefill adds seconds per 1000 prompt tokens (estimated as 4 characters
+each) before answering, so longer prompts are slower, as with a real model.
+
+Point the backend at it with TOGETHER_API_URL=http://127.0.0.1:9000/v1/chat/completions.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI()
+app.state.delay = 0.5
+app.state.prefill = 0.0
+
+
+def _completion(model, content):
+    return {
+        "id": "stub-completion",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }
+        ]
+    }
+
+
+def _chunk(model, content):
+    return {
+        "id": "stub-completion",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]
+    }
+
+
+async def _stream(model, content):
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        await asyncio.sleep(app.state.delay / len(words))
+        yield f"data: {json.dumps(_chunk(model, word if i == 0 else ' ' + word))}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    question = body["messages"][-1]["content"][-200:]
+    model = body.get("model", "stub")
+    prompt_chars = sum(len(message["content"]) for message in body["messages"])
+    await asyncio.sleep(app.state.prefill * prompt_chars / 4 / 1000)
+    if body.get("stream"):
+        return StreamingResponse(_stream(model, f"Stub answer for: {question}"), media_type="text/event-stream")
+    await asyncio.sleep(app.state.delay)
+    return _completion(model, f"Stub answer for: {question}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds to wait before answering")
+    parser.add_argument("--prefill", type=float, default=0.0, help="extra seconds per 1000 prompt tokens")
+    args = parser.parse_args()
+
+    app.state.delay = args.delay
+    app.state.prefill = args.prefill
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,48 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# The backend modules import each other by name, as when run from Backend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIMENSION = 32
+# (minutes file, agenda item, text) of a tiny corpus: three meetings, with item headings as in the minutes.
+CHUNKS = [
+    ("37th_BoG_12.03.2016.pdf", "37.1", "Item No. 37.1: The Board confirmed the minutes of the 36th meeting."),
+    ("37th_BoG_12.03.2016.pdf", "37.2", "Item No. 37.2: The Board approved the revised fee structure for M.Tech."),
+    ("37th_BoG_12.03.2016.pdf", "37.3", "Item No. 37.3: The Board deferred the faculty recruitment rules."),
+    ("37th_BoG_12.03.2016.pdf", "37.3", "The recruitment rules will be placed before the Finance Committee (FC)."),
+    ("38th_BoG_20.09.2016.pdf", "38.1", "Item No. 38.1: The Board confirmed the minutes of the 37th meeting."),
+    ("38th_BoG_20.09.2016.pdf", "38.10", "Item No. 38.10: The Board ratified the hostel construction contract."),
+    ("38th_BoG_20.09.2016.pdf", "38.2", "Item No. 38.2: The Board approved the annual accounts for 2015-16."),
+    ("55th_BoG_14.06.2019.pdf", "55.1", "Item No. 55.1: The Board confirmed the minutes of the 54th meeting."),
+    ("55th_BoG_14.06.2019.pdf", "55.4", "Item No. 55.4: The Board approved the scholarship scheme for PhD scholars."),
+    ("55th_BoG_14.06.2019.pdf", "55.4", "Scholarships under the scheme are paid monthly from the institute fund."),
+]
+
+
+@pytest.fixture
+def corpus():
+    """Documents and unit-length random vectors for CHUNKS, row i = chunk i."""
+    from langchain.docstore.document import Document
+    docs = [
+        Document(page_content=text, metadata={"source": source, "item_no": item, "items": [item], "page": 1})
+        for source, item, text in CHUNKS
+    ]
+    vectors = np.random.default_rng(0).normal(size=(len(docs), DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return docs, vectors
+
+
+@pytest.fixture
+def write_store():
+    """write_store(path, docs, vectors): a per-meeting chunk store as create_vector_embedding.py writes it."""
+    import faiss
+    from chunk_store import save_faiss_store
+
+    def write(path, docs, vectors):
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(vectors)
+        save_faiss_store(str(path), index, docs)
+    return write
@@ -0,0 +1,60 @@
+import numpy as np
+from langchain.docstore.document import Document
+from answer_cache import SemanticAnswerCache
+from query_cache import QueryCache
+from rag_query_handler import TextRAGHandler
+
+CHUNKS = {
+    "37.2": "Item No. 37.2: The Board approved the revised fee structure.",
+    "37.3": "Item No. 37.3: The Board deferred the faculty recruitment rules.",
+}
+
+
+class FakeEmbeddings:
+    # Both questions embed to the same vector, i.e. well past the cache threshold.
+    def embed_query(self, text):
+        return np.ones(8, dtype=np.float32)
+
+
+class FakeRegistry:
+    generation = 1
+
+
+def make_handler():
+    handler = object.__new__(TextRAGHandler)
+    handler.embedding_model = FakeEmbeddings()
+    handler.query_cache = QueryCache(namespace="test")
+    handler.answer_cache = SemanticAnswerCache()
+    handler.store_registry = FakeRegistry()
+    handler.query_expansion = "local"
+    handler._expand_locally = lambda query: query
+    handler._pack_context = lambda query, docs, budget=None: docs
+    handler._retrieve = lambda query, plan, vector_stores, top_k: [
+        Document(page_content=text, metadata={"source": "37th_meeting"}) for item, text in CHUNKS.items() if item in query
+    ]
+    return handler
+
+
+def remember(handler, query, answer):
+    top_docs = handler._retrieve(query, {}, {}, 10)
+    query_vector = handler.embedding_model.embed_query(query)
+    handler._remember_answer(query, {}, {}, 10, query_vector, query, top_docs, answer, llm_ms=500.0)
+
+
+def test_same_question_hits_the_cache():
+    handler = make_handler()
+    remember(handler, "What was decided on item 37.2 of BoG 37?", "The fees were revised.")
+
+    cached, _ = handler._cached_answer("What was decided on item 37.2 of BoG 37 ?", {}, {}, 10)
+    assert cached is not None
+    assert cached["answer"] == "The fees were revised."
+
+
+def test_near_identical_question_with_other_sources_misses_the_cache():
+    handler = make_handler()
+    remember(handler, "What was decided on item 37.2 of BoG 37?", "The fees were revised.")
+
+    # Embeds like the cached question, but retrieves a different item.
+    cached, _ = handler._cached_answer("What was decided on item 37.3 of BoG 37?", {}, {}, 10)
+    assert cached is None
+    assert handler.answer_cache.stats()["hits"] == 0
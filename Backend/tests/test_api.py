@@ -0,0 +1,89 @@
+import asyncio
+import importlib
+import httpx
+import pytest
+
+
+class FakeHandler:
+    """Answers once `gate` is set, so a test controls how long queries stay in flight."""
+
+    def __init__(self, limiter):
+        self.gate = asyncio.Event()
+        self.limiter = limiter
+        # Queries in flight as the stream sent its answer
+        self.pending_while_streaming = None
+
+    async def ahandle_input(self, query, top_k, executor=None):
+        await self.gate.wait()
+        return f"answer to {query}"
+
+    async def astream_input(self, query, top_k, executor=None):
+        yield "sources", []
+        self.pending_while_streaming = self.limiter.pending
+        yield "token", {"text": "answer"}
+        yield "done", {"cached": False}
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # The module builds a TextRAGHandler on import; give it an empty corpus and no model prewarm.
+    import model_loader
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TOGETHER_API_KEY", "test")
+    monkeypatch.setenv("VECTOR_STORE_RELOAD_INTERVAL", "0")
+    monkeypatch.setattr(model_loader, "PREWARM_MODELS", False)
+    module = importlib.import_module("api")
+    limiter = module.QueryLimiter(max_concurrent=1, max_queued=1)
+    monkeypatch.setattr(module, "query_limiter", limiter)
+    monkeypatch.setattr(module, "rag_handler", FakeHandler(limiter))
+    return module
+
+
+def run(api, scenario):
+    async def main():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.wait_for(scenario(client), timeout=10)
+    return asyncio.run(main())
+
+
+async def until(condition):
+    while not condition():
+        await asyncio.sleep(0.005)
+
+
+def test_queries_beyond_the_queue_get_429(api):
+    async def scenario(client):
+        api.rag_handler.gate = asyncio.Event()
+        requests = [asyncio.create_task(client.post("/query", json={"query": f"q{i}"})) for i in range(5)]
+        # One query runs, one waits; the other three are turned away without waiting.
+        await until(lambda: api.query_limiter.rejected == 3)
+        api.rag_handler.gate.set()
+        return [response.status_code for response in await asyncio.gather(*requests)]
+
+    assert sorted(run(api, scenario)) == [200, 200, 429, 429, 429]
+    assert api.query_limiter.pending == 0
+
+
+def test_stream_holds_its_slot_until_the_body_is_sent(api):
+    async def scenario(client):
+        response = await client.post("/query/stream", json={"query": "q"})
+        return response.status_code, response.text
+
+    status, body = run(api, scenario)
+    assert status == 200
+    assert body.startswith("event: sources") and "event: done" in body
+    assert api.rag_handler.pending_while_streaming == 1
+    assert api.query_limiter.pending == 0
+
+
+def test_stream_over_the_limit_is_a_plain_429(api):
+    api.query_limiter.admit()
+    api.query_limiter.admit()
+
+    async def scenario(client):
+        response = await client.post("/query/stream", json={"query": "q"})
+        return response.status_code
+
+    assert run(api, scenario) == 429
+    assert api.query_limiter.pending == 2
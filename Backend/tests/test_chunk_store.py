@@ -0,0 +1,49 @@
+import json
+import pytest
+from langchain.docstore.document import Document
+from chunk_store import ChunkStore, convert_store, is_chunk_store, load_faiss_store, write_chunk_store, STRINGS_FILE
+
+
+def test_documents_round_trip(tmp_path, corpus):
+    docs, _ = corpus
+    docs = docs + [
+        Document(page_content="", metadata={}),
+        Document(page_content="Résumé of the Registrar — ₹ 5 lakh", metadata={"source": "x.docx", "resolution": "approved", "page": 0}),
+    ]
+    write_chunk_store(str(tmp_path), docs)
+
+    store = ChunkStore.load(str(tmp_path))
+
+    assert is_chunk_store(str(tmp_path))
+    assert len(store) == len(docs)
+    for row, doc in enumerate(docs):
+        assert store.document(row).page_content == doc.page_content
+        assert store.document(row).metadata == doc.metadata
+    assert store.search(5).page_content == docs[5].page_content
+    assert [doc.page_content for doc in store.iter_documents()] == [doc.page_content for doc in docs]
+
+
+def test_partially_written_store_is_refused(tmp_path, corpus):
+    docs, _ = corpus
+    write_chunk_store(str(tmp_path), docs)
+    strings = json.loads((tmp_path / STRINGS_FILE).read_text(encoding="utf-8"))
+    strings["rows"] += 1
+    (tmp_path / STRINGS_FILE).write_text(json.dumps(strings), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="out of sync"):
+        ChunkStore.load(str(tmp_path))
+
+
+def test_pickled_store_converts_without_re_embedding(tmp_path, corpus):
+    from langchain_community.vectorstores import FAISS
+    docs, vectors = corpus
+    pairs = [(doc.page_content, vector.tolist()) for doc, vector in zip(docs, vectors)]
+    FAISS.from_embeddings(pairs, None, metadatas=[doc.metadata for doc in docs]).save_local(str(tmp_path))
+
+    assert convert_store(str(tmp_path), delete_pickle=True) == len(docs)
+
+    store = load_faiss_store(str(tmp_path), None)
+    assert not (tmp_path / "index.pkl").exists()
+    hit = store.similarity_search_by_vector(vectors[6].tolist(), k=1)[0]
+    assert hit.page_content == docs[6].page_content and hit.metadata == docs[6].metadata
+    assert store.lexical is not None
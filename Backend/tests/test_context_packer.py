@@ -0,0 +1,64 @@
+from context_packer import ContextPacker, minhash
+
+WORDS = ("the board approved the revised fee structure for the postgraduate programmes and asked the "
+         "finance committee to review the hostel charges before the next academic session begins in july "
+         "while the senate will frame the rules for the scholarship scheme and report back to the board").split()
+
+
+def text(words):
+    return " ".join(words)
+
+
+def test_minhash_agreement_tracks_shingle_overlap():
+    original = text(WORDS)
+    one_word_changed = text(WORDS[:-1] + ["registrar"])
+    unrelated = text(reversed(WORDS))
+
+    assert (minhash(original) == minhash(original)).all()
+    assert (minhash(original) == minhash(one_word_changed)).mean() >= 0.8
+    assert (minhash(original) == minhash(unrelated)).mean() < 0.2
+
+
+def test_near_duplicates_of_a_better_chunk_are_dropped():
+    packer = ContextPacker(None, budget=10_000)
+    original = text(WORDS)
+    entries = [
+        "[37th BoG] " + original,
+        "[db_faiss] " + original,
+        "[38th BoG] " + text(WORDS[:-1] + ["registrar"]),
+        "[55th BoG] " + text(WORDS[10:30]),
+    ]
+    texts = [original, original, text(WORDS[:-1] + ["registrar"]), text(WORDS[10:30])]
+
+    packed = packer.pack(entries, texts=texts)
+    assert packed.indices == [0, 3]
+    assert packed.duplicates == 2
+    assert not packed.exact
+
+    # With scores the best copy is the one that stays.
+    packed = packer.pack(entries, texts=texts, scores=[0.1, 0.9, 0.5, 0.2])
+    assert packed.indices == [1, 3]
+
+
+def test_chunks_are_added_while_they_fit_the_budget():
+    # 40 characters is 10 estimated tokens, the separator 1.
+    packer = ContextPacker(None, budget=25)
+    entries = ["a" * 40, "b b " * 10, "c" * 60, "d" * 8]
+
+    packed = packer.pack(entries)
+    assert packed.indices == [0, 1, 3]
+    assert packed.tokens == 10 + 1 + 10 + 1 + 2
+    assert packed.over_budget == 1
+
+    # Tokens reserved for the question and instructions come off the budget.
+    packed = packer.pack(entries, reserved=5)
+    assert packed.indices == [0, 3]
+    assert packed.tokens == 13
+    assert packed.over_budget == 2
+    assert packer.pack(entries, budget=9).indices == [3]
+
+
+def test_character_estimate_rounds_up():
+    packer = ContextPacker(None)
+    assert packer.count_many(["", "abc", "abcd", "abcde"]) == [0, 1, 1, 2]
+    assert packer.count_messages([{"role": "user", "content": "a" * 8}, {"role": "system", "content": "b"}]) == 3
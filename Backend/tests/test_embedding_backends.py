@@ -0,0 +1,59 @@
+"""The ONNX backends must produce the vectors sentence-transformers does.
+
+Needs torch, sentence-transformers and onnxruntime plus the MiniLM files
+(downloaded on first run, or from MODEL_CACHE_DIR); skipped otherwise.
+"""
+import glob
+import os
+import numpy as np
+import pytest
+from embedding_backends import load_backend
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+MIN_COSINE = 0.99
+SUMMARIES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "summaries")
+
+QUERIES = [
+    "What was decided about faculty recruitment in the 70th BoG meeting?",
+    "Summarize the 55th meeting of the Board of Governors",
+    "fee structure approved by the Finance Committee (FC)",
+]
+
+
+def _texts():
+    # Minutes text as ingestion chunks it (OCR noise included), plus short queries.
+    chunks = []
+    for path in sorted(glob.glob(os.path.join(SUMMARIES_DIR, "*.summary.txt")))[:8]:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        chunks.extend(text[i:i + 1600] for i in range(0, min(len(text), 4800), 1600))
+    return QUERIES + chunks
+
+
+@pytest.fixture(scope="module")
+def reference():
+    pytest.importorskip("sentence_transformers")
+    try:
+        backend = load_backend(EMBEDDING_MODEL, "torch")
+    except Exception as e:
+        pytest.skip(f"torch backend unavailable: {e}")
+    texts = _texts()
+    return texts, np.asarray(backend.encode(texts))
+
+
+@pytest.mark.parametrize("name", ["onnx", "onnx-int8"])
+def test_onnx_backend_matches_torch(reference, name):
+    pytest.importorskip("onnxruntime")
+    try:
+        backend = load_backend(EMBEDDING_MODEL, name)
+    except Exception as e:
+        pytest.skip(f"{name} backend unavailable: {e}")
+    texts, expected = reference
+    vectors = np.asarray(backend.encode(texts))
+
+    assert vectors.shape == expected.shape
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-3)
+    cosines = np.sum(vectors * expected, axis=1)
+    assert cosines.min() >= MIN_COSINE, f"{name}: lowest cosine {cosines.min():.5f} ({texts[int(cosines.argmin())][:60]!r})"
+    # Single-text calls (the query path) agree with batched ones.
+    np.testing.assert_allclose(np.asarray(backend.encode(texts[0])).reshape(-1), vectors[0], atol=1e-4)
@@ -0,0 +1,135 @@
+import faiss
+import numpy as np
+import pytest
+from index_factory import build_index, load_index_params, read_index, resolve_params, save_index_params, write_index
+
+
+def clustered_vectors(count=2000, dimension=32, clusters=20, seed=0):
+    """Unit vectors around a few centres, which is how chunk embeddings are distributed; plus near-copy queries."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimension))
+    vectors = (centres[rng.integers(0, clusters, count)] + 0.3 * rng.normal(size=(count, dimension))).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = (vectors[rng.choice(count, 50)] + 0.05 * rng.normal(size=(50, dimension))).astype(np.float32)
+    return vectors, queries
+
+
+def recall(index, vectors, queries, k=10):
+    flat, _ = build_index(vectors, "flat", metric="ip")
+    _, truth = flat.search(queries, k)
+    _, found = index.search(queries, k)
+    return np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth)])
+
+
+def test_hnsw_finds_the_exact_neighbours():
+    vectors, queries = clustered_vectors()
+    index, params = build_index(vectors, "hnsw", metric="ip")
+
+    assert params["ef_search"] == index.hnsw.efSearch == 64
+    assert recall(index, vectors, queries) >= 0.95
+
+
+def test_ivfpq_is_approximate():
+    vectors, queries = clustered_vectors()
+    index, params = build_index(vectors, "ivfpq", metric="ip", m=8)
+
+    # PQ codes lose precision, so IVF-PQ trades recall for memory; `benchmark.py ann` reports how much.
+    assert 0.4 <= recall(index, vectors, queries) < 1.0
+    assert faiss.extract_index_ivf(index).nprobe == params["nprobe"]
+
+
+def test_small_corpora_get_fewer_lists():
+    params = resolve_params("ivfpq", 500, 32, m=8)
+    # k-means needs ~39 training points per list
+    assert params["nlist"] == 500 // 39
+    assert params["nprobe"] <= params["nlist"]
+    with pytest.raises(ValueError, match="not divisible"):
+        resolve_params("ivfpq", 500, 30, m=8)
+    with pytest.raises(ValueError, match="Unknown index type"):
+        resolve_params("annoy", 500, 32)
+
+
+@pytest.mark.parametrize("index_type, attribute", [("hnsw", "ef_search"), ("ivfpq", "nprobe")])
+def test_search_params_are_reapplied_on_load(tmp_path, index_type, attribute):
+    vectors, _ = clustered_vectors()
+    overrides = {attribute: 5, "m": 8} if index_type == "ivfpq" else {attribute: 5}
+    index, params = build_index(vectors, index_type, metric="ip", **overrides)
+    write_index(str(tmp_path), "index.faiss", index, params)
+    save_index_params(str(tmp_path), params)
+
+    loaded = read_index(str(tmp_path), "index.faiss", load_index_params(str(tmp_path)))
+
+    if index_type == "hnsw":
+        assert loaded.hnsw.efSearch == 5
+    else:
+        assert faiss.extract_index_ivf(loaded).nprobe == 5
+
+
+def clustered_meeting_index(root, index_type, **params):
+    """A meeting index over clustered_vectors(), ten meetings of 200 chunks each."""
+    from langchain.docstore.document import Document
+    from meeting_index import MeetingIndex, build_meeting_index
+
+    vectors, queries = clustered_vectors()
+    docs = [Document(page_content=f"chunk {i}", metadata={}) for i in range(len(vectors))]
+    names = [f"{40 + i % 10}th_BoG_01.01.2018" for i in range(len(vectors))]
+    build_meeting_index(docs, vectors, str(root), names, index_type=index_type, index_params=params)
+    return MeetingIndex.load(str(root)), queries
+
+
+def overlap(index, flat, queries, mask, k=10):
+    return np.mean([
+        len({row for _, row in index.search(query, k, mask)} & {row for _, row in flat.search(query, k, mask)}) / k
+        for query in queries
+    ])
+
+
+@pytest.mark.parametrize("index_type, params", [("fp16", {}), ("pq", {"m": 8})])
+def test_rescored_masked_search_matches_flat(tmp_path, index_type, params):
+    flat, queries = clustered_meeting_index(tmp_path / "flat", "flat")
+    index, _ = clustered_meeting_index(tmp_path / index_type, index_type, **params)
+
+    for mask in (None, flat.select({42}), flat.select({41, 47})):
+        for query in queries[:20]:
+            assert [row for _, row in index.search(query, 10, mask)] == [row for _, row in flat.search(query, 10, mask)]
+
+
+def test_hnsw_masked_search_is_close_to_flat(tmp_path):
+    flat, queries = clustered_meeting_index(tmp_path / "flat", "flat")
+    index, _ = clustered_meeting_index(tmp_path / "hnsw", "hnsw")
+
+    assert overlap(index, flat, queries, None) == 1.0
+    # A mask that leaves ~10 rows per cluster makes the graph walk miss some of the far, low-scoring rows.
+    assert overlap(index, flat, queries, flat.select({42})) >= 0.9
+    assert overlap(index, flat, queries, flat.select({41, 47})) >= 0.9
+
+
+def test_ivfpq_masked_search_drifts_from_flat(tmp_path):
+    flat, queries = clustered_meeting_index(tmp_path / "flat", "flat")
+    index, _ = clustered_meeting_index(tmp_path / "ivfpq", "ivfpq", m=8)
+    mask = flat.select({41, 47})
+
+    # Without rescoring, IVF-PQ returns approximate neighbours, always inside the mask.
+    assert 0.3 <= overlap(index, flat, queries, mask) < 1.0
+    assert all(index.meeting[row] in (41, 47) for query in queries for _, row in index.search(query, 10, mask))
+
+
+@pytest.mark.parametrize("index_type, params", [("fp16", {}), ("pq", {"m": 8})])
+def test_rescoring_index_reads_exact_vectors_from_disk(tmp_path, index_type, params):
+    from index_factory import RescoringIndex, RESCORE_VECTORS_FILE, index_memory_bytes
+
+    flat, _ = clustered_meeting_index(tmp_path / "flat", "flat")
+    index, _ = clustered_meeting_index(tmp_path / index_type, index_type, **params)
+
+    assert isinstance(index.index, RescoringIndex)
+    assert (tmp_path / index_type / RESCORE_VECTORS_FILE).exists()
+    np.testing.assert_array_equal(index.vectors([0, 7, 1999]), flat.vectors([0, 7, 1999]))
+    assert index_memory_bytes(index.index) < index_memory_bytes(flat.index) / 1.9
+
+
+def test_rescore_zero_keeps_no_vectors_file(tmp_path):
+    from index_factory import RESCORE_VECTORS_FILE
+    index, _ = clustered_meeting_index(tmp_path, "fp16", rescore=0)
+
+    assert not (tmp_path / RESCORE_VECTORS_FILE).exists()
+    assert isinstance(index.index, faiss.Index)
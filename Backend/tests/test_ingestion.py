@@ -0,0 +1,181 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from ingest_manifest import IngestManifest, chunk_hash
+
+# create_vector_embedding imports the PDF, Word and sentence-splitting libraries at module level.
+for module in ("fitz", "docx", "nltk", "tqdm"):
+    pytest.importorskip(module)
+import create_vector_embedding as cve
+
+CHUNKER = {"chunk_size": 1600}
+
+
+def chunks_of(text, source):
+    return [Document(page_content=line, metadata={"source": source}) for line in text.splitlines() if line]
+
+
+def test_manifest_serves_unchanged_files_from_its_cache(tmp_path):
+    manifest = IngestManifest(str(tmp_path), "model", CHUNKER)
+    chunks = chunks_of("one\ntwo", "a.pdf")
+    manifest.update("a.pdf", "sha-a", chunks, [chunk_hash(c.page_content) for c in chunks], np.eye(2))
+    manifest.save()
+
+    reopened = IngestManifest(str(tmp_path), "model", CHUNKER)
+    assert [c.page_content for c in reopened.cached("a.pdf", "sha-a")] == ["one", "two"]
+    np.testing.assert_array_equal(reopened.vectors("a.pdf"), np.eye(2))
+    assert reopened.cached("a.pdf", "sha-a2") is None
+    # Another model or chunker invalidates everything.
+    assert IngestManifest(str(tmp_path), "other-model", CHUNKER).cached("a.pdf", "sha-a") is None
+    assert IngestManifest(str(tmp_path), "model", {"chunk_size": 800}).cached("a.pdf", "sha-a") is None
+
+
+def test_index_is_current_only_for_the_same_files_and_config(tmp_path):
+    manifest = IngestManifest(str(tmp_path), "model", CHUNKER)
+    manifest.update("a.pdf", "sha-a", [], [], np.empty((0, 2)))
+    (tmp_path / "meeting_index").mkdir()
+    manifest.mark_index("meeting_index", {"index_type": "flat"})
+
+    assert manifest.index_current("meeting_index", {"index_type": "flat"})
+    assert not manifest.index_current("meeting_index", {"index_type": "hnsw"})
+    manifest.update("b.pdf", "sha-b", [], [], np.empty((0, 2)))
+    assert not manifest.index_current("meeting_index", {"index_type": "flat"})
+
+
+def test_save_drops_cache_files_nothing_refers_to(tmp_path):
+    manifest = IngestManifest(str(tmp_path), "model", CHUNKER)
+    manifest.update("a.pdf", "sha-a", [], [], np.empty((0, 2)))
+    manifest.update("a.pdf", "sha-a2", [], [], np.empty((0, 2)))
+    manifest.save()
+
+    assert sorted(p.name for p in (tmp_path / ".ingest").iterdir()) == ["sha-a2.npz"]
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    monkeypatch.setattr(cve, "DATA_FOLDER", str(data))
+    # Each line of a data file is a chunk; parsing real PDFs is not what these tests are about.
+    monkeypatch.setattr(cve, "parse_files", lambda paths, workers=1: (
+        chunks_of(open(path, encoding="utf-8").read(), path) for path in paths
+    ))
+    return data
+
+
+def ingest(tmp_path, embedder):
+    manifest = IngestManifest(str(tmp_path / "vector_store"), "model", CHUNKER)
+    entries, changes = cve.embed_corpus(cve.EmbeddingStage(embedder, batch_size=2), manifest)
+    manifest.save()
+    return entries, changes
+
+
+def test_only_new_chunk_text_is_embedded(tmp_path, data_dir):
+    (data_dir / "a.pdf").write_text("fees\nhostel\n", encoding="utf-8")
+    (data_dir / "b.pdf").write_text("budget\n", encoding="utf-8")
+    first = CountingEmbedder()
+    ingest(tmp_path, first)
+    assert sorted(first.texts) == ["budget", "fees", "hostel"]
+
+    again = CountingEmbedder()
+    _, changes = ingest(tmp_path, again)
+    assert again.texts == []
+    assert changes["unchanged"] == ["a.pdf", "b.pdf"]
+
+    (data_dir / "a.pdf").write_text("fees\nhostel\nlibrary\n", encoding="utf-8")
+    (data_dir / "b.pdf").unlink()
+    changed = CountingEmbedder()
+    entries, changes = ingest(tmp_path, changed)
+    assert changed.texts == ["library"]
+    assert (changes["changed"], changes["removed"]) == (["a.pdf"], ["b.pdf"])
+    assert [file for file, _ in entries] == ["a.pdf"]
+
+
+def test_embedding_stage_never_sends_more_than_a_batch():
+    embedder = CountingEmbedder()
+    calls = []
+    embed = embedder.embed_documents
+    embedder.embed_documents = lambda texts: calls.append(len(texts)) or embed(texts)
+    out = np.zeros((5, 2), dtype=np.float32)
+
+    stage = cve.EmbeddingStage(embedder, batch_size=2)
+    vectors = stage.embed(["a", "bb", "ccc", "dddd", "eeeee"], out)
+
+    assert calls == [2, 2, 1]
+    assert vectors is out
+    np.testing.assert_array_equal(out[:, 0], [1, 2, 3, 4, 5])
+    assert stage.chunks == 5
+
+
+@pytest.mark.parametrize("memmap", [False, True])
+def test_spool_holds_every_file_in_order(tmp_path, data_dir, memmap):
+    (data_dir / "a.pdf").write_text("fees\nhostel\n", encoding="utf-8")
+    (data_dir / "b.pdf").write_text("budget\n", encoding="utf-8")
+    manifest = IngestManifest(str(tmp_path / "vector_store"), "model", CHUNKER)
+    entries, _ = cve.embed_corpus(cve.EmbeddingStage(CountingEmbedder()), manifest)
+
+    path = str(tmp_path / "spool.npy") if memmap else None
+    spool, spooled = cve.spool_vectors(entries, manifest, "float16", path)
+
+    assert spool.vectors.dtype == np.float16
+    assert [(file, rows) for file, _, rows in spooled] == [("a.pdf", slice(0, 2)), ("b.pdf", slice(2, 3))]
+    np.testing.assert_array_equal(spool.vectors[:, 0], [4, 6, 6])
+    spool.close()
+    assert not (tmp_path / "spool.npy").exists()
+
+
+def test_sentence_cut_by_a_page_break_keeps_its_first_page():
+    pages = [(1, "The Board met on Monday. The hostel contract was"), (2, ""), (3, "ratified by the Board. Fees were revised.")]
+
+    assert list(cve.iter_page_sentences(pages)) == [
+        ("The Board met on Monday.", 1),
+        ("The hostel contract was ratified by the Board.", 1),
+        ("Fees were revised.", 3),
+    ]
+
+
+def test_pdf_chunks_record_their_pages(tmp_path):
+    import fitz
+    pdf_path = str(tmp_path / "40th_BoG_01.01.2017.pdf")
+    # Page numbers in the text would be cleaned away as headers, so each page has a marker word.
+    markers = {1: "alpha", 2: "bravo", 3: "charlie"}
+    with fitz.open() as pdf:
+        for page_no, marker in markers.items():
+            text = " ".join(f"Sentence {i} of section {marker} records a decision of the Board." for i in range(12))
+            pdf.new_page().insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=10)
+        pdf.save(pdf_path)
+
+    chunks = cve.process_pdf_text(pdf_path)
+
+    assert chunks and all(chunk.metadata["source"] == "40th_BoG_01.01.2017.pdf" for chunk in chunks)
+    for chunk in chunks:
+        first, last = chunk.metadata["page"], chunk.metadata["page_end"]
+        assert 1 <= first <= last <= 3
+        assert markers[first] in chunk.page_content and markers[last] in chunk.page_content
+    covered = {page for chunk in chunks for page in range(chunk.metadata["page"], chunk.metadata["page_end"] + 1)}
+    assert covered == {1, 2, 3}
+
+
+def test_chunks_close_at_agenda_item_headings(monkeypatch):
+    monkeypatch.setattr(cve, "MIN_CHUNK_LENGTH", 40)
+    sentences = [
+        ("Item No. 37.1: The minutes of the previous meeting were confirmed.", 1),
+        ("The Registrar read out the action taken report.", 1),
+        ("Item No. 37.2: The revised fee structure was approved.", 2),
+        ("It applies from the next academic session onwards.", 2),
+    ]
+
+    chunks = list(cve.iter_sentence_chunks(sentences, {"source": "37th_BoG.pdf"}))
+
+    assert [chunk.metadata["items"] for chunk in chunks] == [["37.1"], ["37.2"]]
+    assert [chunk.metadata["item_no"] for chunk in chunks] == ["Item No. 37.1", "Item No. 37.2"]
+    assert [(chunk.metadata["page"], chunk.metadata["page_end"]) for chunk in chunks] == [(1, 1), (2, 2)]
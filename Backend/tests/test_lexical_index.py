@@ -0,0 +1,55 @@
+import numpy as np
+from lexical_index import LexicalIndex, tokenize
+from retrieval import reciprocal_rank_fusion
+
+
+def test_tokenize_keeps_item_numbers_in_both_forms():
+    assert tokenize("The Item No. 37.05 of the BoG") == ["item", "37.05", "37.5", "bog"]
+    assert tokenize("M.Tech fees") == ["m", "tech", "fees"]
+
+
+def test_exact_terms_rank_their_chunks_first(corpus):
+    docs, _ = corpus
+    index = LexicalIndex.build([doc.page_content for doc in docs])
+
+    rows, scores = index.search("hostel construction contract", 3)
+    assert rows[0] == 5
+    assert len(rows) == 1 and scores[0] > 0
+
+    rows, _ = index.search("scholarship scheme", 10)
+    assert set(rows.tolist()) == {8, 9}
+    # "scheme" is in both; "scholarship" only in row 8
+    assert rows[0] == 8
+
+
+def test_mask_and_k_limit_the_results(corpus):
+    docs, _ = corpus
+    index = LexicalIndex.build([doc.page_content for doc in docs])
+    mask = np.zeros(len(docs), dtype=bool)
+    mask[4:7] = True
+
+    # Rows 0, 4 and 7 all confirm minutes; only row 4 is inside the mask.
+    rows, _ = index.search("confirmed minutes", 10, mask)
+    assert rows.tolist() == [4]
+    rows, _ = index.search("board", 2)
+    assert len(rows) == 2
+
+
+def test_index_round_trips_and_refuses_a_stale_file(tmp_path, corpus):
+    docs, _ = corpus
+    texts = [doc.page_content for doc in docs]
+    built = LexicalIndex.build(texts)
+    built.save(str(tmp_path))
+
+    loaded = LexicalIndex.load(str(tmp_path), len(texts))
+    for query in ("fee structure", "item 38.10", "finance committee fc"):
+        np.testing.assert_array_equal(loaded.search(query, 5)[0], built.search(query, 5)[0])
+    assert LexicalIndex.load(str(tmp_path), len(texts) + 1) is None
+    assert LexicalIndex.load(str(tmp_path / "missing"), len(texts)) is None
+
+
+def test_rrf_favours_rows_both_rankings_agree_on():
+    fused = reciprocal_rank_fusion([[1, 2, 3, 4], [5, 3, 1]])
+
+    assert fused[:2] == [1, 3]
+    assert set(fused) == {1, 2, 3, 4, 5}
@@ -0,0 +1,76 @@
+import pytest
+from meeting_catalog import MeetingCatalog, catalog_entry, date_ranges
+from meeting_index import build_meeting_index, MEETING_INDEX_NAME
+from store_registry import VectorStoreRegistry
+
+FILES = [
+    ("37th_BoG_12.03.2016.pdf", ["Item No. 37.1: The Board confirmed the minutes."]),
+    ("55th_BoG_14.06.2019.pdf", ["Item No. 55.1: The Board confirmed the minutes.", "Item No. 55.4: Scholarships."]),
+    ("60th_BoG_07.12.2019.pdf", ["Item No. 60.1: The Board confirmed the minutes."]),
+    ("74th_BoG_meeting_Editable_2024.pdf",
+     ["Minutes of the 74th meeting of the Board held on Saturday, 16th March 2024 at 11 AM."]),
+    ("annual_report_2018.pdf", ["The institute admitted its first PhD batch."]),
+]
+
+
+def sources(entries):
+    return sorted(entry["source"] for entry in entries)
+
+
+@pytest.mark.parametrize("query, ranges", [
+    ("meetings between March 2019 and Dec 2021", [(20190301, 20211231)]),
+    ("decisions in 2019-2021", [(20190101, 20211231)]),
+    ("since 2020", [(20200101, 99991231)]),
+    ("before 5.12.2023", [(0, 20231204)]),
+    ("until 2018", [(0, 20181231)]),
+    ("the meeting held on 7.12.2019", [(20191207, 20191207)]),
+    ("fees approved in BoG 55", []),
+])
+def test_date_ranges(query, ranges):
+    assert date_ranges(query) == ranges
+
+
+def test_entry_dates_come_from_the_name_or_the_minutes():
+    assert catalog_entry("55th_BoG_14.06.2019", chunks=3) == {
+        "source": "55th_BoG_14.06.2019", "meeting": 55, "date": 20190614, "year": 2019, "chunks": 3}
+    entry = catalog_entry("74th_BoG_meeting_Editable_2024", FILES[3][1])
+    assert (entry["meeting"], entry["date"], entry["year"], entry["chunks"]) == (74, 20240316, 2024, 1)
+    entry = catalog_entry("annual_report_2018")
+    assert (entry["meeting"], entry["date"], entry["year"]) == (-1, -1, 2018)
+
+
+def test_resolve_by_meeting_number_and_date_range():
+    catalog = MeetingCatalog.build(FILES)
+
+    assert sources(catalog.resolve({55})) == ["55th_BoG_14.06.2019"]
+    assert sources(catalog.by_meeting(50, 75)) == ["55th_BoG_14.06.2019", "60th_BoG_07.12.2019", "74th_BoG_meeting_Editable_2024"]
+    assert catalog.resolve({56}) == []
+    assert sources(catalog.resolve(ranges=date_ranges("meetings between March 2019 and Dec 2021"))) == [
+        "55th_BoG_14.06.2019", "60th_BoG_07.12.2019"]
+    assert sources(catalog.resolve(ranges=date_ranges("the meeting held on 7.12.2019"))) == ["60th_BoG_07.12.2019"]
+    # Known only by its year, the report is in any range that overlaps 2018.
+    assert sources(catalog.resolve(ranges=[(20180601, 20180630)])) == ["annual_report_2018"]
+    assert sources(catalog.resolve({37}, date_ranges("since 2024"))) == ["37th_BoG_12.03.2016", "74th_BoG_meeting_Editable_2024"]
+
+
+def test_catalog_round_trips(tmp_path):
+    catalog = MeetingCatalog.build(FILES)
+    catalog.save(str(tmp_path))
+
+    loaded = MeetingCatalog.load(str(tmp_path))
+    assert loaded.entries == catalog.entries
+    assert sources(loaded.resolve({60}, [(20160101, 20161231)])) == ["37th_BoG_12.03.2016", "60th_BoG_07.12.2019"]
+    assert MeetingCatalog.load(str(tmp_path / "missing")) is None
+
+
+def test_catalog_is_built_from_store_names_without_a_file(tmp_path, corpus, write_store):
+    docs, vectors = corpus
+    build_meeting_index(docs[:7], vectors[:7], str(tmp_path / MEETING_INDEX_NAME))
+    write_store(tmp_path / "55th_BoG_14.06.2019", docs[7:], vectors[7:])
+    registry = VectorStoreRegistry(str(tmp_path), None, legacy_stores=True)
+    registry.reload()
+
+    entries = {entry["source"]: entry for entry in registry.catalog.entries}
+    assert sorted(entries) == ["37th_BoG_12.03.2016", "38th_BoG_20.09.2016", "55th_BoG_14.06.2019"]
+    assert [entries[source]["chunks"] for source in sorted(entries)] == [4, 3, 3]
+    assert entries["38th_BoG_20.09.2016"]["date"] == 20160920
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+from meeting_index import MeetingIndex, build_meeting_index, parse_item_reference, parse_meeting_name, MEETING_INDEX_NAME
+from query_expansion import QueryExpander
+from rag_query_handler import TextRAGHandler
+from store_registry import VectorStoreRegistry
+
+
+@pytest.mark.parametrize("query, reference", [
+    ("What was item 38.10 about?", (38, "38.10")),
+    ("Item No. 37.02 of the 37th meeting", (37, "37.2")),
+    ("What did item 5 of BoG 38 say?", (None, "5")),
+    ("What was approved in BoG 38?", None),
+])
+def test_parse_item_reference(query, reference):
+    assert parse_item_reference(query) == reference
+
+
+def make_handler(root, corpus):
+    docs, vectors = corpus
+    build_meeting_index(docs, vectors, str(root / MEETING_INDEX_NAME))
+    handler = object.__new__(TextRAGHandler)
+    handler.store_registry = VectorStoreRegistry(str(root), None)
+    handler.store_registry.reload()
+    handler.query_expander = QueryExpander()
+    return handler
+
+
+def test_dotted_item_reference_uses_the_item_table_without_a_meeting(tmp_path, corpus):
+    handler = make_handler(tmp_path, corpus)
+    plan = handler._plan_search("What was item 38.10 about?", handler.vector_stores)
+
+    index = handler.vector_stores[MEETING_INDEX_NAME]
+    assert "item_rows" in plan
+    assert [index.document(row).page_content for row in plan["item_rows"]] == [corpus[0][5].page_content]
+
+
+def test_bare_item_number_needs_a_meeting(tmp_path, corpus):
+    handler = make_handler(tmp_path, corpus)
+
+    assert "item_rows" not in handler._plan_search("What was item 4 about?", handler.vector_stores)
+    plan = handler._plan_search("What was item 4 of the 55th BoG meeting about?", handler.vector_stores)
+    assert len(plan["item_rows"]) == 2
+
+
+def load_index(root, corpus):
+    docs, vectors = corpus
+    build_meeting_index(docs, vectors, str(root))
+    return MeetingIndex.load(str(root))
+
+
+def meetings_of(index, rows):
+    return {int(index.meeting[row]) for row in rows}
+
+
+@pytest.mark.parametrize("name, parsed", [
+    ("37th_BoG_12.03.2016", (37, 20160312, 2016)),
+    ("55th BoG 14.06.19", (55, 20190614, 2019)),
+    ("Ordinance_2021", (-1, -1, 2021)),
+])
+def test_parse_meeting_name(name, parsed):
+    assert parse_meeting_name(name) == parsed
+
+
+def test_select_builds_row_masks(tmp_path, corpus):
+    index = load_index(tmp_path, corpus)
+
+    assert meetings_of(index, np.flatnonzero(index.select({38}))) == {38}
+    assert index.select({38}).sum() == 3
+    assert meetings_of(index, np.flatnonzero(index.select(years={2016}))) == {37, 38}
+    assert meetings_of(index, np.flatnonzero(index.select(sources=["55th_BoG_14.06.2019"]))) == {55}
+    assert index.select({37}, sources=["55th_BoG_14.06.2019"]).sum() == 7
+    assert not index.select().any()
+
+
+@pytest.mark.parametrize("meetings", [{38}, {37, 55}])
+def test_masked_search_stays_inside_the_mask(tmp_path, corpus, meetings):
+    # {38} is one contiguous row range; {37, 55} needs the bitmap selector.
+    docs, vectors = corpus
+    index = load_index(tmp_path, corpus)
+    mask = index.select(meetings)
+
+    hits = index.search(vectors[5], 10, mask)
+
+    assert len(hits) == mask.sum()
+    assert meetings_of(index, [row for _, row in hits]) == meetings
+    scores = [score for score, _ in hits]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_index_round_trips_through_disk(tmp_path, corpus):
+    docs, vectors = corpus
+    index = load_index(tmp_path, corpus)
+
+    assert index.ntotal == len(docs)
+    assert index.stats()["meetings"] == [37, 38, 55]
+    _, row = index.search(vectors[4], 1)[0]
+    assert index.document(row).page_content == docs[4].page_content
+    assert index.document(row).metadata["source_folder"] == "38th_BoG_20.09.2016"
+    np.testing.assert_allclose(index.vectors([row])[0], vectors[4], rtol=1e-6)
+    assert index.lexical is not None and len(index.lexical) == len(docs)
+
+
+def test_out_of_sync_files_are_refused(tmp_path, corpus, write_store):
+    docs, vectors = corpus
+    build_meeting_index(docs, vectors, str(tmp_path))
+    # A chunk store left over from a different build
+    write_store(tmp_path / "other", docs[:3], vectors[:3])
+    for name in ("chunks.text", "chunks.rows.npy", "chunks.items.npy", "chunks.strings.json"):
+        (tmp_path / name).write_bytes((tmp_path / "other" / name).read_bytes())
+
+    with pytest.raises(ValueError, match="out of sync"):
+        MeetingIndex.load(str(tmp_path))
+
+
+def test_lookup_item_reads_the_item_table(tmp_path, corpus):
+    docs, _ = corpus
+    index = load_index(tmp_path, corpus)
+
+    def texts(meetings, item):
+        return sorted(index.document(row).page_content for row in index.lookup_item(meetings, item))
+
+    assert texts({37}, "37.3") == sorted([docs[2].page_content, docs[3].page_content])
+    # "item 3 of BoG 37" is item 37.3
+    assert texts({37}, "3") == texts({37}, "37.3")
+    assert texts({37, 55}, "4") == sorted([docs[8].page_content, docs[9].page_content])
+    assert texts({38}, "37.3") == []
+    assert texts({38}, "9") == []
+
+
+def test_item_table_falls_back_to_headings_in_the_text(tmp_path, corpus):
+    from meeting_index import find_items
+    docs, vectors = corpus
+    for doc in docs:
+        doc.metadata.pop("items")
+    index = load_index(tmp_path, (docs, vectors))
+
+    assert find_items("Tem No. 37.05 was noted. item No.37.6 was deferred.") == ["37.5", "37.6"]
+    # Only chunks that show a heading are in the table without the chunker's `items` metadata.
+    assert len(index.lookup_item({37}, "37.3")) == 1
+    assert len(index.lookup_item({38}, "38.10")) == 1
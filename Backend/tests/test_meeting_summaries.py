@@ -0,0 +1,90 @@
+import os
+import pytest
+import rag_query_handler
+from meeting_index import build_meeting_index, MEETING_INDEX_NAME
+from meeting_summaries import SummaryIndex, is_overview_query, refresh_summaries, summarize, summary_path
+from query_expansion import QueryExpander
+from rag_query_handler import TextRAGHandler
+from store_registry import VectorStoreRegistry
+
+CONFIRMED = "Item No. 38.1: The Board confirmed the minutes of the 37th meeting of the Board."
+RATIFIED = "Item No. 38.10: The Board ratified the hostel construction contract awarded by the institute."
+RESOLVED = "The Board resolved that the hostel construction contract be reviewed by the Finance Committee."
+MINUTES = [
+    f"Tea was served. {CONFIRMED} {RATIFIED}",
+    # Chunks overlap, sometimes with the spacing changed.
+    f"{RATIFIED.replace(' the ', '  the ')} {RESOLVED}",
+    "Thememberswereinformedaboutthenewlibrarybuildingplans at length today, as the minutes record.",
+]
+
+
+@pytest.mark.parametrize("query, overview", [
+    ("Summarize the 38th BoG meeting", True),
+    ("What happened in the 60th BoG meeting?", True),
+    ("What were the key decisions of BoG 55?", True),
+    ("Tell me about the 38th meeting", True),
+    ("agenda of the 55th BoG", True),
+    ("What was decided about fees in BoG 55?", False),
+    ("Who chaired the 38th BoG meeting?", False),
+])
+def test_is_overview_query(query, overview):
+    assert is_overview_query(query) == overview
+
+
+def test_summary_keeps_distinct_sentences_in_document_order():
+    summary = summarize(MINUTES)
+
+    # The repeated contract sentence is kept once; the confirmation shares too few terms with the
+    # rest of the meeting to score, and short sentences and OCR run-ons are left out.
+    assert summary == f"{RATIFIED} {RESOLVED}"
+    assert summarize(["Too short."]) == ""
+
+
+def test_summary_fits_its_length_limit():
+    limit = max(len(RATIFIED), len(RESOLVED)) + 1
+    assert summarize(MINUTES, max_chars=limit) in (RATIFIED, RESOLVED)
+    assert summarize(MINUTES, max_chars=20) == ""
+
+
+def test_summaries_are_refreshed_loaded_and_trimmed(tmp_path):
+    folder = str(tmp_path)
+    chunks = lambda texts: [type("Chunk", (), {"page_content": text}) for text in texts]
+    entries = [("38th_BoG_20.09.2016.pdf", chunks(MINUTES)), ("Ordinance_2021.pdf", chunks(MINUTES))]
+    no_changes = {"changed": [], "removed": []}
+
+    assert refresh_summaries(folder, entries, no_changes) == 2
+    assert refresh_summaries(folder, entries, no_changes) == 0
+    assert refresh_summaries(folder, entries, {"changed": ["38th_BoG_20.09.2016.pdf"], "removed": []}) == 1
+    refresh_summaries(folder, entries[:1], {"changed": [], "removed": ["Ordinance_2021.pdf"]})
+    assert not os.path.exists(summary_path(folder, "Ordinance_2021"))
+
+    index = SummaryIndex.load(folder)
+    assert len(index) == 1
+    [doc] = index.documents(38)
+    assert doc.page_content.startswith("Summary of 38th_BoG_20.09.2016:\n")
+    assert doc.metadata == {"source": "38th_BoG_20.09.2016.summary.txt", "meeting": 38}
+    assert index.documents(55) == []
+
+    trimmed = SummaryIndex.load(folder, max_chars=150).documents(38)[0].page_content
+    assert len(trimmed) <= 150 and trimmed.endswith(".")
+
+
+def test_overview_of_one_meeting_is_routed_to_its_summary(tmp_path, corpus, monkeypatch):
+    docs, vectors = corpus
+    build_meeting_index(docs, vectors, str(tmp_path / MEETING_INDEX_NAME))
+    monkeypatch.setattr(rag_query_handler, "SUMMARY_ROUTE", True)
+    handler = object.__new__(TextRAGHandler)
+    handler.store_registry = VectorStoreRegistry(str(tmp_path), None)
+    handler.store_registry.reload()
+    handler.query_expander = QueryExpander()
+    handler.summary_index = SummaryIndex({"38th_BoG_20.09.2016": "Summary of 38th_BoG_20.09.2016:\n" + RATIFIED})
+    stores = handler.vector_stores
+
+    plan = handler._plan_search("Summarize the 38th BoG meeting", stores)
+    assert [doc.metadata["meeting"] for doc in plan["summaries"]] == [38]
+    assert plan["rows"].sum() == 3
+
+    for query in ("What was decided about fees in BoG 38?",     # a topical question
+                  "Summarize BoG 37 and BoG 38"           ,   # more than one meeting
+                  "Summarize the 55th BoG meeting"):            # no summary written
+        assert "summaries" not in handler._plan_search(query, stores)
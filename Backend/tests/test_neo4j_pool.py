@@ -0,0 +1,56 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+# neo4j_pool and its stub driver live with the Knowledge Graph app.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Knowledge_Graph"))
+import neo4j_pool
+from neo4j_stub import StubDriver
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    stub = StubDriver(connect_delay=0.01, query_delay=0.001)
+    monkeypatch.setattr(neo4j_pool, "metrics", neo4j_pool.PoolMetrics())
+    neo4j_pool.use_driver(stub)
+    yield stub
+    neo4j_pool.close_driver()
+
+
+def test_queries_share_one_pool_and_one_query_shape(driver):
+    filters = [{}, {"bog_number": "70th"}, {"item_no": "70.01", "meeting_date": "2019-01-01"}]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: neo4j_pool.similar_chunks([0.0] * 4, 5, 0.5, filters[i % 3], database="neo4j"), range(40)))
+
+    # Connections are reused across queries, and k and the filters never change the Cypher text.
+    assert neo4j_pool.get_driver() is driver
+    assert driver.connections_opened <= 4
+    assert driver.queries == {neo4j_pool.SIMILAR_CHUNKS_QUERY: 40}
+    assert neo4j_pool.metrics.stats()["queries"] == 40
+
+
+def test_similar_chunks_maps_records(driver):
+    chunks = neo4j_pool.similar_chunks([0.0] * 4, 3, 0.5, {"bog_number": "70th"}, database="neo4j")
+
+    assert len(chunks) == 3
+    assert chunks[0] == {
+        "text": "Stub chunk 0", "score": 1.0,
+        "metadata": {"bog_number": "70th", "item_no": "70.00", "meeting_date": "2019-01-01", "source_file": "stub.pdf"},
+    }
+
+
+def test_failed_queries_are_counted(driver, monkeypatch):
+    def fail(query, params):
+        raise RuntimeError("server unavailable")
+    monkeypatch.setattr(driver, "record_query", fail)
+
+    with pytest.raises(RuntimeError):
+        neo4j_pool.run_read("RETURN 1", database="neo4j")
+    assert neo4j_pool.metrics.stats()["errors"] == 1
+
+
+def test_close_driver_forgets_the_driver(driver):
+    neo4j_pool.close_driver()
+    # The next get_driver() connects afresh instead of handing out a closed driver.
+    assert neo4j_pool._driver is None
@@ -0,0 +1,70 @@
+import numpy as np
+import query_cache
+from query_cache import LRUCache, QueryCache, normalize_query
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache("test", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+    cache = LRUCache("test", ttl=60)
+    cache.set("a", 1)
+
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_sqlite_layer_warms_a_new_process(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    QueryCache("model-a", persist_path=path).embed(lambda text: [0.5, 0.25], "fees")
+
+    restarted = QueryCache("model-a", persist_path=path)
+    vector = restarted.embed(lambda text: [9.0, 9.0], "fees")
+
+    np.testing.assert_array_equal(vector, [0.5, 0.25])
+    assert restarted.embeddings.stats()["disk_hits"] == 1
+    # Another embedding model must not see these vectors.
+    other = QueryCache("model-b", persist_path=path)
+    np.testing.assert_array_equal(other.embed(lambda text: [1.0, 0.0], "fees"), [1.0, 0.0])
+
+
+def test_expired_rows_on_disk_are_not_served(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "cache.sqlite")
+    LRUCache("amplified_queries", ttl=60, persist_path=path).set("q", "expanded q")
+
+    now[0] += 61
+    assert LRUCache("amplified_queries", ttl=60, persist_path=path).get("q") is None
+
+
+def test_amplified_queries_are_keyed_by_the_normalized_query():
+    cache = QueryCache("model")
+    cache.set_amplified("What was decided in BoG 55?", "expanded")
+
+    assert normalize_query("  what was  decided in bog 55 ") == "what was decided in bog 55"
+    assert cache.get_amplified("what was decided in BoG 55") == "expanded"
+
+
+def test_embedding_is_computed_once():
+    calls = []
+    cache = QueryCache("model")
+    for _ in range(3):
+        cache.embed(lambda text: calls.append(text) or [1.0], "fees")
+
+    assert calls == ["fees"]
+    assert cache.embeddings.stats()["hits"] == 2
@@ -0,0 +1,29 @@
+import pytest
+from query_expansion import QueryExpander
+
+
+@pytest.mark.parametrize("query, meetings", [
+    ("What was decided in the 74th BoG meeting?", {74}),
+    ("Minutes of BoG 55", {55}),
+    ("meeting no. 60", {60}),
+    ("What did the seventy-fourth meeting decide?", {74}),
+    ("What did the fifty fifth Board of Governors approve?", {55}),
+    ("the first meeting", {1}),
+    # An ordinal counting meetings within a period is not a meeting number.
+    ("first BoG meeting of 2019", set()),
+    ("the second board meeting in 2020", set()),
+    ("In the first meeting of 2019, what was approved?", set()),
+    ("the second meeting held in March 2020", set()),
+    ("the third meeting in 2021", set()),
+    # Nor is a bare count before the noun.
+    ("Were 2 board resolutions passed unanimously?", set()),
+    ("List the top 10 meeting decisions", set()),
+    ("3 meetings were held in 2019", set()),
+])
+def test_meeting_numbers(query, meetings):
+    assert QueryExpander().entities(query).meetings == meetings
+
+
+def test_years_survive_period_qualifier():
+    entities = QueryExpander().entities("In the first meeting of 2019, what was approved?")
+    assert 2019 in entities.years
@@ -0,0 +1,63 @@
+import numpy as np
+from chunk_store import load_faiss_store
+from retrieval import rank_by_vectors, search_with_vectors
+
+
+def test_rank_by_vectors_orders_by_cosine(corpus):
+    _, vectors = corpus
+    query = vectors[3] + 0.1 * vectors[8]
+    # Scaling a row must not change its cosine rank.
+    scaled = vectors * np.arange(1, len(vectors) + 1, dtype=np.float32)[:, None]
+
+    positions, scores = rank_by_vectors(query, scaled, 4)
+
+    cosine = vectors @ query / np.linalg.norm(query)
+    assert positions.tolist() == np.argsort(-cosine)[:4].tolist()
+    np.testing.assert_allclose(scores, cosine[positions], rtol=1e-5)
+
+
+def test_rank_by_vectors_handles_no_candidates():
+    positions, scores = rank_by_vectors(np.ones(4), np.empty((0, 4)), 10)
+    assert positions.shape == scores.shape == (0,)
+
+
+def test_search_returns_the_stored_vectors(tmp_path, corpus, write_store):
+    docs, vectors = corpus
+    write_store(tmp_path, docs, vectors)
+    store = load_faiss_store(str(tmp_path), None)
+
+    hits, hit_vectors = search_with_vectors(store, vectors[2], 3)
+
+    assert hits[0].page_content == docs[2].page_content
+    rows = [next(i for i, doc in enumerate(docs) if doc.page_content == hit.page_content) for hit in hits]
+    np.testing.assert_array_equal(hit_vectors, vectors[rows])
+
+
+def write_meeting_stores(root, corpus, write_store):
+    docs, vectors = corpus
+    stores = {}
+    for source in dict.fromkeys(doc.metadata["source"] for doc in docs):
+        rows = [i for i, doc in enumerate(docs) if doc.metadata["source"] == source]
+        write_store(root / source, [docs[i] for i in rows], vectors[rows])
+        stores[source] = load_faiss_store(str(root / source), None)
+    return stores
+
+
+def test_fan_out_merges_the_best_hits_across_stores(tmp_path, corpus, write_store):
+    from concurrent.futures import ThreadPoolExecutor
+    from retrieval import fan_out_search
+
+    docs, vectors = corpus
+    stores = write_meeting_stores(tmp_path, corpus, write_store)
+    query = vectors[1] + vectors[8]
+
+    serial = fan_out_search(stores, query, 4)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel = fan_out_search(stores, query, 4, executor)
+
+    # The same hits as one search over the whole corpus, best first, whichever way the stores were searched.
+    expected = np.argsort(-(vectors @ query))[:4]
+    assert [doc.page_content for _, _, doc, _ in serial] == [docs[i].page_content for i in expected]
+    assert [(score, name) for score, name, _, _ in parallel] == [(score, name) for score, name, _, _ in serial]
+    assert serial[0][1] in ("37th_BoG_12.03.2016.pdf", "55th_BoG_14.06.2019.pdf")
+    np.testing.assert_allclose([score for score, _, _, _ in serial], (vectors @ query)[expected], rtol=1e-5)
@@ -0,0 +1,146 @@
+import os
+from meeting_index import MeetingIndex, build_meeting_index, MEETING_INDEX_NAME
+from store_registry import VectorStoreRegistry
+
+
+def write_layout(root, corpus, write_store, consolidated=True):
+    """Per-meeting stores and db_faiss, plus meeting_index when `consolidated`."""
+    docs, vectors = corpus
+    for source in dict.fromkeys(doc.metadata["source"] for doc in docs):
+        rows = [i for i, doc in enumerate(docs) if doc.metadata["source"] == source]
+        write_store(root / os.path.splitext(source)[0], [docs[i] for i in rows], vectors[rows])
+    write_store(root / "db_faiss", docs, vectors)
+    if consolidated:
+        build_meeting_index(docs, vectors, str(root / MEETING_INDEX_NAME))
+
+
+def test_per_meeting_layout_loads_every_store(tmp_path, corpus, write_store):
+    write_layout(tmp_path, corpus, write_store, consolidated=False)
+    registry = VectorStoreRegistry(str(tmp_path), None)
+    registry.reload()
+
+    assert sorted(registry.stores) == ["37th_BoG_12.03.2016", "38th_BoG_20.09.2016", "55th_BoG_14.06.2019", "db_faiss"]
+
+
+def test_meeting_index_replaces_the_legacy_stores(tmp_path, corpus, write_store):
+    write_layout(tmp_path, corpus, write_store)
+    registry = VectorStoreRegistry(str(tmp_path), None)
+    registry.reload()
+
+    assert list(registry.stores) == [MEETING_INDEX_NAME]
+    assert isinstance(registry.stores[MEETING_INDEX_NAME], MeetingIndex)
+    # The catalog still lists every meeting, from the meeting index's sources.
+    assert len(registry.catalog) == 3
+
+
+def test_legacy_stores_are_dropped_once_a_meeting_index_appears(tmp_path, corpus, write_store):
+    write_layout(tmp_path, corpus, write_store, consolidated=False)
+    registry = VectorStoreRegistry(str(tmp_path), None)
+    registry.reload()
+    assert len(registry.stores) == 4
+
+    docs, vectors = corpus
+    build_meeting_index(docs, vectors, str(tmp_path / MEETING_INDEX_NAME))
+    result = registry.reload()
+
+    assert list(registry.stores) == [MEETING_INDEX_NAME]
+    assert len(result["removed"]) == 4
+
+
+def test_legacy_stores_can_be_kept(tmp_path, corpus, write_store):
+    write_layout(tmp_path, corpus, write_store)
+    registry = VectorStoreRegistry(str(tmp_path), None, legacy_stores=True)
+    registry.reload()
+
+    assert len(registry.stores) == 5
+
+
+class FakeBackend:
+    """Embeds a text as the stored vector of the chunk it equals, so searches are exact."""
+
+    def __init__(self, corpus):
+        docs, vectors = corpus
+        self.vectors = {doc.page_content: vector for doc, vector in zip(docs, vectors)}
+
+    def embed_query(self, text):
+        return self.vectors[text].tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def test_pickled_store_answers_text_searches(tmp_path, corpus):
+    from langchain_community.vectorstores import FAISS
+    from model_loader import LazyModel
+    from rag_query_handler import LazyEmbeddings
+
+    docs, vectors = corpus
+    embeddings = LazyEmbeddings("fake")
+    embeddings.model = LazyModel("fake", lambda: FakeBackend(corpus))
+    FAISS.from_embeddings([(doc.page_content, vector.tolist()) for doc, vector in zip(docs, vectors)],
+                          embeddings, metadatas=[doc.metadata for doc in docs]).save_local(str(tmp_path / "db_faiss"))
+
+    registry = VectorStoreRegistry(str(tmp_path), embeddings)
+    registry.reload()
+    hits = registry.stores["db_faiss"].similarity_search(docs[5].page_content, k=1)
+
+    assert hits[0].metadata["item_no"] == "38.10"
+
+
+def test_reload_only_loads_changed_stores(tmp_path, corpus, write_store):
+    write_layout(tmp_path, corpus, write_store, consolidated=False)
+    registry = VectorStoreRegistry(str(tmp_path), None)
+    first = registry.reload()
+    assert len(first["reloaded"]) == 4 and registry.generation == 1
+
+    unchanged = registry.stores["db_faiss"]
+    assert registry.reload()["reloaded"] == []
+    assert registry.generation == 1
+
+    docs, vectors = corpus
+    write_store(tmp_path / "55th_BoG_14.06.2019", docs[7:8], vectors[7:8])
+    result = registry.reload()
+    assert result["reloaded"] == ["55th_BoG_14.06.2019"]
+    assert registry.generation == 2
+    assert registry.stores["55th_BoG_14.06.2019"].index.ntotal == 1
+    # Stores that did not change are the same objects, not reloaded copies.
+    assert registry.stores["db_faiss"] is unchanged
+
+
+def test_removed_store_is_dropped(tmp_path, corpus, write_store):
+    import shutil
+    write_layout(tmp_path, corpus, write_store, consolidated=False)
+    registry = VectorStoreRegistry(str(tmp_path), None)
+    registry.reload()
+
+    shutil.rmtree(tmp_path / "38th_BoG_20.09.2016")
+    result = registry.reload()
+    assert result["removed"] == ["38th_BoG_20.09.2016"]
+    assert "38th_BoG_20.09.2016" not in registry.stores
+    assert registry.generation == 2
+
+
+def test_broken_rewrite_keeps_serving_the_previous_store(tmp_path, corpus, write_store):
+    write_layout(tmp_path, corpus, write_store, consolidated=False)
+    registry = VectorStoreRegistry(str(tmp_path), None)
+    registry.reload()
+    previous = registry.stores["db_faiss"]
+
+    (tmp_path / "db_faiss" / "index.faiss").write_bytes(b"not an index")
+    result = registry.reload()
+    assert result["failed"] == ["db_faiss"]
+    assert registry.stores["db_faiss"] is previous
+    assert registry.generation == 1
+
+
+def test_reload_hooks_hear_whether_the_stores_changed(tmp_path, corpus, write_store):
+    write_layout(tmp_path, corpus, write_store, consolidated=False)
+    registry = VectorStoreRegistry(str(tmp_path), None)
+    calls = []
+    registry.add_reload_hook(calls.append)
+    registry.add_reload_hook(lambda changed: 1 / 0)
+
+    registry.reload()
+    registry.reload()
+    # A failing hook is reported, not raised, and does not stop the others.
+    assert calls == [True, False]
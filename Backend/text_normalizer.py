@@ -0,0 +1,58 @@
+"""Fast text normalization for ingestion.
+
+clean_text applies the same rules, in the same order, as the original six
+re.sub passes, but every pattern is precompiled, the hyphen pattern starts
+with a literal so the regex engine can skip ahead, whitespace is collapsed
+with str.split, and passes whose trigger characters are absent are skipped.
+Output is identical to the old implementation.
+
+OCR glue words ("AllahabadAllahabad", "TheBoardofGovernors") recur across
+meetings, so wordninja splits are memoized per process.
+"""
+import re
+from functools import lru_cache
+import wordninja
+
+WORD_SPLIT_CACHE_SIZE = 1 << 16
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x1F\x7F-\x9F]")
+_HYPHEN_BREAK = re.compile(r"-(?<=\w-)\s+(?=\w)")
+_BULLETS = re.compile(r"[•▪�]+")
+_PAGE_NUMBER = re.compile(r"(?i)\b(?:page|pase)\s*\d+\b")
+_UNDERSCORES = re.compile(r"_{2,}")
+
+
+def clean_text(text):
+    if not text:
+        return ""
+    text = _CONTROL_CHARS.sub("", text)
+    if "-" in text:
+        text = _HYPHEN_BREAK.sub("", text)
+    # Equivalent to re.sub(r"\s+", " ") followed by the final strip().
+    text = " ".join(text.split())
+    if "•" in text or "▪" in text or "�" in text:
+        text = _BULLETS.sub(" ", text)
+    lowered = text.lower()
+    if "page" in lowered or "pase" in lowered:
+        text = _PAGE_NUMBER.sub("", text)
+    if "__" in text:
+        text = _UNDERSCORES.sub("", text)
+    return text.strip()
+
+
+@lru_cache(maxsize=WORD_SPLIT_CACHE_SIZE)
+def split_word(word):
+    return tuple(wordninja.split(word))
+
+
+def fix_spacing_in_chunk(chunk):
+    if " " not in chunk:
+        return " ".join(wordninja.split(chunk))
+    fixed_words = []
+    for word in chunk.split():
+        if len(word) > 15 and word.isalpha():
+            split = split_word(word)
+            fixed_words.extend(split if len(split) > 1 else [word])
+        else:
+            fixed_words.append(word)
+    return " ".join(fixed_words)
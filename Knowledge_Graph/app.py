@@ -1,11 +1,27 @@
 # app.py
 
-from flask import Flask, request, jsonify
+import json
+import os
+import sys
+import time
+
+# model_loader lives in Backend/; imported first so the startup clock covers the imports below
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+from model_loader import startup, PREWARM_MODELS
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from query_helper import get_similar_chunks, ask_groq
+from query_helper import get_similar_chunks, ask_groq, embed_query, ensure_context, stream_groq, NO_CONTEXT_ANSWER, prewarm, model_status
+import neo4j_pool
+from answer_cache import SemanticAnswerCache, make_source_key
+
+startup.record("imports", (time.perf_counter() - startup.started) * 1000)
 
 app = Flask(__name__)
 CORS(app)
+answer_cache = SemanticAnswerCache()
+if PREWARM_MODELS:
+    prewarm()
+startup.mark_ready()
 
 
 @app.route("/query", methods=["POST"])
@@ -18,12 +34,87 @@ def query():
 
     try:
         chunks = get_similar_chunks(user_query)
+        query_vector = embed_query(user_query)
+        source_key = make_source_key((chunk["metadata"]["source_file"], chunk["text"]) for chunk in chunks)
+
+        cached = answer_cache.lookup(query_vector, source_key)
+        if cached is not None:
+            return jsonify({"answer": cached["answer"], "cached": True})
+
+        start = time.perf_counter()
         response = ask_groq(user_query, chunks)
+        if chunks:
+            answer_cache.store(query_vector, source_key, response, (time.perf_counter() - start) * 1000)
         return jsonify({"answer": response})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route("/query/stream", methods=["POST"])
+def query_stream():
+    data = request.get_json()
+    user_query = data.get("query", "")
+
+    if not user_query:
+        return jsonify({"error": "No query provided"}), 400
+
+    def generate():
+        try:
+            chunks = ensure_context(user_query, get_similar_chunks(user_query))
+            # Sources go out before the LLM is called so the UI can render them immediately.
+            yield _sse("sources", [dict(chunk["metadata"], score=chunk["score"]) for chunk in chunks])
+            if not chunks:
+                yield _sse("token", {"text": NO_CONTEXT_ANSWER})
+                yield _sse("done", {"cached": False})
+                return
+
+            query_vector = embed_query(user_query)
+            source_key = make_source_key((chunk["metadata"]["source_file"], chunk["text"]) for chunk in chunks)
+            cached = answer_cache.lookup(query_vector, source_key)
+            if cached is not None:
+                yield _sse("token", {"text": cached["answer"]})
+                yield _sse("done", {"cached": True})
+                return
+
+            parts = []
+            start = time.perf_counter()
+            # A stream that fails partway raises into the handler below: the client gets an error event
+            # after the text already sent, and the partial answer is never cached.
+            for token in stream_groq(user_query, chunks):
+                parts.append(token)
+                yield _sse("token", {"text": token})
+            if parts:
+                answer_cache.store(query_vector, source_key, "".join(parts), (time.perf_counter() - start) * 1000)
+            yield _sse("done", {"cached": False})
+        except Exception as e:
+            yield _sse("error", {"message": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    return jsonify({"status": "healthy", "models": model_status(), "startup": startup.stats()})
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify({"answer_cache": answer_cache.stats()})
+
+
+@app.route("/neo4j/stats", methods=["GET"])
+def neo4j_stats():
+    return jsonify(neo4j_pool.metrics.stats())
+
+
 if __name__ == "__main__":
     app.run(debug=True)
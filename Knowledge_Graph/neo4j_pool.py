@@ -0,0 +1,199 @@
+# neo4j_pool.py
+
+"""Process-wide Neo4j driver shared by app.py/query_helper.py and ui.py.
+
+The driver (and its connection pool) is created once per process instead of
+once per request, and chunk retrieval always sends the same parameterized
+Cypher text (k and the metadata filters are parameters), so the server
+caches a single query plan.
+
+Any object with the driver interface (driver.session(database=...) ->
+session.execute_read(work) -> work(tx) -> tx.run(query, params)) can be
+installed with use_driver(), e.g. neo4j_stub.StubDriver:
+
+    python neo4j_pool.py --stub --queries 200
+"""
+import argparse
+import atexit
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+NEO4J_LIVENESS_CHECK_TIMEOUT = float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "60"))
+
+SIMILAR_CHUNKS_QUERY = """
+CALL db.index.vector.queryNodes('chunkVectorIndex', $topK, $queryEmbedding)
+YIELD node, score
+MATCH (c:Chunk)-[:HAS_EMBEDDING]->(node)
+WHERE score >= $minScore
+  AND ($bog_number IS NULL OR c.bog_number = $bog_number)
+  AND ($item_no IS NULL OR c.item_no = $item_no)
+  AND ($meeting_date IS NULL OR c.meeting_date = $meeting_date)
+RETURN c.text AS text, c.bog_number AS bog, c.item_no AS item,
+       c.meeting_date AS date, c.source_file AS file, score AS score
+ORDER BY score DESC
+"""
+
+
+class PoolMetrics:
+    """Rolling timings: connection acquisition (session open -> transaction ready) and query execution."""
+
+    def __init__(self, window=1000):
+        self._acquire_ms = deque(maxlen=window)
+        self._query_ms = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.errors = 0
+
+    def record(self, acquire_ms, query_ms):
+        with self._lock:
+            self.queries += 1
+            self._acquire_ms.append(acquire_ms)
+            self._query_ms.append(query_ms)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def _summary(self, samples):
+        if not samples:
+            return {"avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "avg_ms": round(statistics.fmean(ordered), 2),
+            "p50_ms": round(ordered[len(ordered) // 2], 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2),
+            "max_ms": round(ordered[-1], 2)
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "errors": self.errors,
+                "acquire": self._summary(self._acquire_ms),
+                "query": self._summary(self._query_ms)
+            }
+
+
+metrics = PoolMetrics()
+_driver = None
+_driver_lock = threading.Lock()
+
+
+def get_driver():
+    global _driver
+    if _driver is None:
+        with _driver_lock:
+            if _driver is None:
+                from neo4j import GraphDatabase
+                from config import NEO4J_URL, NEO4J_USER, NEO4J_PASSWORD
+
+                print("Connecting to Neo4j...")
+                _driver = GraphDatabase.driver(
+                    NEO4J_URL,
+                    auth=(NEO4J_USER, NEO4J_PASSWORD),
+                    max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+                    connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+                    max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+                    liveness_check_timeout=NEO4J_LIVENESS_CHECK_TIMEOUT
+                )
+                atexit.register(close_driver)
+                print("Neo4j driver ready ✅")
+    return _driver
+
+
+def use_driver(driver):
+    """Install an already constructed driver (or a stub with the same interface)."""
+    global _driver
+    with _driver_lock:
+        _driver = driver
+
+
+def close_driver():
+    global _driver
+    with _driver_lock:
+        if _driver is not None:
+            _driver.close()
+            _driver = None
+
+
+def _default_database():
+    from config import NEO4J_DATABASE
+    return NEO4J_DATABASE
+
+
+def run_read(query, database=None, **params):
+    """Run a read query in a managed transaction on the shared driver, timing connection acquisition."""
+    driver = get_driver()
+    start = time.perf_counter()
+    ready = []
+
+    def work(tx):
+        if not ready:
+            ready.append(time.perf_counter())
+        return list(tx.run(query, params))
+
+    try:
+        with driver.session(database=database or _default_database()) as session:
+            records = session.execute_read(work)
+    except Exception:
+        metrics.record_error()
+        raise
+    done = time.perf_counter()
+    metrics.record((ready[0] - start) * 1000, (done - ready[0]) * 1000)
+    return records
+
+
+def similar_chunks(embedding, top_k, min_score, metadata_filters, database=None):
+    records = run_read(
+        SIMILAR_CHUNKS_QUERY,
+        database=database,
+        topK=int(top_k),
+        queryEmbedding=embedding,
+        minScore=min_score,
+        bog_number=metadata_filters.get("bog_number"),
+        item_no=metadata_filters.get("item_no"),
+        meeting_date=metadata_filters.get("meeting_date")
+    )
+    return [
+        {
+            "text": r["text"],
+            "score": r["score"],
+            "metadata": {
+                "bog_number": r["bog"],
+                "item_no": r.get("item"),
+                "meeting_date": r["date"],
+                "source_file": r["file"]
+            }
+        }
+        for r in records
+    ]
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub", action="store_true", help="use the in-process stub instead of the configured Neo4j")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.stub:
+        from neo4j_stub import StubDriver
+        use_driver(StubDriver())
+
+    embedding = [0.0] * 384
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(lambda _: similar_chunks(embedding, 10, 0.5, {}, database="neo4j"), range(args.queries)))
+    elapsed = time.perf_counter() - start
+    print(f"{args.queries} queries on {args.threads} threads in {elapsed:.2f}s ({args.queries / elapsed:.1f} q/s)")
+    print(metrics.stats())
+    close_driver()
@@ -0,0 +1,95 @@
+# neo4j_stub.py
+
+"""In-process stand-in for the Neo4j driver, used with neo4j_pool.use_driver().
+
+It models a bounded connection pool: opening a new connection costs
+`connect_delay` (the TLS handshake a fresh driver pays on every request),
+idle connections are reused for free, and every query takes `query_delay`.
+Query texts and parameters are recorded so callers can check that only one
+query shape reaches the server.
+"""
+import threading
+import time
+
+
+class StubRecord(dict):
+    pass
+
+
+class StubTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, parameters=None, **kwargs):
+        params = dict(parameters or {}, **kwargs)
+        self.driver.record_query(query, params)
+        time.sleep(self.driver.query_delay)
+        return iter(self.driver.records[:params.get("topK", len(self.driver.records))])
+
+
+class StubSession:
+    def __init__(self, driver, database=None):
+        self.driver = driver
+        self.database = database
+
+    def execute_read(self, work, *args, **kwargs):
+        self.driver.acquire()
+        try:
+            return work(StubTransaction(self.driver), *args, **kwargs)
+        finally:
+            self.driver.release()
+
+    execute_write = execute_read
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StubDriver:
+    def __init__(self, records=None, max_connection_pool_size=50, connect_delay=0.05, query_delay=0.002):
+        self.records = records if records is not None else [
+            StubRecord(text=f"Stub chunk {i}", bog="70th", item=f"70.{i:02d}", date="2019-01-01", file="stub.pdf", score=1.0 - i / 100)
+            for i in range(100)
+        ]
+        self.connect_delay = connect_delay
+        self.query_delay = query_delay
+        self._slots = threading.BoundedSemaphore(max_connection_pool_size)
+        self._lock = threading.Lock()
+        self._idle = 0
+        self.connections_opened = 0
+        self.queries = {}
+
+    def acquire(self):
+        self._slots.acquire()
+        with self._lock:
+            reuse = self._idle > 0
+            if reuse:
+                self._idle -= 1
+            else:
+                self.connections_opened += 1
+        if not reuse:
+            time.sleep(self.connect_delay)
+
+    def release(self):
+        with self._lock:
+            self._idle += 1
+        self._slots.release()
+
+    def record_query(self, query, params):
+        with self._lock:
+            self.queries[query] = self.queries.get(query, 0) + 1
+
+    def session(self, database=None, **config):
+        return StubSession(self, database)
+
+    def verify_connectivity(self):
+        pass
+
+    def close(self):
+        pass
@@ -1,18 +1,44 @@
-from neo4j import GraphDatabase
-from sentence_transformers import SentenceTransformer
-from groq import Groq
-from config import NEO4J_URL, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, GROQ_API_KEY, GROQ_MODEL
+from config import NEO4J_DATABASE, GROQ_API_KEY, GROQ_MODEL
+from neo4j_pool import similar_chunks
+import os
 import re
+import sys
+import time
 
-# Load embedding model
-print("Loading SentenceTransformer model...")
-embed_model = SentenceTransformer('all-MiniLM-L6-v2')
-print("SentenceTransformer loaded ✅")
+# Shared helpers (query/embedding cache) live in the Backend directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+from query_cache import QueryCache
+from model_loader import LazyModel, LAZY_MODEL_LOADING
+from embedding_backends import EMBEDDING_BACKEND, load_backend, model_id
+from context_packer import ContextPacker
 
-# Load Groq LLM client
-print("Loading Groq Client...")
-groq_client = Groq(api_key=GROQ_API_KEY)
-print("Groq Client loaded ✅")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+def _load_embed_model():
+    # SentenceTransformer for EMBEDDING_BACKEND=torch, ONNX Runtime for onnx / onnx-int8; all share encode()
+    return load_backend(EMBEDDING_MODEL, EMBEDDING_BACKEND)
+
+def _load_groq_client():
+    from groq import Groq
+    return Groq(api_key=GROQ_API_KEY)
+
+# Both load on first use (or prewarm()), so importing this module stays cheap
+embed_model = LazyModel(model_id(EMBEDDING_MODEL, EMBEDDING_BACKEND), _load_embed_model)
+groq_client = LazyModel("Groq client", _load_groq_client)
+query_cache = QueryCache(namespace=model_id(EMBEDDING_MODEL, EMBEDDING_BACKEND))
+# Counts tokens with the Groq model's own tokenizer when GROQ_MODEL is a Hub id; CONTEXT_TOKENIZER names one otherwise
+context_packer = ContextPacker(GROQ_MODEL if GROQ_MODEL and "/" in GROQ_MODEL else None)
+
+if not LAZY_MODEL_LOADING:
+    embed_model.get()
+    groq_client.get()
+
+def prewarm():
+    embed_model.prewarm(lambda model: model.encode("warm up", normalize_embeddings=True))
+    groq_client.prewarm()
+
+def model_status():
+    return {"embedding": embed_model.status(), "groq": groq_client.status()}
 
 def extract_metadata_from_query(query):
     metadata = {}
@@ -31,91 +57,95 @@ def extract_metadata_from_query(query):
 
     return metadata
 
+def embed_query(query):
+    return query_cache.embed(lambda text: embed_model.get().encode(text, normalize_embeddings=True), query)
+
 def get_similar_chunks(query, top_k=100, min_score_threshold=0.5):
     print(f"Received query: {query}")
 
-    embedding = embed_model.encode(query, normalize_embeddings=True).tolist()
+    embedding = embed_query(query).tolist()
     print("✅ Embedding generated")
 
     metadata_filters = extract_metadata_from_query(query)
     print(f"🔎 Metadata from query: {metadata_filters}")
 
-    cypher_filter = "WHERE score >= $minScore"
-    if "bog_number" in metadata_filters:
-        cypher_filter += " AND c.bog_number = $bog_number"
-    if "item_no" in metadata_filters:
-        cypher_filter += " AND c.item_no = $item_no"
-    if "meeting_date" in metadata_filters:
-        cypher_filter += " AND c.meeting_date = $meeting_date"
-
-    cypher_query = f"""
-    CALL db.index.vector.queryNodes('chunkVectorIndex', {top_k}, $queryEmbedding)
-    YIELD node, score
-    MATCH (c:Chunk)-[:HAS_EMBEDDING]->(node)
-    {cypher_filter}
-    RETURN c.text AS text, c.bog_number AS bog, c.item_no AS item,
-           c.meeting_date AS date, c.source_file AS file, score AS score
-    ORDER BY score DESC
-    """
-
-    with GraphDatabase.driver(NEO4J_URL, auth=(NEO4J_USER, NEO4J_PASSWORD)) as driver:
-        records, _, _ = driver.execute_query(
-            cypher_query,
-            queryEmbedding=embedding,
-            minScore=min_score_threshold,
-            bog_number=metadata_filters.get("bog_number"),
-            item_no=metadata_filters.get("item_no"),
-            meeting_date=metadata_filters.get("meeting_date"),
-            database_=NEO4J_DATABASE
-        )
-        print("✅ Query executed")
+    chunks = similar_chunks(embedding, top_k, min_score_threshold, metadata_filters, database=NEO4J_DATABASE)
+    print("✅ Query executed")
+    return chunks
 
-    return [
-        {
-            "text": r["text"],
-            "score": r["score"],
-            "metadata": {
-                "bog_number": r["bog"],
-                "item_no": r.get("item"),
-                "meeting_date": r["date"],
-                "source_file": r["file"]
-            }
-        }
-        for r in records
-    ]
+NO_CONTEXT_ANSWER = "I'm sorry, I couldn't retrieve any relevant information. Please try rephrasing your query."
 
-def ask_groq(query, context_chunks):
+def ensure_context(query, context_chunks):
     # Retry with more relaxed threshold if initial retrieval failed
     if not context_chunks:
         print("⚠️ No context found with default parameters. Retrying with top_k=150 and min_score_threshold=0.3")
         context_chunks = get_similar_chunks(query, top_k=150, min_score_threshold=0.3)
+    return context_chunks
+
+def format_chunk(chunk):
+    return f"[BoG: {chunk['metadata'].get('bog_number', 'N/A')} | Item: {chunk['metadata'].get('item_no', 'N/A')} | Date: {chunk['metadata'].get('meeting_date', 'N/A')} | Score: {chunk['score']:.2f}]\n{chunk['text']}"
+
+def pack_chunks(context_chunks, reserved=0, budget=None):
+    # Best-scoring chunks first, near-duplicates dropped, until CONTEXT_TOKEN_BUDGET (or `budget`) is full
+    packed = context_packer.pack(
+        [format_chunk(chunk) for chunk in context_chunks],
+        texts=[chunk['text'] for chunk in context_chunks],
+        scores=[chunk['score'] for chunk in context_chunks],
+        reserved=reserved,
+        budget=budget
+    )
+    print(f"🧮 Packed {len(context_chunks)} chunks into {packed.summary()}")
+    return [context_chunks[i] for i in packed.indices]
 
-    if not context_chunks:
-        return "I'm sorry, I couldn't retrieve any relevant information. Please try rephrasing your query."
+def groq_messages(query, context_chunks):
+    reserved = context_packer.count_messages(_groq_messages(query, ""))
+    context = "\n\n".join(format_chunk(chunk) for chunk in pack_chunks(context_chunks, reserved))
+    return _groq_messages(query, context)
 
-    context = "\n\n".join(
-        f"[BoG: {chunk['metadata'].get('bog_number', 'N/A')} | Item: {chunk['metadata'].get('item_no', 'N/A')} | Date: {chunk['metadata'].get('meeting_date', 'N/A')} | Score: {chunk['score']:.2f}]\n{chunk['text']}"
-        for chunk in context_chunks
-    )
+def _groq_messages(query, context):
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are a highly knowledgeable assistant specialized in MNNIT Allahabad Board of Governors (BoG) meetings.\n\n"
+                "If the information is not explicitly present in the context, intelligently infer or reconstruct it based on the given in very details if you have more context give answer atleast 150 words, if you have less context give answer atleast 50 words.\n"
+                "Never say you don’t know. Respond formally, accurately, and with full confidence.\n\n"
+                f"Context:\n{context}"
+            )
+        },
+        {
+            "role": "user",
+            "content": query
+        }
+    ]
+
+def ask_groq(query, context_chunks):
+    context_chunks = ensure_context(query, context_chunks)
+    if not context_chunks:
+        return NO_CONTEXT_ANSWER
 
     print("Sending prompt to Groq LLM...")
-    completion = groq_client.chat.completions.create(
+    messages = groq_messages(query, context_chunks)
+    start = time.perf_counter()
+    completion = groq_client.get().chat.completions.create(
         model=GROQ_MODEL,
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a highly knowledgeable assistant specialized in MNNIT Allahabad Board of Governors (BoG) meetings.\n\n"
-                    "If the information is not explicitly present in the context, intelligently infer or reconstruct it based on the given in very details if you have more context give answer atleast 150 words, if you have less context give answer atleast 50 words.\n"
-                    "Never say you don’t know. Respond formally, accurately, and with full confidence.\n\n"
-                    f"Context:\n{context}"
-                )
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ]
+        messages=messages
     )
-    print("✅ Groq responded")
+    print(f"✅ Groq responded in {(time.perf_counter() - start) * 1000:.0f} ms for a {context_packer.count_messages(messages)}-token prompt")
     return completion.choices[0].message.content
+
+def stream_groq(query, context_chunks):
+    """Yield the Groq answer piece by piece as it is generated."""
+    print("Streaming prompt to Groq LLM...")
+    messages = groq_messages(query, context_chunks)
+    start = time.perf_counter()
+    stream = groq_client.get().chat.completions.create(
+        model=GROQ_MODEL,
+        messages=messages,
+        stream=True
+    )
+    for chunk in stream:
+        token = chunk.choices[0].delta.content if chunk.choices else None
+        if token:
+            yield token
+    print(f"✅ Groq stream finished in {(time.perf_counter() - start) * 1000:.0f} ms for a {context_packer.count_messages(messages)}-token prompt")
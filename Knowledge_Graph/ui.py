@@ -3,10 +3,11 @@ import streamlit as st
 # This must be the first Streamlit command
 st.set_page_config(page_title="MNNIT BoG Chatbot", page_icon=":school:", layout="wide")
 
-from neo4j import GraphDatabase
 from sentence_transformers import SentenceTransformer
 from groq import Groq
-from config import NEO4J_URL, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, GROQ_API_KEY, GROQ_MODEL
+from config import NEO4J_DATABASE, GROQ_API_KEY, GROQ_MODEL
+from neo4j_pool import similar_chunks
+from query_helper import context_packer, format_chunk, pack_chunks
 import re
 import time
 
@@ -55,49 +56,9 @@ def get_similar_chunks(query, top_k=100, min_score_threshold=0.6):
     metadata_filters = extract_metadata_from_query(query)
     print(f"🔎 Metadata from query: {metadata_filters}")
 
-    cypher_filter = "WHERE score >= $minScore"
-    if "bog_number" in metadata_filters:
-        cypher_filter += " AND c.bog_number = $bog_number"
-    if "item_no" in metadata_filters:
-        cypher_filter += " AND c.item_no = $item_no"
-    if "meeting_date" in metadata_filters:
-        cypher_filter += " AND c.meeting_date = $meeting_date"
-
-    cypher_query = f"""
-    CALL db.index.vector.queryNodes('chunkVectorIndex', {top_k}, $queryEmbedding)
-    YIELD node, score
-    MATCH (c:Chunk)-[:HAS_EMBEDDING]->(node)
-    {cypher_filter}
-    RETURN c.text AS text, c.bog_number AS bog, c.item_no AS item,
-           c.meeting_date AS date, c.source_file AS file, score AS score
-    ORDER BY score DESC
-    """
-
-    with GraphDatabase.driver(NEO4J_URL, auth=(NEO4J_USER, NEO4J_PASSWORD)) as driver:
-        records, _, _ = driver.execute_query(
-            cypher_query,
-            queryEmbedding=embedding,
-            minScore=min_score_threshold,
-            bog_number=metadata_filters.get("bog_number"),
-            item_no=metadata_filters.get("item_no"),
-            meeting_date=metadata_filters.get("meeting_date"),
-            database_=NEO4J_DATABASE
-        )
-        print("✅ Query executed")
-
-    return [
-        {
-            "text": r["text"],
-            "score": r["score"],
-            "metadata": {
-                "bog_number": r["bog"],
-                "item_no": r.get("item"),
-                "meeting_date": r["date"],
-                "source_file": r["file"]
-            }
-        }
-        for r in records
-    ]
+    chunks = similar_chunks(embedding, top_k, min_score_threshold, metadata_filters, database=NEO4J_DATABASE)
+    print("✅ Query executed")
+    return chunks
 
 def ask_groq(query, context_chunks, max_tokens=5500):
    
@@ -105,37 +66,27 @@ def ask_groq(query, context_chunks, max_tokens=5500):
         context_chunks = get_similar_chunks(query, top_k=100, min_score_threshold=0.3)
 
 
-    def estimate_tokens(text):
-        return len(text.split()) * 1.3  # rough estimate: 1.3 tokens per word
-
-    selected_chunks = []
-    total_tokens = estimate_tokens(query) + 200  # include room for instructions and response
-
-    for chunk in context_chunks:
-        chunk_text = chunk['text'][:1200]  # truncate long text for safety
-        chunk_tokens = estimate_tokens(chunk_text)
-
-        if total_tokens + chunk_tokens > max_tokens:
-            break
-
-        selected_chunks.append({
-            "text": chunk_text,
-            "score": chunk["score"],
-            "metadata": chunk["metadata"]
-        })
-
-        total_tokens += chunk_tokens
+    selected_chunks = pack_chunks(
+        [
+            {
+                "text": chunk['text'][:1200],  # truncate long text for safety
+                "score": chunk["score"],
+                "metadata": chunk["metadata"]
+            }
+            for chunk in context_chunks
+        ],
+        reserved=context_packer.count(query) + 200,  # include room for instructions and response
+        budget=max_tokens
+    )
 
     if not selected_chunks:
         return "I'm sorry, the information is not available right now."
 
-    context = "\n\n".join(
-        f"[BoG: {chunk['metadata'].get('bog_number', 'N/A')} | Item: {chunk['metadata'].get('item_no', 'N/A')} | Date: {chunk['metadata'].get('meeting_date', 'N/A')} | Score: {chunk['score']:.2f}]\n{chunk['text']}"
-        for chunk in selected_chunks
-    )
+    context = "\n\n".join(format_chunk(chunk) for chunk in selected_chunks)
 
     print("Sending prompt to Groq LLM...")
 
+    start = time.perf_counter()
     try:
         completion = groq_client.chat.completions.create(
             model=GROQ_MODEL,
@@ -160,7 +111,7 @@ def ask_groq(query, context_chunks, max_tokens=5500):
         print(f"❌ Groq error: {e}")
         return "⚠️ Something went wrong with Groq. Please try again later."
 
-    print("✅ Groq responded")
+    print(f"✅ Groq responded in {(time.perf_counter() - start) * 1000:.0f} ms for a ~{context_packer.count(context) + context_packer.count(query) + 200}-token prompt")
     return completion.choices[0].message.content
 
 